@@ -0,0 +1,103 @@
+"""
+bench_normalize.py
+==================
+Mede a etapa de normalização + deduplicação por chave normalizada nos
+arquivos brutos completos do Kaggle Tweets e do B2W, comparando com a
+deduplicação exata antiga (`drop_duplicates(subset=['text'])`).
+
+Os arquivos brutos precisam estar baixados (`git lfs pull`).
+
+Uso:
+  python benchmarks/bench_normalize.py
+  python benchmarks/bench_normalize.py --batch-size 100000 --repeat 3
+"""
+
+import argparse
+import importlib.util
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT_DIR))
+
+from pipeline_utils.normalize import (  # noqa: E402
+    DEFAULT_BATCH_SIZE, normalize_and_deduplicate, normalize_text_column, normalized_key_hashes,
+)
+
+TARGETS = [
+    ("KaggleTweetsCorpus", ROOT_DIR / "raw_data/review/kaggle/processar_kaggle.py"),
+    ("B2WReviewsCorpus", ROOT_DIR / "raw_data/review/b2w/processar-b2w.py"),
+]
+
+
+def load_processor(script_path):
+    """Importa um script de processamento como módulo (nomes com '-' inclusos)."""
+    spec = importlib.util.spec_from_file_location(script_path.stem.replace("-", "_"), script_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def is_lfs_pointer(path):
+    with open(path, "rb") as f:
+        return f.read(40).startswith(b"version https://git-lfs")
+
+
+def timed(func, repeat):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def bench_corpus(name, script_path, batch_size, repeat):
+    module = load_processor(script_path)
+    input_path = script_path.parent / module.INPUT_FILE_PATH
+    if not input_path.exists() or is_lfs_pointer(input_path):
+        print(f"[{name}] Arquivo bruto indisponível ({input_path.name}). Rode 'git lfs pull'.")
+        return
+
+    cwd = os.getcwd()
+    os.chdir(script_path.parent)
+    try:
+        df = module.load_data_from_csv(module.INPUT_FILE_PATH)
+    finally:
+        os.chdir(cwd)
+    if df is None:
+        return
+    text = module.FINAL_TEXT_COLUMN
+    n = len(df)
+
+    t_exact, exact = timed(lambda: df.drop_duplicates(subset=[text]), repeat)
+    t_norm, _ = timed(lambda: normalize_text_column(df[text], batch_size), repeat)
+    t_hash, _ = timed(lambda: normalized_key_hashes(df[text], batch_size), repeat)
+    t_total, dedup = timed(lambda: normalize_and_deduplicate(df, text, batch_size), repeat)
+
+    print(f"\n[{name}] {n} linhas (lote={batch_size}, melhor de {repeat})")
+    print(f"  {'etapa':<34} {'tempo (s)':>10} {'linhas/s':>14}")
+    for label, t in [
+        ("dedup exata (antiga)", t_exact),
+        ("normalização (NFC + espaços)", t_norm),
+        ("hash da chave normalizada", t_hash),
+        ("normalização + dedup (nova)", t_total),
+    ]:
+        print(f"  {label:<34} {t:>10.3f} {n / t:>14,.0f}")
+    print(f"  únicos — exata: {len(exact)}  normalizada: {len(dedup)} "
+          f"({len(exact) - len(dedup)} duplicatas extras removidas)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark da normalização de texto.")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args(argv)
+    for name, script_path in TARGETS:
+        bench_corpus(name, script_path, args.batch_size, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,535 @@
+"""
+run_benchmarks.py
+=================
+Benchmark offline dos scripts de processamento com dados sintéticos
+(`benchmarks/synthetic.py`), sem depender dos arquivos do Git LFS.
+
+Para cada script e escala (1x, 10x, 100x de `--base-rows`), o runner monta
+uma cópia isolada do script e de `pipeline_utils/` em um diretório
+temporário, gera os arquivos brutos e roda o `main()` do script em um
+subprocesso. As etapas são medidas envolvendo as funções do módulo, pelo
+rótulo do `@traced` de cada uma:
+
+  load   `@traced("load")` / `@traced("download")` (leitura + limpeza do script)
+  clean  `@traced("clean")`: filtro de qualidade (`apply_quality_filter`)
+  dedup  `@traced("dedup")` / `@traced("near_dup")`: deduplicação exata e quase-duplicatas
+  write  `@traced("write")`: folds, labels.json, fingerprints, manifesto,
+         comprimentos, ordem do treino, proveniência, multi-label, janelas
+  split  o restante do `main()` (divisão em folds e montagem dos splits)
+
+Para cada execução são registrados o tempo total, o tempo por etapa, a
+vazão (linhas brutas/s), o pico de memória (RSS) do subprocesso e os bytes
+lidos/gravados. O resultado vai para um arquivo JSON.
+
+O `validate_pipeline.py` também é medido (entrada `validate_pipeline`): todos
+os scripts rodam em uma mesma cópia isolada e o validador é cronometrado
+sobre os folds gerados.
+
+Modo de regressão: `--compare` repete cada execução (`--repeat`) com os
+parâmetros gravados no baseline (`benchmarks/baseline.json`) e compara as
+medianas de vazão e de pico de memória. A tolerância é o maior entre um
+percentual fixo e um múltiplo do desvio absoluto mediano (MAD) das duas
+medições, para que ruído de máquina não vire falso positivo. Sai com código
+1 se houver regressão. `--update-baseline` regrava o baseline.
+
+Como o baseline gravado depende da máquina, `--compare-rev REVISÃO` mede
+também a revisão indicada do git (extraída com `git archive`) na mesma
+execução e com os mesmos dados, alternando as repetições entre as duas
+árvores, e usa essas medições como baseline.
+
+Uso:
+  python benchmarks/run_benchmarks.py
+  python benchmarks/run_benchmarks.py --processors b2w,kaggle --scales 1,10
+  python benchmarks/run_benchmarks.py --base-rows 5000 --output resultados.json
+  python benchmarks/run_benchmarks.py --compare
+  python benchmarks/run_benchmarks.py --compare-rev HEAD
+  python benchmarks/run_benchmarks.py --update-baseline
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT_DIR))
+
+from benchmarks.synthetic import PROCESSORS, generate  # noqa: E402
+from pipeline_utils.trace import TRACE_DIR_ENV, peak_rss_mb  # noqa: E402
+
+DEFAULT_SCALES = [1, 10, 100]
+DEFAULT_BASE_ROWS = 1000
+DEFAULT_OUTPUT = ROOT_DIR / "benchmarks" / "results" / "latest.json"
+BASELINE_PATH = ROOT_DIR / "benchmarks" / "baseline.json"
+BASELINE_SCALES = [1, 10]
+BASELINE_REPEAT = 3
+VALIDATOR = "validate_pipeline"
+
+# limites do modo de regressão
+THROUGHPUT_TOLERANCE = 0.15   # queda de vazão tolerada (fração do baseline)
+MEMORY_TOLERANCE = 0.10       # aumento de pico de RSS tolerado (fração do baseline)
+MIN_RSS_DELTA_MB = 10.0       # aumentos de memória abaixo disso são ignorados
+NOISE_FACTOR = 3.0            # múltiplos do MAD tratados como ruído
+MAD_SCALE = 1.4826            # MAD -> desvio-padrão equivalente (distribuição normal)
+
+STAGES = ["load", "clean", "dedup", "split", "write"]
+# etapas do @traced que o benchmark agrupa em outra
+STAGE_ALIASES = {"download": "load", "near_dup": "dedup"}
+
+
+def stage_of(func):
+    """Etapa do benchmark de uma função, pelo rótulo do seu @traced (None se não tiver)."""
+    stage = getattr(func, "trace_stage", None)
+    stage = STAGE_ALIASES.get(stage, stage)
+    return stage if stage in STAGES else None
+
+
+def dir_size(path, exclude=()):
+    path = Path(path)
+    if not path.exists():
+        return 0
+    return sum(
+        f.stat().st_size for f in path.rglob("*")
+        if f.is_file() and not any(part in exclude for part in f.relative_to(path).parts)
+    )
+
+
+# ---------------------------------------------------------------------------
+# Subprocesso: roda um script com as etapas instrumentadas
+# ---------------------------------------------------------------------------
+
+def load_processor(script_path):
+    """Importa um script de processamento como módulo (nomes com '-' inclusos)."""
+    spec = importlib.util.spec_from_file_location(script_path.stem.replace("-", "_"), script_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _timed(func, stage, timings, rows):
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        timings[stage] += time.perf_counter() - start
+        frame = result[0] if isinstance(result, tuple) else result
+        if stage in ("load", "dedup") and hasattr(frame, "__len__") and hasattr(frame, "columns"):
+            rows[stage] += len(frame)
+        return result
+    return wrapper
+
+
+def run_worker(script_path, result_path):
+    script_path = Path(script_path).resolve()
+    module = load_processor(script_path)
+
+    timings = dict.fromkeys(STAGES, 0.0)
+    rows = {"load": 0, "dedup": 0}
+    for name, func in list(vars(module).items()):
+        stage = stage_of(func)
+        if stage is not None and callable(func):
+            setattr(module, name, _timed(func, stage, timings, rows))
+
+    is_validator = script_path.stem == VALIDATOR
+    os.chdir(script_path.parent)
+    start = time.perf_counter()
+    try:
+        module.main([]) if is_validator else module.main()
+    except SystemExit as e:
+        # o validador sai com código 1 quando há falhas; o tempo continua válido
+        print(f"main() terminou com SystemExit({e.code})")
+    wall = time.perf_counter() - start
+    if is_validator:
+        timings = {}
+    else:
+        timings["split"] = max(wall - sum(t for s, t in timings.items() if s != "split"), 0.0)
+
+    result = {
+        "wall_s": wall,
+        "stages_s": timings,
+        "rows_loaded": rows["load"],
+        "rows_after_dedup": rows["dedup"],
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    with open(result_path, "w", encoding="utf-8") as f:
+        json.dump(result, f)
+
+
+# ---------------------------------------------------------------------------
+# Processo principal
+# ---------------------------------------------------------------------------
+
+def prepare_sandbox(sandbox, script_rel, root=ROOT_DIR):
+    """Copia o script e `pipeline_utils/` preservando a estrutura do repositório."""
+    script_copy = sandbox / script_rel
+    script_copy.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copy2(root / script_rel, script_copy)
+    if not (sandbox / "pipeline_utils").exists():
+        shutil.copytree(root / "pipeline_utils", sandbox / "pipeline_utils",
+                        ignore=shutil.ignore_patterns("__pycache__"))
+    return script_copy
+
+
+def prepare_validator_sandbox(sandbox, n, seed, root=ROOT_DIR):
+    """Roda todos os scripts em uma única cópia isolada e devolve o validador."""
+    validator_copy = prepare_sandbox(sandbox, f"{VALIDATOR}.py", root)
+    for name, (script_rel, _) in PROCESSORS.items():
+        script_copy = prepare_sandbox(sandbox, script_rel, root)
+        generate(name, script_copy.parent, n, seed)
+        subprocess.run([sys.executable, script_copy.name], cwd=script_copy.parent,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True,
+                       env={**os.environ, TRACE_DIR_ENV: str(sandbox / "traces")})
+    return validator_copy
+
+
+def _median_and_mad(values):
+    values = [v for v in values if v is not None]
+    if not values:
+        return None, None
+    median = statistics.median(values)
+    return median, statistics.median(abs(v - median) for v in values)
+
+
+def summarize_samples(record, samples):
+    """Preenche o registro com as medianas (e MADs) das repetições."""
+    record["samples"] = samples
+    record["wall_s"], record["wall_s_mad"] = _median_and_mad([s["wall_s"] for s in samples])
+    record["rows_per_s"], record["rows_per_s_mad"] = _median_and_mad(
+        [record["input_rows"] / s["wall_s"] if s["wall_s"] else None for s in samples]
+    )
+    record["peak_rss_mb"], record["peak_rss_mb_mad"] = _median_and_mad([s["peak_rss_mb"] for s in samples])
+    record["stages_s"] = {
+        stage: statistics.median(s["stages_s"][stage] for s in samples)
+        for stage in samples[0]["stages_s"]
+    }
+    record["rows_loaded"] = samples[0]["rows_loaded"]
+    record["rows_after_dedup"] = samples[0]["rows_after_dedup"]
+
+
+def prepare_run(name, scale, base_rows, seed, sandbox, root=ROOT_DIR):
+    """Monta a cópia isolada com os dados sintéticos. Retorna (script, registro inicial)."""
+    shutil.rmtree(sandbox, ignore_errors=True)
+    n = base_rows * scale
+    start = time.perf_counter()
+    if name == VALIDATOR:
+        script_copy = prepare_validator_sandbox(sandbox, n, seed, root)
+        input_rows = n * len(PROCESSORS)
+        input_bytes = dir_size(sandbox, exclude={"raw_data", "pipeline_utils"})
+    else:
+        script_copy = prepare_sandbox(sandbox, PROCESSORS[name][0], root)
+        generate(name, script_copy.parent, n, seed)
+        input_rows = n
+        input_bytes = dir_size(script_copy.parent) - script_copy.stat().st_size
+    record = {
+        "processor": name,
+        "scale": scale,
+        "input_rows": input_rows,
+        "input_bytes": input_bytes,
+        "generate_s": time.perf_counter() - start,
+        "returncode": 0,
+    }
+    return script_copy, record
+
+
+def run_sample(script_copy, sandbox, record, root=ROOT_DIR):
+    """
+    Uma execução medida em subprocesso, com o runner da árvore `root` (e
+    portanto o `pipeline_utils/` dela). Retorna a amostra ou None, com o erro
+    anotado no registro.
+    """
+    result_path = sandbox / "result.json"
+    log_path = sandbox / "run.log"
+    with open(log_path, "w", encoding="utf-8") as log:
+        proc = subprocess.run(
+            [sys.executable, str(root / "benchmarks" / "run_benchmarks.py"), "--worker", str(script_copy),
+             "--result", str(result_path)],
+            stdout=log, stderr=subprocess.STDOUT, cwd=script_copy.parent,
+            env={**os.environ, TRACE_DIR_ENV: str(sandbox / "traces")},
+        )
+    if proc.returncode != 0 or not result_path.exists():
+        record["returncode"] = proc.returncode or 1
+        with open(log_path, encoding="utf-8", errors="replace") as f:
+            record["error"] = "".join(f.readlines()[-20:])
+        return None
+    with open(result_path, encoding="utf-8") as f:
+        sample = json.load(f)
+    result_path.unlink()
+    return sample
+
+
+def finish_run(name, sandbox, record, samples, keep=False):
+    if samples and record["returncode"] == 0:
+        summarize_samples(record, samples)
+        if name != VALIDATOR:
+            record["output_bytes"] = dir_size(sandbox, exclude={"raw_data", "pipeline_utils", "traces"}) \
+                - (sandbox / "run.log").stat().st_size
+    if not keep:
+        shutil.rmtree(sandbox, ignore_errors=True)
+    return record
+
+
+def bench_run(name, scale, base_rows, seed, work_dir, repeat=1, keep=False):
+    sandbox = work_dir / f"{name}_x{scale}"
+    script_copy, record = prepare_run(name, scale, base_rows, seed, sandbox)
+    samples = []
+    for _ in range(repeat):
+        sample = run_sample(script_copy, sandbox, record)
+        if sample is None:
+            break
+        samples.append(sample)
+    return finish_run(name, sandbox, record, samples, keep)
+
+
+def bench_pair(name, scale, base_rows, seed, work_dir, reference_root, repeat=1, keep=False):
+    """
+    Mede a árvore de referência e a atual com os mesmos dados, alternando as
+    repetições (referência, atual, referência, ...), para que a variação de
+    velocidade da máquina afete as duas igualmente. Retorna (referência, atual).
+    """
+    runs = []
+    for root, suffix in [(reference_root, "ref"), (ROOT_DIR, "atual")]:
+        sandbox = work_dir / f"{name}_x{scale}_{suffix}"
+        script_copy, record = prepare_run(name, scale, base_rows, seed, sandbox, root)
+        runs.append([root, sandbox, script_copy, record, []])
+    for _ in range(repeat):
+        for root, sandbox, script_copy, record, samples in runs:
+            if record["returncode"] == 0:
+                sample = run_sample(script_copy, sandbox, record, root)
+                if sample is not None:
+                    samples.append(sample)
+    return tuple(finish_run(name, sandbox, record, samples, keep) for _, sandbox, _, record, samples in runs)
+
+
+def export_revision(revision, target):
+    """Extrai do git os arquivos .py da revisão (scripts, pipeline_utils/, benchmarks/) em `target`."""
+    target.mkdir(parents=True, exist_ok=True)
+    archive = subprocess.run(
+        ["git", "-C", str(ROOT_DIR), "archive", "--format=tar", revision, "--",
+         "pipeline_utils", "benchmarks", f"{VALIDATOR}.py", ":(glob)raw_data/**/*.py"],
+        capture_output=True, check=True,
+    )
+    subprocess.run(["tar", "-x", "-C", str(target)], input=archive.stdout, check=True)
+    return target
+
+
+# ---------------------------------------------------------------------------
+# Comparação com o baseline
+# ---------------------------------------------------------------------------
+
+def _allowed_change(base, base_mad, current_mad, tolerance, floor=0.0):
+    noise = NOISE_FACTOR * MAD_SCALE * ((base_mad or 0.0) + (current_mad or 0.0))
+    return max(tolerance * base, noise, floor)
+
+
+def compare_with_baseline(baseline, records, throughput_tol, memory_tol):
+    """
+    Compara as medianas de vazão e pico de RSS com o baseline. Retorna a
+    lista de regressões encontradas (vazia se tudo estiver dentro da tolerância).
+    """
+    base_runs = {(r["processor"], r["scale"]): r for r in baseline["runs"]}
+    regressions = []
+
+    print(f"\n{'execução':<22} {'vazão base':>12} {'atual':>12} {'Δ':>7}   "
+          f"{'RSS base':>9} {'atual':>9} {'Δ':>7}   status")
+    for record in records:
+        key = (record["processor"], record["scale"])
+        label = f"{key[0]} x{key[1]}"
+        base = base_runs.get(key)
+        if base is None:
+            print(f"{label:<22} {'(sem baseline)':>12}")
+            continue
+        if record["returncode"] != 0:
+            regressions.append(f"{label}: falhou (código {record['returncode']})")
+            print(f"{label:<22} {'FALHOU':>12}")
+            continue
+
+        problems = []
+        thr_base, thr_cur = base["rows_per_s"], record["rows_per_s"]
+        thr_delta = (thr_cur - thr_base) / thr_base
+        if thr_base - thr_cur > _allowed_change(
+            thr_base, base.get("rows_per_s_mad"), record.get("rows_per_s_mad"), throughput_tol
+        ):
+            problems.append(f"vazão {thr_delta:+.0%}")
+
+        rss_base, rss_cur = base.get("peak_rss_mb"), record.get("peak_rss_mb")
+        rss_text = f"{'n/d':>9} {'n/d':>9} {'':>7}"
+        if rss_base is not None and rss_cur is not None:
+            rss_delta = (rss_cur - rss_base) / rss_base
+            rss_text = f"{rss_base:>9.0f} {rss_cur:>9.0f} {rss_delta:>+7.0%}"
+            if rss_cur - rss_base > _allowed_change(
+                rss_base, base.get("peak_rss_mb_mad"), record.get("peak_rss_mb_mad"),
+                memory_tol, MIN_RSS_DELTA_MB,
+            ):
+                problems.append(f"memória {rss_delta:+.0%}")
+
+        status = "REGRESSÃO (" + ", ".join(problems) + ")" if problems else "OK"
+        print(f"{label:<22} {thr_base:>12,.0f} {thr_cur:>12,.0f} {thr_delta:>+7.0%}   {rss_text}   {status}")
+        regressions.extend(f"{label}: {p}" for p in problems)
+
+    return regressions
+
+
+def environment_info(args):
+    import numpy
+    import pandas
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": numpy.__version__,
+        "pandas": pandas.__version__,
+        "base_rows": args.base_rows,
+        "seed": args.seed,
+        "scales": args.scales,
+        "repeat": args.repeat,
+        "processors": args.processors,
+    }
+
+
+def print_record(record, suffix=""):
+    label = f"{record['processor']} x{record['scale']}{suffix}"
+    if record["returncode"] != 0 or "wall_s" not in record:
+        print(f"  {label:<26} FALHOU (código {record['returncode']})")
+        print("    " + record.get("error", "").strip().replace("\n", "\n    "))
+        return
+    stages = " ".join(f"{s}={record['stages_s'][s]:.2f}" for s in STAGES if s in record["stages_s"])
+    rss = f"{record['peak_rss_mb']:.0f} MB" if record["peak_rss_mb"] is not None else "n/d"
+    print(f"  {label:<26} {record['input_rows']:>9} linhas {record['wall_s']:>8.2f}s "
+          f"{record['rows_per_s']:>10,.0f} linhas/s  RSS {rss:>8}  [{stages}]")
+
+
+def parse_list(value, cast=str):
+    return [cast(item) for item in value.split(",") if item.strip()]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark offline dos scripts de processamento.")
+    parser.add_argument("--processors", default=None,
+                        help="Lista separada por vírgula (padrão: todos). "
+                             f"Opções: {', '.join(list(PROCESSORS) + [VALIDATOR])}")
+    parser.add_argument("--scales", default=None,
+                        help="Multiplicadores de --base-rows (padrão: 1,10,100; 1,10 no baseline).")
+    parser.add_argument("--base-rows", type=int, default=None, help=f"Padrão: {DEFAULT_BASE_ROWS}.")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--repeat", type=int, default=None,
+                        help=f"Repetições por execução (padrão: 1; {BASELINE_REPEAT} no baseline).")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--compare", nargs="?", type=Path, const=BASELINE_PATH, default=None,
+                        metavar="BASELINE", help="Compara com o baseline e sai com código 1 se houver regressão.")
+    parser.add_argument("--compare-rev", default=None, metavar="REVISÃO",
+                        help="Compara com uma revisão do git medida na mesma execução, alternando as "
+                             "repetições; sai com código 1 se houver regressão.")
+    parser.add_argument("--update-baseline", nargs="?", type=Path, const=BASELINE_PATH, default=None,
+                        metavar="BASELINE", help="Roda o benchmark e regrava o baseline.")
+    parser.add_argument("--throughput-tolerance", type=float, default=THROUGHPUT_TOLERANCE)
+    parser.add_argument("--memory-tolerance", type=float, default=MEMORY_TOLERANCE)
+    parser.add_argument("--work-dir", type=Path, default=None,
+                        help="Diretório para as cópias isoladas (padrão: temporário).")
+    parser.add_argument("--keep", action="store_true", help="Mantém as cópias isoladas após cada execução.")
+    parser.add_argument("--worker", type=Path, help=argparse.SUPPRESS)
+    parser.add_argument("--result", type=Path, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def resolve_settings(args):
+    """
+    Completa os parâmetros não informados: no modo --compare vêm do baseline,
+    no --compare-rev e no --update-baseline dos padrões do baseline e, fora
+    deles, dos padrões do benchmark.
+    """
+    defaults = {
+        "processors": list(PROCESSORS) + [VALIDATOR],
+        "scales": DEFAULT_SCALES,
+        "base_rows": DEFAULT_BASE_ROWS,
+        "seed": 0,
+        "repeat": 1,
+    }
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        defaults.update({key: baseline["environment"][key] for key in defaults})
+    elif args.update_baseline or args.compare_rev:
+        defaults.update({"scales": BASELINE_SCALES, "repeat": BASELINE_REPEAT})
+
+    args.processors = parse_list(args.processors) if args.processors else defaults["processors"]
+    args.scales = parse_list(args.scales, int) if args.scales else defaults["scales"]
+    for key in ["base_rows", "seed", "repeat"]:
+        if getattr(args, key) is None:
+            setattr(args, key, defaults[key])
+    return baseline
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.worker:
+        run_worker(args.worker, args.result)
+        return
+
+    baseline = resolve_settings(args)
+    unknown = [name for name in args.processors if name not in PROCESSORS and name != VALIDATOR]
+    if unknown:
+        print(f"ERRO: Processadores desconhecidos: {', '.join(unknown)}")
+        sys.exit(2)
+
+    work_dir = args.work_dir or Path(tempfile.mkdtemp(prefix="bench_pipeline_"))
+    work_dir.mkdir(parents=True, exist_ok=True)
+    print(f"Benchmark: {len(args.processors)} execução(ões), escalas {args.scales}, "
+          f"base de {args.base_rows} linhas, {args.repeat} repetição(ões)")
+
+    records, reference_records = [], []
+    try:
+        if args.compare_rev:
+            reference_root = export_revision(args.compare_rev, work_dir / "referencia")
+            print(f"Referência: {args.compare_rev}")
+        for name in args.processors:
+            for scale in args.scales:
+                if args.compare_rev:
+                    reference, record = bench_pair(name, scale, args.base_rows, args.seed, work_dir,
+                                                   reference_root, args.repeat, args.keep)
+                    print_record(reference, suffix=" (ref)")
+                    reference_records.append(reference)
+                else:
+                    record = bench_run(name, scale, args.base_rows, args.seed, work_dir, args.repeat, args.keep)
+                print_record(record)
+                records.append(record)
+    finally:
+        if args.work_dir is None and not args.keep:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    results = {"environment": environment_info(args), "runs": records}
+    if args.compare_rev:
+        results["reference"] = {"revision": args.compare_rev, "runs": reference_records}
+        baseline = {"runs": [r for r in reference_records if r["returncode"] == 0]}
+    output = args.update_baseline or args.output
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+    print(f"\nResultados salvos em: {output}")
+
+    failed = any(record["returncode"] != 0 for record in records)
+    if baseline is not None:
+        regressions = compare_with_baseline(
+            baseline, records, args.throughput_tolerance, args.memory_tolerance
+        )
+        if regressions:
+            print(f"\n{len(regressions)} regressão(ões) acima da tolerância:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            sys.exit(1)
+        print("\nNenhuma regressão acima da tolerância.")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
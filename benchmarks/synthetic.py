@@ -0,0 +1,235 @@
+"""
+synthetic.py
+============
+Geradores sintéticos e determinísticos (semente fixa) para o formato bruto de
+cada script de processamento. Servem para medir o pipeline sem os arquivos do
+Git LFS e em escalas maiores que as reais.
+
+Cada gerador recebe o diretório do script (dentro de uma cópia isolada do
+repositório), o número de linhas e um `np.random.Generator`, e grava os
+arquivos com os mesmos nomes, colunas e formatos que o script espera ler.
+Os textos têm ruído parecido com o real (prefixo RT, URLs, menções, textos
+curtos, duplicatas com caixa/espaços diferentes e labels inválidas) para que
+as etapas de limpeza e deduplicação trabalhem de verdade.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+_SYLLABLES = [
+    "ba", "be", "bi", "bo", "ca", "ce", "ci", "co", "da", "de", "di", "do", "fa", "fe",
+    "ga", "go", "la", "le", "li", "lo", "ma", "me", "mi", "mo", "na", "ne", "no", "pa",
+    "pe", "po", "que", "ra", "re", "ri", "ro", "sa", "se", "si", "so", "ta", "te", "ti",
+    "to", "va", "ve", "vi", "ção", "ões", "nha", "lha", "ão", "ú", "é", "á",
+]
+_COMMON_WORDS = [
+    "o", "a", "de", "que", "e", "não", "um", "para", "com", "muito", "produto", "entrega",
+    "ótimo", "péssimo", "recomendo", "chegou", "prazo", "qualidade", "bom", "ruim",
+]
+
+
+def build_vocab(rng, size=5000):
+    """Vocabulário de pseudo-palavras em português (2 a 4 sílabas)."""
+    syllables = np.array(_SYLLABLES, dtype=object)
+    lengths = rng.integers(2, 5, size=size)
+    words = {"".join(rng.choice(syllables, size=k)) for k in lengths}
+    return np.array(_COMMON_WORDS + sorted(words), dtype=object)
+
+
+def _texts(rng, vocab, n, min_words, max_words):
+    # distribuição de Zipf aproximada: palavras comuns aparecem muito mais
+    lengths = rng.integers(min_words, max_words + 1, size=n)
+    ranks = np.minimum(rng.zipf(1.3, size=int(lengths.sum())) - 1, len(vocab) - 1)
+    words = vocab[ranks].tolist()
+    ends = np.cumsum(lengths)
+    return [" ".join(words[end - k:end]) for end, k in zip(ends.tolist(), lengths.tolist())]
+
+
+def _add_duplicates(rng, texts, rate=0.03):
+    """Copia textos anteriores, metade com variação de caixa/espaços."""
+    n = len(texts)
+    targets = np.flatnonzero(rng.random(n) < rate)
+    for i in targets[targets > 0].tolist():
+        source = texts[int(rng.integers(0, i))]
+        texts[i] = source.upper() + "  " if rng.random() < 0.5 else source
+    return texts
+
+
+def _add_social_noise(rng, texts):
+    """Prefixo RT, URLs, menções e textos só com emoji, como em tweets."""
+    roll = rng.random((len(texts), 4))
+    for i, text in enumerate(texts):
+        if roll[i, 0] < 0.10:
+            text = f"RT @usuario{i % 97}: {text}"
+        if roll[i, 1] < 0.15:
+            text = f"{text} https://t.co/x{i:07d}"
+        if roll[i, 2] < 0.10:
+            text = f"@perfil{i % 53} {text}"
+        if roll[i, 3] < 0.02:
+            text = "😂😂 👍"
+        texts[i] = text
+    return texts
+
+
+def _labels(rng, pool, n, invalid_rate=0.02, invalid=None):
+    labels = np.array(pool, dtype=object)[rng.integers(0, len(pool), size=n)]
+    labels[rng.random(n) < invalid_rate] = invalid
+    return labels
+
+
+def _write_jsonl(path, records):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def _review_frame(rng, vocab, n):
+    return pd.DataFrame({
+        "review_title": _texts(rng, vocab, n, 1, 6),
+        "review_text": _add_duplicates(rng, _texts(rng, vocab, n, 1, 60)),
+        "overall_rating": _labels(rng, [1, 2, 3, 4, 5], n, invalid=np.nan),
+    })
+
+
+def gen_b2w(script_dir, n, rng, vocab):
+    _review_frame(rng, vocab, n).to_csv(script_dir / "B2W-reviews.csv", index=False)
+
+
+def gen_repro(script_dir, n, rng, vocab):
+    _review_frame(rng, vocab, n).to_csv(script_dir / "RePro.csv", index=False)
+
+
+def gen_brands(script_dir, n, rng, vocab):
+    _review_frame(rng, vocab, n).to_excel(script_dir / "brandsBr.xlsx", index=False)
+
+
+def gen_br_sent(script_dir, n, rng, vocab):
+    for file_name in ["olist.csv", "buscape.csv"]:
+        pd.DataFrame({
+            "review_text": _add_duplicates(rng, _texts(rng, vocab, n // 2, 1, 60)),
+            "polarity": _labels(rng, [0, 1], n // 2, invalid_rate=0.1, invalid=np.nan),
+        }).to_csv(script_dir / file_name, index=False)
+
+
+def gen_kaggle(script_dir, n, rng, vocab):
+    texts = _add_social_noise(rng, _add_duplicates(rng, _texts(rng, vocab, n, 1, 25)))
+    pd.DataFrame({
+        "tweet_text": texts,
+        "sentiment": _labels(rng, ["Positivo", "Negativo", "Neutro"], n, invalid_rate=0),
+    }).to_csv(script_dir / "NoThemeTweets.csv", index=False)
+
+
+def gen_utl(script_dir, n, rng, vocab):
+    labeled_dir = script_dir / "files" / "labeled"
+    labeled_dir.mkdir(parents=True, exist_ok=True)
+    files = ["train_apps.pkl", "train_filmes.pkl", "dev_apps.pkl",
+             "dev_filmes.pkl", "test_apps.pkl", "test_filmes.pkl"]
+    for file_name in files:
+        k = n // len(files)
+        pd.DataFrame({
+            "text": _add_duplicates(rng, _texts(rng, vocab, k, 1, 80)),
+            "stars": _labels(rng, [1, 2, 3, 4, 5], k, invalid=np.nan),
+        }).to_pickle(labeled_dir / file_name)
+
+
+def gen_hatebr(script_dir, n, rng, vocab):
+    pd.DataFrame({
+        "comentario": _add_social_noise(rng, _add_duplicates(rng, _texts(rng, vocab, n, 2, 40))),
+        "label_final": _labels(rng, [0, 1], n, invalid=np.nan),
+    }).to_csv(script_dir / "HateBR.csv", index=False)
+
+
+def gen_tupy(script_dir, n, rng, vocab):
+    for file_name in ["binary_train.csv", "binary_test.csv"]:
+        pd.DataFrame({
+            "text": _add_social_noise(rng, _add_duplicates(rng, _texts(rng, vocab, n // 2, 2, 40))),
+            "hate": _labels(rng, [0, 1], n // 2, invalid=np.nan),
+        }).to_csv(script_dir / file_name, index=False)
+
+
+def gen_court(script_dir, n, rng, vocab):
+    texts = _add_duplicates(rng, _texts(rng, vocab, n, 30, 150))
+    labels = _labels(rng, ["yes", "no", "partial"], n, invalid="")
+    with open(script_dir / "courtdecision_intent.csv", "w", encoding="utf-8") as f:
+        f.write("ementa_text<=>decision_label\n")
+        for text, label in zip(texts, labels):
+            f.write(f"{text}<=>{label}\n")
+
+
+def gen_intent(script_dir, n, rng, vocab):
+    intents = ["alarm_query", "alarm_set", "audio_volume_up", "calendar_query", "cooking_query",
+               "general_joke", "play_music", "qa_maths", "weather_query", "iot_hue_lightoff"]
+    texts = _add_duplicates(rng, _texts(rng, vocab, n, 2, 15))
+    labels = _labels(rng, intents, n, invalid_rate=0)
+    _write_jsonl(script_dir / "1.1" / "data" / "pt-PT.jsonl",
+                 ({"utt": t, "intent": l} for t, l in zip(texts, labels)))
+
+
+def gen_rulingbr(script_dir, n, rng, vocab):
+    areas = ["direito civil", "direito penal", "direito tributário", "direito do trabalho",
+             "direito administrativo", "direito constitucional"]
+    texts = _add_duplicates(rng, _texts(rng, vocab, n, 40, 200))
+    labels = _labels(rng, areas, n, invalid="")
+    _write_jsonl(script_dir / "rulingbr-v1.2.jsonl",
+                 ({"ementa": t, "area": l} for t, l in zip(texts, labels)))
+
+
+def gen_recognasumm(script_dir, n, rng, vocab):
+    categories = ["Política", "Esporte", "Economia", "Saúde", "Entretenimento", "Podcast"]
+    for file_name in ["train.jsonl", "validation.jsonl", "test.jsonl"]:
+        k = n // 3
+        texts = _add_duplicates(rng, _texts(rng, vocab, k, 80, 300))
+        labels = _labels(rng, categories, k, invalid_rate=0)
+        _write_jsonl(script_dir / file_name,
+                     ({"Noticia": t, "Categoria": l} for t, l in zip(texts, labels)))
+
+
+def gen_mmlu(script_dir, n, rng, vocab):
+    subjects = ["anatomy", "astronomy", "virology", "marketing", "econometrics",
+                "formal_logic", "global_facts", "high_school_biology"]
+    pd.DataFrame({
+        "Question": _add_duplicates(rng, _texts(rng, vocab, n, 5, 40)),
+        "Subject": _labels(rng, subjects, n, invalid_rate=0),
+    }).to_csv(script_dir / "mmlu_PT-BR.csv", index=False)
+
+
+def gen_eniac(script_dir, n, rng, vocab):
+    categories = np.array(["comida", "preço", "atendimento", "ambiente", "limpeza"], dtype=object)
+    counts = rng.integers(1, 4, size=n)
+    labels = [", ".join(rng.choice(categories, size=k, replace=False)) for k in counts.tolist()]
+    pd.DataFrame({
+        "sentenca": _add_duplicates(rng, _texts(rng, vocab, n, 3, 30)),
+        "categoria": labels,
+    }).to_csv(script_dir / "dataset-eniac-2023.csv", index=False)
+
+
+# nome curto -> (script relativo à raiz do repositório, gerador)
+PROCESSORS = {
+    "b2w": ("raw_data/review/b2w/processar-b2w.py", gen_b2w),
+    "brands": ("raw_data/review/brands/processar_brands.py", gen_brands),
+    "br_sent": ("raw_data/review/brazilian_sent/processar_br_sent.py", gen_br_sent),
+    "kaggle": ("raw_data/review/kaggle/processar_kaggle.py", gen_kaggle),
+    "repro": ("raw_data/review/repro/processar_repro.py", gen_repro),
+    "utl": ("raw_data/review/utl/processar_utl.py", gen_utl),
+    "hatebr": ("raw_data/hate/HateBR/process_hateBR.py", gen_hatebr),
+    "tupy": ("raw_data/hate/tupy/process_tupy.py", gen_tupy),
+    "court": ("raw_data/intent/courtdecision/process_court.py", gen_court),
+    "intent": ("raw_data/intent/intentPT/process_intent.py", gen_intent),
+    "rulingbr": ("raw_data/category/rulingbr/process_rullingbr.py", gen_rulingbr),
+    "recognasumm": ("raw_data/category/recognasumm/process_recognasumm.py", gen_recognasumm),
+    "mmlu": ("raw_data/category/mmlu/process_mmlu.py", gen_mmlu),
+    "eniac": ("raw_data/category/eniac/processar_eniac.py", gen_eniac),
+}
+
+
+def generate(name, script_dir, n, seed=0):
+    """Grava os arquivos brutos sintéticos de `name` em `script_dir`."""
+    rng = np.random.default_rng(seed)
+    vocab = build_vocab(rng)
+    script_dir = Path(script_dir)
+    script_dir.mkdir(parents=True, exist_ok=True)
+    PROCESSORS[name][1](script_dir, n, rng, vocab)
@@ -0,0 +1,75 @@
+"""
+build_balanced.py
+=================
+Gera o 'balanced.npz' de cada fold: variantes balanceadas de cada split
+como índices das linhas do JSONL (`pipeline_utils/balance.py`), sem copiar
+texto. Por padrão, só os corpora de polaridade e de discurso de ódio.
+
+Uso:
+  python build_balanced.py                                  # undersample
+  python build_balanced.py --cap 1000 5000                  # + cap1000 e cap5000
+  python build_balanced.py --corpus B2WReviewsCorpus --seed 7
+  python build_balanced.py --all                            # todos os corpora
+
+No carregamento:
+  from pipeline_utils.balance import BalancedSplit
+  train = BalancedSplit("reviews/B2WReviewsCorpus/few_shot/01", "train", "undersample")
+"""
+
+import argparse
+import sys
+import time
+
+from pipeline_utils.balance import BALANCED_FILE_NAME, UNDERSAMPLE, save_balanced
+from validate_pipeline import BASE_DIR, DATASETS, SPLITS
+
+# corpora com labels muito desbalanceadas ("Positivo", "Não Ofensivo")
+DEFAULT_CORPORA = [
+    "B2WReviewsCorpus",
+    "OlistCorpus",
+    "BuscapeCorpus",
+    "BrandsCorpus",
+    "ReProCorpus",
+    "HateBRCorpus",
+    "TuPyCorpus",
+]
+DEFAULT_SEED = 42
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera variantes balanceadas dos folds como índices.")
+    parser.add_argument("--corpus", nargs="+", default=None, help="Corpora a processar (padrão: polaridade e ódio).")
+    parser.add_argument("--all", action="store_true", help="Processa todos os corpora do registro.")
+    parser.add_argument("--cap", nargs="+", type=int, default=[], help="Limites de exemplos por label (variantes capN).")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    args = parser.parse_args(argv)
+
+    names = None if args.all else (args.corpus or DEFAULT_CORPORA)
+    datasets = [ds for ds in DATASETS if names is None or ds["name"] in names]
+    if not datasets:
+        print(f"ERRO: Nenhum corpus encontrado entre {names}.")
+        sys.exit(1)
+
+    variants = [UNDERSAMPLE] + [f"cap{n}" for n in sorted(set(args.cap))]
+    print(f"Variantes: {', '.join(variants)} (semente {args.seed})")
+    for ds in datasets:
+        few_shot = BASE_DIR / ds["task"] / ds["name"] / "few_shot"
+        if not few_shot.exists():
+            print(f"AVISO: {ds['name']} sem folds em {few_shot}. Ignorado.")
+            continue
+        start = time.perf_counter()
+        fold_dirs = sorted(d for d in few_shot.iterdir() if d.is_dir())
+        sizes = None
+        for fold_dir in fold_dirs:
+            fold_sizes = save_balanced(fold_dir, SPLITS, variants, args.seed)
+            sizes = sizes or fold_sizes
+        train = sizes.get("train", {}) if sizes else {}
+        summary = " ".join(f"{variant}={n}" for variant, n in train.items())
+        print(f"{ds['name']:<22} {len(fold_dirs)} fold(s)  treino do 1º fold: {summary:<40} "
+              f"{time.perf_counter() - start:.2f}s")
+
+    print(f"\nÍndices salvos em '<fold>/{BALANCED_FILE_NAME}'.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+build_demonstrations.py
+=======================
+Seleciona, para cada exemplo do teste (ou de outro split) de cada fold, as
+demonstrações de few-shot mais parecidas do treino do mesmo fold, com TF-IDF
+sobre o feature store (`pipeline_utils/demonstrations.py`). Entradas do
+feature store que faltam são construídas antes; seleções já em cache são
+mantidas.
+
+Uso:
+  python build_demonstrations.py                              # k=8 no teste de todos os corpora
+  python build_demonstrations.py --corpus HateBRCorpus --k 16
+  python build_demonstrations.py --per-label 2 --split valid   # 2 por label, balanceado
+
+No código de avaliação:
+  from pipeline_utils.demonstrations import select_demonstrations
+  ids, scores = select_demonstrations("hate/HateBRCorpus", "word_1-2", "01", "test", k=8)
+  # ids[i] são posições no train.jsonl do fold 01 para o i-ésimo exemplo do test.jsonl
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from pipeline_utils.demonstrations import select_demonstrations
+from pipeline_utils.features import FEATURE_STORE_DIR, VECTORIZER_CONFIGS, build_features
+from validate_pipeline import BASE_DIR, DATASETS, NUM_FOLDS, SPLITS
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Seleciona demonstrações de few-shot por similaridade.")
+    parser.add_argument("--corpus", nargs="+", default=None, help="Corpora a processar (padrão: todos).")
+    parser.add_argument("--config", choices=list(VECTORIZER_CONFIGS), default="word_1-2")
+    parser.add_argument("--split", choices=[s for s in SPLITS if s != "train"], default="test")
+    parser.add_argument("--k", type=int, default=8, help="Demonstrações por exemplo.")
+    parser.add_argument("--per-label", type=int, default=None,
+                        help="Busca balanceada: demonstrações por label (ignora --k).")
+    parser.add_argument("--store", type=Path, default=FEATURE_STORE_DIR)
+    parser.add_argument("--force", action="store_true", help="Recalcula seleções já em cache.")
+    args = parser.parse_args(argv)
+
+    datasets = [ds for ds in DATASETS if args.corpus is None or ds["name"] in args.corpus]
+    if not datasets:
+        print(f"ERRO: Nenhum corpus encontrado entre {args.corpus}.")
+        sys.exit(1)
+
+    for ds in datasets:
+        corpus_dir = BASE_DIR / ds["task"] / ds["name"]
+        if not (corpus_dir / "few_shot").exists():
+            print(f"AVISO: {ds['name']} sem folds em {corpus_dir}. Ignorado.")
+            continue
+        build_features(corpus_dir, args.config, args.store)
+        for fold in range(1, NUM_FOLDS + 1):
+            start = time.perf_counter()
+            result = select_demonstrations(corpus_dir, args.config, f"{fold:02d}", args.split, args.k,
+                                           args.per_label, args.store, force=args.force)
+            if result is None:
+                print(f"AVISO: {ds['name']} fold {fold:02d} sem features. Ignorado.")
+                continue
+            ids, _ = result
+            print(f"{ds['name']:<22} fold {fold:02d}  {ids.shape[0]:>7} consultas x {ids.shape[1]:>3} "
+                  f"em {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
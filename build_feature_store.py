@@ -0,0 +1,57 @@
+"""
+build_feature_store.py
+======================
+Pré-calcula as matrizes esparsas (HashingVectorizer de palavras e de
+caracteres) de todos os corpora para os baselines (`pipeline_utils/features.py`).
+Entradas já construídas para o mesmo conteúdo e configuração são mantidas.
+
+Uso:
+  python build_feature_store.py                              # todos os corpora e configurações
+  python build_feature_store.py --corpus B2WReviewsCorpus --config word_1-2
+  python build_feature_store.py --force
+
+Nos baselines:
+  from pipeline_utils.features import load_features
+  X_train, y_train = load_features("reviews/B2WReviewsCorpus", "word_1-2", "01", "train")
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from pipeline_utils.features import FEATURE_STORE_DIR, VECTORIZER_CONFIGS, build_features
+from validate_pipeline import BASE_DIR, DATASETS
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Constrói o feature store dos baselines.")
+    parser.add_argument("--corpus", nargs="+", default=None, help="Corpora a processar (padrão: todos).")
+    parser.add_argument("--config", nargs="+", choices=list(VECTORIZER_CONFIGS), default=list(VECTORIZER_CONFIGS))
+    parser.add_argument("--store", type=Path, default=FEATURE_STORE_DIR)
+    parser.add_argument("--force", action="store_true", help="Reconstrói entradas já existentes.")
+    args = parser.parse_args(argv)
+
+    datasets = [ds for ds in DATASETS if args.corpus is None or ds["name"] in args.corpus]
+    if not datasets:
+        print(f"ERRO: Nenhum corpus encontrado entre {args.corpus}.")
+        sys.exit(1)
+
+    built = 0
+    for ds in datasets:
+        corpus_dir = BASE_DIR / ds["task"] / ds["name"]
+        if not (corpus_dir / "few_shot").exists():
+            print(f"AVISO: {ds['name']} sem folds em {corpus_dir}. Ignorado.")
+            continue
+        for config_name in args.config:
+            start = time.perf_counter()
+            entry, fresh = build_features(corpus_dir, config_name, args.store, args.force)
+            status = f"construído em {time.perf_counter() - start:.2f}s" if fresh else "já existente"
+            print(f"{ds['name']:<22} {config_name:<10} {status:<24} {entry}")
+            built += fresh
+
+    print(f"\n{built} entrada(s) construída(s) em: {args.store}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+corpus_stats.py
+===============
+Gera o '<corpus>/stats.json' de cada corpus (exemplos, tokens, vocabulário,
+n-gramas mais frequentes por label e quantis de comprimento) em uma passada
+sobre os arquivos de teste dos folds, com sketches aproximados
+(`pipeline_utils/corpus_stats.py`). Só os arquivos que mudaram desde a última
+execução são relidos.
+
+Uso:
+  python corpus_stats.py
+  python corpus_stats.py --corpus B2WReviewsCorpus RulingBRCorpus
+  python corpus_stats.py --force
+"""
+
+import argparse
+import sys
+import time
+
+from pipeline_utils.corpus_stats import STATS_FILE_NAME, update_corpus_stats
+from validate_pipeline import BASE_DIR, DATASETS
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Estatísticas dos corpora para o dataset card.")
+    parser.add_argument("--corpus", nargs="+", default=None, help="Corpora a processar (padrão: todos).")
+    parser.add_argument("--force", action="store_true", help="Relê todos os arquivos, mesmo sem mudanças.")
+    args = parser.parse_args(argv)
+
+    datasets = [ds for ds in DATASETS if args.corpus is None or ds["name"] in args.corpus]
+    if not datasets:
+        print(f"ERRO: Nenhum corpus encontrado entre {args.corpus}.")
+        sys.exit(1)
+
+    print(f"{'Corpus':<22} {'Exemplos':>9} {'Tokens':>11} {'Vocab.':>9} {'Mediana':>8} {'Relidos':>8} {'Tempo':>7}")
+    for ds in datasets:
+        corpus_dir = BASE_DIR / ds["task"] / ds["name"]
+        if not (corpus_dir / "few_shot").exists():
+            print(f"AVISO: {ds['name']} sem folds em {corpus_dir}. Ignorado.")
+            continue
+        start = time.perf_counter()
+        stats, refreshed = update_corpus_stats(corpus_dir, args.force)
+        median = stats["length_tokens"]["p50"]
+        median = "-" if median is None else round(median)
+        print(f"{ds['name']:<22} {stats['examples']:>9} {stats['tokens']:>11} {stats['vocab_size_estimate']:>9} "
+              f"{median:>8} {refreshed:>5}/{stats['source_files']:<2} "
+              f"{time.perf_counter() - start:>6.2f}s")
+
+    print(f"\nEstatísticas salvas em '<corpus>/{STATS_FILE_NAME}'.")
+
+
+if __name__ == "__main__":
+    main()
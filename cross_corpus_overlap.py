@@ -0,0 +1,98 @@
+"""
+cross_corpus_overlap.py
+=======================
+Detecta exemplos compartilhados entre corpora diferentes (ex.: uma review que
+está no treino do B2W e no teste do Olist) usando os índices de fingerprints
+gravados pelos scripts de processamento ('<corpus>/fingerprints.npz').
+
+Uso:
+  python cross_corpus_overlap.py                      # treino de A x teste de B, fold a fold
+  python cross_corpus_overlap.py --pooled             # splits unidos sobre todos os folds
+  python cross_corpus_overlap.py --split-a test --split-b test --fold 01
+  python cross_corpus_overlap.py --build-missing --output overlap.csv
+"""
+
+import argparse
+import csv
+import sys
+from pathlib import Path
+
+from pipeline_utils.fingerprints import (
+    FINGERPRINTS_FILE_NAME, SPLITS, build_fingerprint_index, load_fingerprint_index, overlap_matrix,
+)
+from validate_pipeline import BASE_DIR, DATASETS
+
+
+def load_indexes(build_missing=False):
+    indexes = {}
+    for ds in DATASETS:
+        corpus_dir = BASE_DIR / ds["task"] / ds["name"]
+        index = load_fingerprint_index(corpus_dir)
+        if index is None and build_missing and (corpus_dir / "few_shot").exists():
+            print(f"Construindo {FINGERPRINTS_FILE_NAME} para {ds['name']} a partir dos JSONL...")
+            build_fingerprint_index(corpus_dir)
+            index = load_fingerprint_index(corpus_dir)
+        if index is None:
+            print(f"AVISO: {ds['name']} sem {FINGERPRINTS_FILE_NAME}. Ignorado (use --build-missing).")
+            continue
+        indexes[ds["name"]] = index
+    return indexes
+
+
+def print_matrix(names, matrix, split_a, split_b, fold=None, pooled=False):
+    short = [name.replace("Corpus", "")[:10] for name in names]
+    scope = f"fold {fold}" if fold else ("splits unidos sobre os folds" if pooled else "fold a fold, somado sobre os folds")
+    print(f"\nLinhas: '{split_a}' do corpus A — Colunas: '{split_b}' do corpus B ({scope})\n")
+    print(f"{'':<22}" + "".join(f"{s:>11}" for s in short))
+    for name, row in zip(names, matrix):
+        print(f"{name:<22}" + "".join(f"{v:>11}" for v in row))
+
+
+def write_csv(path, names, matrix):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["corpus"] + names)
+        for name, row in zip(names, matrix):
+            writer.writerow([name] + [int(v) for v in row])
+    print(f"\nMatriz salva em: {path}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sobreposição de exemplos entre corpora.")
+    parser.add_argument("--split-a", choices=SPLITS, default="train")
+    parser.add_argument("--split-b", choices=SPLITS, default="test")
+    parser.add_argument("--fold", default=None, help="Restringe a consulta a um fold (ex.: 01).")
+    parser.add_argument("--pooled", action="store_true",
+                        help="Une cada split sobre todos os folds antes de comparar (padrão: fold a fold, somado).")
+    parser.add_argument("--build-missing", action="store_true",
+                        help="Constrói o índice a partir dos JSONL quando ele não existir.")
+    parser.add_argument("--output", type=Path, default=None, help="Salva a matriz em CSV.")
+    args = parser.parse_args(argv)
+
+    indexes = load_indexes(args.build_missing)
+    if not indexes:
+        print("ERRO: Nenhum índice de fingerprints disponível.")
+        sys.exit(1)
+
+    names, matrix = overlap_matrix(indexes, args.split_a, args.split_b, args.fold, args.pooled)
+    print_matrix(names, matrix, args.split_a, args.split_b, args.fold, args.pooled)
+
+    # a diagonal compara o corpus com ele mesmo e não indica problema
+    cross = [
+        (names[i], names[j], int(matrix[i, j]))
+        for i in range(len(names)) for j in range(len(names))
+        if i != j and matrix[i, j] > 0
+    ]
+    if cross:
+        print(f"\n{len(cross)} par(es) de corpora com exemplos em comum:")
+        for a, b, n in sorted(cross, key=lambda item: -item[2]):
+            print(f"  {a} ({args.split_a}) x {b} ({args.split_b}): {n}")
+    else:
+        print("\nNenhum exemplo em comum entre corpora diferentes.")
+
+    if args.output:
+        write_csv(args.output, names, matrix)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+"""
+pipeline_utils
+==============
+Etapas compartilhadas pelos scripts de processamento em `raw_data/` e pelo
+`validate_pipeline.py`.
+
+Os scripts rodam a partir do próprio diretório (ver `run_all_pipelines.sh`),
+por isso cada um adiciona a raiz do repositório ao `sys.path` antes de
+importar este pacote.
+"""
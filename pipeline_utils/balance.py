@@ -0,0 +1,131 @@
+"""
+Variantes balanceadas dos splits, guardadas como índices.
+
+Os corpora de polaridade (B2W, Olist, Buscape, Brands, RePro) concentram a
+maior parte dos exemplos em "Positivo", e os de discurso de ódio em "Não
+Ofensivo". Em vez de subamostrar no carregamento (lendo o arquivo inteiro e
+descartando quase tudo) ou gravar cópias dos JSONL, cada fold ganha um
+'balanced.npz' com, para cada split:
+
+- '<split>_offsets': o byte de início de cada linha do JSONL;
+- '<split>_<variante>': as linhas escolhidas, em ordem crescente.
+
+Variantes:
+
+- 'undersample': cada label fica com a quantidade da label mais rara;
+- 'cap<N>': cada label fica com no máximo N exemplos.
+
+A escolha é vetorizada sobre a coluna de labels (um lexsort com chave
+aleatória por label) e depende só dos labels e da semente. `BalancedSplit`
+lê apenas as linhas escolhidas, com seek direto pelos offsets.
+"""
+
+import json
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BALANCED_FILE_NAME = "balanced.npz"
+UNDERSAMPLE = "undersample"
+
+_CAP = re.compile(r"cap(\d+)$")
+
+
+def variant_targets(counts, variant):
+    """Quantidade de exemplos de cada label na variante."""
+    counts = np.asarray(counts, dtype=np.int64)
+    if variant == UNDERSAMPLE:
+        return np.full_like(counts, counts.min() if len(counts) else 0)
+    match = _CAP.match(variant)
+    if match is None:
+        raise ValueError(f"Variante desconhecida: {variant!r} (use '{UNDERSAMPLE}' ou 'cap<N>').")
+    return np.minimum(counts, int(match.group(1)))
+
+
+def balanced_indices(labels, variant, seed):
+    """Linhas (int32, em ordem crescente) da variante balanceada."""
+    codes, uniques = pd.factorize(pd.Series(labels).reset_index(drop=True), use_na_sentinel=False)
+    counts = np.bincount(codes, minlength=len(uniques))
+    targets = variant_targets(counts, variant)
+    rng = np.random.default_rng(seed)
+    grouped = np.lexsort((rng.random(len(codes)), codes))
+    rank = np.arange(len(codes)) - (np.cumsum(counts) - counts)[codes[grouped]]
+    keep = grouped[rank < targets[codes[grouped]]]
+    return np.sort(keep).astype(np.int32)
+
+
+def scan_jsonl(path):
+    """(offset de cada linha não vazia, label de cada linha) de um JSONL."""
+    offsets, labels = [], []
+    position = 0
+    with open(path, "rb") as f:
+        for line in f:
+            if line.strip():
+                offsets.append(position)
+                labels.append(json.loads(line).get("label"))
+            position += len(line)
+    return np.array(offsets, dtype=np.int64), labels
+
+
+def save_balanced(fold_dir, splits, variants, seed):
+    """
+    Grava o balanced.npz do fold com as variantes pedidas para cada split.
+    Retorna {split: {variante: quantidade de linhas}}.
+    """
+    fold_dir = Path(fold_dir)
+    arrays, sizes = {}, {}
+    for split in splits:
+        path = fold_dir / f"{split}.jsonl"
+        if not path.exists():
+            continue
+        offsets, labels = scan_jsonl(path)
+        arrays[f"{split}_offsets"] = offsets
+        sizes[split] = {}
+        for variant in variants:
+            rows = balanced_indices(labels, variant, seed)
+            arrays[f"{split}_{variant}"] = rows
+            sizes[split][variant] = len(rows)
+    np.savez(fold_dir / BALANCED_FILE_NAME, seed=seed, variants=np.array(variants, dtype=str), **arrays)
+    return sizes
+
+
+def load_balanced(fold_dir, split, variant):
+    """Linhas da variante no split. Retorna None se não existir."""
+    file_path = Path(fold_dir) / BALANCED_FILE_NAME
+    if not file_path.exists():
+        return None
+    with np.load(file_path) as data:
+        key = f"{split}_{variant}"
+        return data[key] if key in data.files else None
+
+
+class BalancedSplit:
+    """Registros de uma variante balanceada como sequência, lidos sob demanda do JSONL."""
+
+    def __init__(self, fold_dir, split, variant):
+        self.path = Path(fold_dir) / f"{split}.jsonl"
+        file_path = Path(fold_dir) / BALANCED_FILE_NAME
+        if not file_path.exists():
+            raise FileNotFoundError(f"{BALANCED_FILE_NAME} não encontrado em {fold_dir}")
+        with np.load(file_path) as data:
+            key = f"{split}_{variant}"
+            if key not in data.files:
+                raise KeyError(f"Variante '{variant}' do split '{split}' não está em {file_path}")
+            self.rows = data[key]
+            self._offsets = data[f"{split}_offsets"][self.rows]
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, i):
+        with open(self.path, "rb") as f:
+            f.seek(int(self._offsets[i]))
+            return json.loads(f.readline().decode("utf-8"))
+
+    def __iter__(self):
+        with open(self.path, "rb") as f:
+            for offset in self._offsets:
+                f.seek(int(offset))
+                yield json.loads(f.readline().decode("utf-8"))
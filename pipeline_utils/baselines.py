@@ -0,0 +1,79 @@
+"""
+Baselines lineares sobre o feature store.
+
+Cada job treina um modelo linear (regressão logística ou SVM linear) no
+treino de um fold, com as matrizes de `pipeline_utils/features.py`, e avalia
+no valid e no teste. O job só recebe caminhos e nomes, abre a matriz do pool
+com memory-map e devolve um dicionário com as métricas e o tempo de cada
+etapa, então pode rodar em qualquer processo de um pool sem copiar dados
+entre processos.
+"""
+
+import time
+from pathlib import Path
+
+import numpy as np
+
+from pipeline_utils.features import load_features
+
+MODELS = ["logreg", "linear_svm"]
+EVAL_SPLITS = ["valid", "test"]
+
+
+def make_model(model_name, seed):
+    if model_name == "logreg":
+        from sklearn.linear_model import LogisticRegression
+
+        # tol folgado: o saga para em ~15 épocas, com o mesmo F1 da tolerância padrão
+        return LogisticRegression(C=10.0, solver="saga", tol=1e-2, max_iter=100, random_state=seed)
+    if model_name == "linear_svm":
+        from sklearn.svm import LinearSVC
+
+        return LinearSVC(C=1.0, random_state=seed)
+    raise ValueError(f"Modelo desconhecido: {model_name}")
+
+
+def run_job(corpus_dir, config_name, fold_name, model_name, seed=0, store_root=None):
+    """Treina e avalia um modelo em um fold. Erros viram 'status' no resultado."""
+    from sklearn.metrics import accuracy_score, f1_score
+
+    corpus_dir = Path(corpus_dir)
+    result = {
+        "corpus": corpus_dir.name, "fold": fold_name, "config": config_name, "model": model_name,
+        "status": "OK", "n_train": 0, "n_classes": 0, "load_s": 0.0, "fit_s": 0.0, "predict_s": 0.0,
+    }
+    for split in EVAL_SPLITS:
+        result[f"{split}_accuracy"] = result[f"{split}_macro_f1"] = None
+
+    start = time.perf_counter()
+    data = {split: load_features(corpus_dir, config_name, fold_name, split, store_root)
+            for split in ["train"] + EVAL_SPLITS}
+    result["load_s"] = time.perf_counter() - start
+    if any(value is None for value in data.values()):
+        result["status"] = "sem features"
+        return result
+
+    X_train, y_train = data["train"]
+    result["n_train"] = X_train.shape[0]
+    result["n_classes"] = len(np.unique(y_train))
+    if result["n_classes"] < 2:
+        result["status"] = "treino com menos de 2 classes"
+        return result
+
+    try:
+        start = time.perf_counter()
+        model = make_model(model_name, seed).fit(X_train, y_train)
+        result["fit_s"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for split in EVAL_SPLITS:
+            X, y = data[split]
+            if X.shape[0] == 0:
+                continue
+            predicted = model.predict(X)
+            result[f"{split}_accuracy"] = float(accuracy_score(y, predicted))
+            result[f"{split}_macro_f1"] = float(f1_score(y, predicted, average="macro", zero_division=0))
+        result["predict_s"] = time.perf_counter() - start
+    except Exception as e:
+        result["status"] = f"erro: {type(e).__name__}: {e}"
+    return result
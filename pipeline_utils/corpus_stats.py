@@ -0,0 +1,222 @@
+"""
+Estatísticas de corpus para o dataset card, em uma passada por arquivo.
+
+Cada texto único do corpus está em exatamente um 'test.jsonl' (os folds de
+teste particionam o pool), então as estatísticas do corpus saem da união
+dos sketches dos 5 arquivos de teste, sem carregar o corpus no pandas. Por
+arquivo são calculados, em lotes:
+
+- exemplos e tokens por label (exatos);
+- tamanho do vocabulário (HyperLogLog sobre os tokens em minúsculas);
+- unigramas e bigramas mais frequentes por label (Count-Min Sketch sobre
+  pares label/n-grama, com uma lista de candidatos por label);
+- quantis do comprimento em tokens e em caracteres (t-digest).
+
+Os sketches de cada arquivo ficam em '<corpus>/stats_sketches/<fold>.npz'
+com o tamanho e a data de modificação do arquivo de origem: ao rodar de
+novo, só os arquivos que mudaram são lidos. O resultado vai para
+'<corpus>/stats.json'.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from pipeline_utils.sketches import CountMinSketch, HyperLogLog, TDigest, combine_hashes, stable_hash
+
+STATS_FILE_NAME = "stats.json"
+SKETCHES_DIR_NAME = "stats_sketches"
+SOURCE_SPLIT = "test"
+BATCH_SIZE = 10_000
+TOP_NGRAMS = 20
+CANDIDATES_PER_LABEL = 4 * TOP_NGRAMS
+QUANTILES = [0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99]
+
+
+class FileSketch:
+    """Sketches de um arquivo JSONL (ou a união de vários)."""
+
+    def __init__(self):
+        self.labels = {}  # label -> [exemplos, tokens]
+        self.ngrams = CountMinSketch()
+        self.vocab = HyperLogLog()
+        self.token_lengths = TDigest()
+        self.char_lengths = TDigest()
+        self.candidates = {}  # label -> {n-grama, ...}
+
+    def _ngram_counts(self, texts, labels):
+        """(label, n-grama, contagem) dos unigramas e bigramas do lote."""
+        tokens = pd.Series(texts).str.lower().str.split().explode().dropna()
+        doc = tokens.index.to_numpy()
+        tokens = tokens.to_numpy(dtype=object)
+        same_doc = doc[1:] == doc[:-1]
+        bigrams = pd.Series(tokens[:-1][same_doc]) + " " + pd.Series(tokens[1:][same_doc])
+        frame = pd.DataFrame({
+            "label": np.concatenate([labels[doc], labels[doc[1:][same_doc]]]),
+            "ngram": np.concatenate([tokens, bigrams.to_numpy(dtype=object)]),
+        })
+        return tokens, frame.value_counts(sort=False).reset_index(name="count")
+
+    def add_batch(self, texts, labels):
+        texts = pd.Series(texts, dtype=object).fillna("").astype(str).reset_index(drop=True)
+        labels = np.asarray(labels, dtype=object)
+        token_counts = texts.str.split().str.len().to_numpy()
+        for label, size, tokens in pd.DataFrame({"label": labels, "tokens": token_counts}) \
+                .groupby("label", sort=False)["tokens"].agg(["size", "sum"]).itertuples():
+            stats = self.labels.setdefault(label, [0, 0])
+            stats[0] += int(size)
+            stats[1] += int(tokens)
+        self.token_lengths.add(token_counts)
+        self.char_lengths.add(texts.str.len().to_numpy())
+
+        tokens, counts = self._ngram_counts(texts, labels)
+        if len(tokens) == 0:
+            return
+        self.vocab.add(stable_hash(pd.unique(tokens)))
+        keys = combine_hashes(stable_hash(counts["label"].to_numpy()), stable_hash(counts["ngram"].to_numpy()))
+        self.ngrams.add(keys, counts["count"].to_numpy())
+        # candidatos: os n-gramas mais frequentes do lote, por label, somados aos já guardados
+        batch_top = counts.sort_values("count", ascending=False).groupby("label", sort=False).head(CANDIDATES_PER_LABEL)
+        for label, group in batch_top.groupby("label", sort=False)["ngram"]:
+            self.candidates.setdefault(label, set()).update(group)
+        self._prune_candidates()
+
+    def _prune_candidates(self):
+        for label, ngrams in self.candidates.items():
+            if len(ngrams) > 2 * CANDIDATES_PER_LABEL:
+                self.candidates[label] = {ngram for ngram, _ in self.top_ngrams(label, CANDIDATES_PER_LABEL)}
+
+    def top_ngrams(self, label, n):
+        ngrams = sorted(self.candidates.get(label, ()))
+        if not ngrams:
+            return []
+        keys = combine_hashes(stable_hash([label] * len(ngrams)), stable_hash(ngrams))
+        estimates = self.ngrams.estimate(keys)
+        order = np.argsort(-estimates, kind="stable")[:n]
+        return [(ngrams[i], int(estimates[i])) for i in order]
+
+    def merge(self, other):
+        for label, (examples, tokens) in other.labels.items():
+            stats = self.labels.setdefault(label, [0, 0])
+            stats[0] += examples
+            stats[1] += tokens
+        self.ngrams.merge(other.ngrams)
+        self.vocab.merge(other.vocab)
+        self.token_lengths.merge(other.token_lengths)
+        self.char_lengths.merge(other.char_lengths)
+        for label, ngrams in other.candidates.items():
+            self.candidates.setdefault(label, set()).update(ngrams)
+        self._prune_candidates()
+        return self
+
+    def save(self, file_path, source_key):
+        labels = list(self.labels)
+        candidate_labels = [label for label, ngrams in self.candidates.items() for _ in ngrams]
+        candidate_ngrams = [ngram for ngrams in self.candidates.values() for ngram in ngrams]
+        np.savez_compressed(
+            file_path, source_key=source_key,
+            labels=np.array(labels, dtype=str), label_stats=np.array([self.labels[l] for l in labels], dtype=np.int64),
+            cms=self.ngrams.table, hll=self.vocab.registers,
+            token_means=self.token_lengths.means, token_weights=self.token_lengths.weights,
+            char_means=self.char_lengths.means, char_weights=self.char_lengths.weights,
+            candidate_labels=np.array(candidate_labels, dtype=str), candidate_ngrams=np.array(candidate_ngrams, dtype=str),
+        )
+
+    @classmethod
+    def load(cls, file_path):
+        """(sketch, chave do arquivo de origem) gravados por `save`."""
+        sketch = cls()
+        with np.load(file_path) as data:
+            sketch.labels = {str(l): [int(e), int(t)] for l, (e, t) in zip(data["labels"], data["label_stats"])}
+            sketch.ngrams = CountMinSketch(table=data["cms"])
+            sketch.vocab = HyperLogLog(registers=data["hll"])
+            sketch.token_lengths = TDigest(means=data["token_means"], weights=data["token_weights"])
+            sketch.char_lengths = TDigest(means=data["char_means"], weights=data["char_weights"])
+            for label, ngram in zip(data["candidate_labels"], data["candidate_ngrams"]):
+                sketch.candidates.setdefault(str(label), set()).add(str(ngram))
+            return sketch, str(data["source_key"])
+
+
+def source_key(path):
+    stat = Path(path).stat()
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def sketch_file(path):
+    sketch = FileSketch()
+    texts, labels = [], []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            texts.append(record.get("text", ""))
+            labels.append(str(record.get("label")))
+            if len(texts) == BATCH_SIZE:
+                sketch.add_batch(texts, labels)
+                texts, labels = [], []
+    if texts:
+        sketch.add_batch(texts, labels)
+    return sketch
+
+
+def update_corpus_stats(corpus_dir, force=False):
+    """
+    Atualiza os sketches dos arquivos de teste que mudaram e regrava o
+    stats.json. Retorna (estatísticas, quantidade de arquivos relidos).
+    """
+    corpus_dir = Path(corpus_dir)
+    sketch_dir = corpus_dir / SKETCHES_DIR_NAME
+    sketch_dir.mkdir(exist_ok=True)
+    sources = sorted((corpus_dir / "few_shot").glob(f"*/{SOURCE_SPLIT}.jsonl"))
+    for stale in set(sketch_dir.glob("*.npz")) - {sketch_dir / f"{p.parent.name}.npz" for p in sources}:
+        stale.unlink()
+
+    total, refreshed = FileSketch(), 0
+    for path in sources:
+        cache, key = sketch_dir / f"{path.parent.name}.npz", source_key(path)
+        sketch = None
+        if cache.exists() and not force:
+            sketch, cached_key = FileSketch.load(cache)
+            if cached_key != key:
+                sketch = None
+        if sketch is None:
+            sketch = sketch_file(path)
+            sketch.save(cache, key)
+            refreshed += 1
+        total.merge(sketch)
+
+    stats = summarize(corpus_dir.name, total, len(sources))
+    with open(corpus_dir / STATS_FILE_NAME, "w", encoding="utf-8") as f:
+        json.dump(stats, f, indent=2, ensure_ascii=False)
+    return stats, refreshed
+
+
+def summarize(name, sketch, num_sources):
+    def quantiles(digest):
+        return {f"p{round(q * 100)}": digest.quantile(q) for q in QUANTILES}
+
+    return {
+        "corpus": name,
+        "source_files": num_sources,
+        "examples": sum(examples for examples, _ in sketch.labels.values()),
+        "tokens": sum(tokens for _, tokens in sketch.labels.values()),
+        "vocab_size_estimate": sketch.vocab.count(),
+        "length_tokens": quantiles(sketch.token_lengths),
+        "length_chars": quantiles(sketch.char_lengths),
+        "labels": {
+            label: {
+                "examples": examples,
+                "tokens": tokens,
+                "top_ngrams": [[ngram, count] for ngram, count in sketch.top_ngrams(label, TOP_NGRAMS)],
+            }
+            for label, (examples, tokens) in sorted(sketch.labels.items(), key=lambda item: -item[1][0])
+        },
+        "approximate": {
+            "vocab_size_estimate": f"HyperLogLog, 2^{sketch.vocab.p} registradores",
+            "top_ngrams": f"Count-Min Sketch {sketch.ngrams.depth}x{sketch.ngrams.width} (contagens para cima)",
+            "quantiles": f"t-digest, compressão {sketch.token_lengths.compression}",
+        },
+    }
@@ -0,0 +1,136 @@
+"""
+Seleção de demonstrações por similaridade para few-shot com LLMs.
+
+Para cada exemplo de um split (normalmente o teste), as demonstrações são os
+k exemplos mais parecidos do treino do mesmo fold. Os vetores vêm do feature
+store (`pipeline_utils/features.py`): as linhas do HashingVectorizer já têm
+norma l2, então basta multiplicar cada coluna pelo IDF calculado no treino
+do fold e normalizar de novo para obter TF-IDF. A similaridade de cosseno é
+um produto de matrizes esparsas, feito em blocos de consultas para que a
+matriz densa de scores (bloco x treino) caiba em `block_elements` floats.
+
+Com `per_label`, a busca é balanceada: os `per_label` vizinhos mais
+parecidos de cada label do treino, todos ordenados por score.
+
+O resultado é guardado na entrada do feature store
+('demonstrations/<fold>_<split>_k<k>.npz' ou '..._p<per_label>.npz') com as
+posições no train.jsonl do fold ('ids', -1 quando o treino tem menos
+exemplos que o pedido) e os scores. Como o diretório da entrada muda com os
+textos e as labels do corpus, folds regerados ou relabelados nunca
+reaproveitam um cache antigo (nem as labels antigas na busca balanceada).
+"""
+
+from pathlib import Path
+
+import numpy as np
+
+from pipeline_utils.features import entry_dir, load_features
+
+DEMONSTRATIONS_DIR_NAME = "demonstrations"
+DEFAULT_BLOCK_ELEMENTS = 2**25
+
+
+def tfidf_weights(X_train):
+    """IDF suavizado (como o do TfidfTransformer) de cada coluna, calculado no treino."""
+    n_docs = X_train.shape[0]
+    doc_freq = np.bincount(X_train.indices, minlength=X_train.shape[1])
+    return (np.log((1 + n_docs) / (1 + doc_freq)) + 1).astype(np.float32)
+
+
+def apply_tfidf(X, idf):
+    from sklearn.preprocessing import normalize
+
+    return normalize(X.multiply(idf).tocsr().astype(np.float32), norm="l2", copy=False)
+
+
+def _top_k(scores, k):
+    """Colunas dos k maiores scores de cada linha, em ordem decrescente, e os scores."""
+    k_eff = min(k, scores.shape[1])
+    ids = np.full((scores.shape[0], k), -1, dtype=np.int32)
+    top = np.full((scores.shape[0], k), -np.inf, dtype=np.float32)
+    if k_eff == 0:
+        return ids, top
+    part = np.argpartition(scores, -k_eff, axis=1)[:, -k_eff:]
+    part_scores = np.take_along_axis(scores, part, axis=1)
+    order = np.argsort(-part_scores, axis=1, kind="stable")
+    ids[:, :k_eff] = np.take_along_axis(part, order, axis=1)
+    top[:, :k_eff] = np.take_along_axis(part_scores, order, axis=1)
+    return ids, top
+
+
+def _blocks(n_queries, n_train, block_elements):
+    size = max(block_elements // max(n_train, 1), 1)
+    for start in range(0, n_queries, size):
+        yield slice(start, min(start + size, n_queries))
+
+
+def nearest_neighbors(X_query, X_train, k, block_elements=DEFAULT_BLOCK_ELEMENTS):
+    """(ids, scores) dos k vizinhos de cada consulta, com linhas já normalizadas."""
+    ids = np.full((X_query.shape[0], k), -1, dtype=np.int32)
+    scores = np.full((X_query.shape[0], k), -np.inf, dtype=np.float32)
+    X_train_t = X_train.T.tocsc()
+    for block in _blocks(X_query.shape[0], X_train.shape[0], block_elements):
+        dense = (X_query[block] @ X_train_t).toarray()
+        ids[block], scores[block] = _top_k(dense, k)
+    return ids, scores
+
+
+def balanced_neighbors(X_query, X_train, y_train, per_label, block_elements=DEFAULT_BLOCK_ELEMENTS):
+    """
+    (ids, scores) com os `per_label` vizinhos de cada label do treino,
+    ordenados por score. Labels com menos exemplos completam com -1 no fim.
+    """
+    labels = np.unique(y_train)
+    members = [np.flatnonzero(y_train == label) for label in labels]
+    width = per_label * len(labels)
+    ids = np.full((X_query.shape[0], width), -1, dtype=np.int32)
+    scores = np.full((X_query.shape[0], width), -np.inf, dtype=np.float32)
+    X_train_t = X_train.T.tocsc()
+    for block in _blocks(X_query.shape[0], X_train.shape[0], block_elements):
+        dense = (X_query[block] @ X_train_t).toarray()
+        parts_ids, parts_scores = [], []
+        for rows in members:
+            local_ids, local_scores = _top_k(dense[:, rows], per_label)
+            parts_ids.append(np.where(local_ids >= 0, rows[np.maximum(local_ids, 0)], -1))
+            parts_scores.append(local_scores)
+        block_ids, block_scores = np.hstack(parts_ids), np.hstack(parts_scores)
+        order = np.argsort(-block_scores, axis=1, kind="stable")
+        ids[block] = np.take_along_axis(block_ids, order, axis=1)
+        scores[block] = np.take_along_axis(block_scores, order, axis=1)
+    return ids, scores
+
+
+def cache_path(entry, fold_name, split, k=None, per_label=None):
+    suffix = f"p{per_label}" if per_label else f"k{k}"
+    return Path(entry) / DEMONSTRATIONS_DIR_NAME / f"{fold_name}_{split}_{suffix}.npz"
+
+
+def select_demonstrations(corpus_dir, config_name, fold_name, split="test", k=8, per_label=None,
+                          store_root=None, block_elements=DEFAULT_BLOCK_ELEMENTS, force=False):
+    """
+    Demonstrações de cada exemplo de `split`: (ids, scores), com ids sendo
+    posições no train.jsonl do fold. Retorna None se a entrada do feature
+    store ainda não foi construída (build_feature_store.py).
+    """
+    entry = entry_dir(corpus_dir, config_name, store_root)
+    file_path = cache_path(entry, fold_name, split, k, per_label)
+    if file_path.exists() and not force:
+        with np.load(file_path) as data:
+            return data["ids"], data["scores"]
+
+    train = load_features(corpus_dir, config_name, fold_name, "train", store_root)
+    query = load_features(corpus_dir, config_name, fold_name, split, store_root)
+    if train is None or query is None:
+        return None
+    (X_train, y_train), (X_query, _) = train, query
+    idf = tfidf_weights(X_train)
+    X_train, X_query = apply_tfidf(X_train, idf), apply_tfidf(X_query, idf)
+
+    if per_label:
+        ids, scores = balanced_neighbors(X_query, X_train, y_train, per_label, block_elements)
+    else:
+        ids, scores = nearest_neighbors(X_query, X_train, k, block_elements)
+
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    np.savez(file_path, ids=ids, scores=scores)
+    return ids, scores
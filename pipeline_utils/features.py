@@ -0,0 +1,186 @@
+"""
+Feature store de matrizes esparsas para baselines.
+
+Baselines com HashingVectorizer (n-gramas de palavras e de caracteres)
+rodam em todos os corpora e folds a cada comparação de modelo, sempre
+re-tokenizando os mesmos JSONL. Aqui cada texto único do corpus é
+vetorizado uma única vez e a matriz CSR do pool é gravada como arrays .npy
+soltos (data, indices, indptr), que podem ser abertos com memory-map. Cada
+fold/split guarda só as linhas do pool que o compõem e os ids das labels.
+
+O diretório de cada entrada é
+'feature_store/<corpus>/<config>-<hash da config>-<hash do conteúdo>/'. O
+hash do conteúdo vem do manifest.json do corpus (ou do nome, tamanho e data
+de modificação dos JSONL, se não houver manifesto), do labels.json e da
+coluna de labels de cada split, que o manifesto não cobre; o da configuração
+inclui a versão do scikit-learn. Assim, textos, labels ou parâmetros
+diferentes nunca reaproveitam uma entrada antiga.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+import numpy as np
+
+from pipeline_utils.labels import LABELS_FILE_NAME, encode_labels, load_label_vocab
+from pipeline_utils.partition import MANIFEST_FILE_NAME
+
+FEATURE_STORE_DIR = Path(__file__).resolve().parents[1] / "feature_store"
+SPLITS = ["train", "valid", "test"]
+META_FILE_NAME = "meta.json"
+
+# parâmetros do sklearn.feature_extraction.text.HashingVectorizer
+VECTORIZER_CONFIGS = {
+    "word_1-2": {"analyzer": "word", "ngram_range": [1, 2], "n_features": 2**20},
+    "char_2-5": {"analyzer": "char_wb", "ngram_range": [2, 5], "n_features": 2**20},
+}
+_COMMON_PARAMS = {"alternate_sign": False, "norm": "l2", "lowercase": True}
+
+
+def config_key(config_name):
+    import sklearn
+
+    payload = json.dumps(
+        {"config": VECTORIZER_CONFIGS[config_name], "common": _COMMON_PARAMS, "sklearn": sklearn.__version__},
+        sort_keys=True,
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:12]
+
+
+# digest da coluna de labels por (arquivo, tamanho, data de modificação), para
+# não reler os JSONL a cada chamada de content_key no mesmo processo
+_label_digests = {}
+
+
+def label_column_digest(path):
+    """Hash da sequência de labels de um JSONL, na ordem das linhas."""
+    stat = Path(path).stat()
+    key = (str(path), stat.st_size, stat.st_mtime_ns)
+    if key not in _label_digests:
+        digest = hashlib.sha1()
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    digest.update(json.dumps(json.loads(line).get("label"), ensure_ascii=False).encode("utf-8"))
+                    digest.update(b"\n")
+        _label_digests[key] = digest.hexdigest()
+    return _label_digests[key]
+
+
+def content_key(corpus_dir):
+    """
+    Hash do conteúdo dos folds: o manifest.json (ou, na falta dele, o estado
+    dos JSONL), o labels.json e as colunas de labels de cada fold/split.
+    """
+    corpus_dir = Path(corpus_dir)
+    digest = hashlib.sha1()
+    manifest = corpus_dir / MANIFEST_FILE_NAME
+    sources = sorted((corpus_dir / "few_shot").glob("*/*.jsonl"))
+    if manifest.exists():
+        digest.update(manifest.read_bytes())
+    else:
+        for path in sources:
+            stat = path.stat()
+            digest.update(f"{path.relative_to(corpus_dir)}:{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8"))
+    vocab_path = corpus_dir / LABELS_FILE_NAME
+    if vocab_path.exists():
+        digest.update(vocab_path.read_bytes())
+    for path in sources:
+        digest.update(f"{path.relative_to(corpus_dir)}:{label_column_digest(path)}".encode("utf-8"))
+    return digest.hexdigest()[:12]
+
+
+def entry_dir(corpus_dir, config_name, store_root=None):
+    corpus_dir = Path(corpus_dir)
+    root = Path(store_root or FEATURE_STORE_DIR)
+    return root / corpus_dir.name / f"{config_name}-{config_key(config_name)}-{content_key(corpus_dir)}"
+
+
+def read_folds(corpus_dir):
+    """(textos únicos, labels, {fold: {split: linhas do pool}})."""
+    row_of, texts, labels, folds = {}, [], [], {}
+    for fold_dir in sorted(d for d in (Path(corpus_dir) / "few_shot").iterdir() if d.is_dir()):
+        folds[fold_dir.name] = {}
+        for split in SPLITS:
+            path = fold_dir / f"{split}.jsonl"
+            if not path.exists():
+                continue
+            rows = []
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    text = record.get("text", "")
+                    if text not in row_of:
+                        row_of[text] = len(texts)
+                        texts.append(text)
+                        labels.append(record.get("label"))
+                    rows.append(row_of[text])
+            folds[fold_dir.name][split] = np.array(rows, dtype=np.int32)
+    return texts, labels, folds
+
+
+def build_features(corpus_dir, config_name, store_root=None, force=False):
+    """
+    Vetoriza o pool do corpus com a configuração pedida e grava a entrada.
+    Retorna (diretório, True se foi construída agora / False se já existia).
+    Labels fora do labels.json geram ValueError.
+    """
+    from sklearn.feature_extraction.text import HashingVectorizer
+
+    target = entry_dir(corpus_dir, config_name, store_root)
+    if (target / META_FILE_NAME).exists() and not force:
+        return target, False
+
+    texts, labels, folds = read_folds(corpus_dir)
+    vocab = load_label_vocab(corpus_dir) or sorted({str(label) for label in labels})
+    label_ids = encode_labels(labels, vocab).astype(np.int32)
+
+    params = dict(VECTORIZER_CONFIGS[config_name], **_COMMON_PARAMS)
+    params["ngram_range"] = tuple(params["ngram_range"])
+    matrix = HashingVectorizer(dtype=np.float32, **params).transform(texts).tocsr()
+    matrix.sort_indices()
+
+    target.mkdir(parents=True, exist_ok=True)
+    np.save(target / "data.npy", matrix.data)
+    np.save(target / "indices.npy", matrix.indices.astype(np.int32))
+    np.save(target / "indptr.npy", matrix.indptr.astype(np.int64))
+    np.save(target / "labels.npy", label_ids)
+    for fold_name, splits in folds.items():
+        for split, rows in splits.items():
+            np.save(target / f"{fold_name}_{split}.npy", rows)
+
+    # o meta.json é gravado por último: sem ele a entrada é considerada incompleta
+    meta = {
+        "corpus": Path(corpus_dir).name, "config": config_name, "params": VECTORIZER_CONFIGS[config_name],
+        "shape": list(matrix.shape), "nnz": int(matrix.nnz), "labels": vocab,
+    }
+    with open(target / META_FILE_NAME, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2, ensure_ascii=False)
+    return target, True
+
+
+def load_pool(entry):
+    """Matriz CSR do pool sobre arrays memory-mapped, labels e o meta.json da entrada."""
+    from scipy.sparse import csr_matrix
+
+    entry = Path(entry)
+    meta = json.loads((entry / META_FILE_NAME).read_text(encoding="utf-8"))
+    arrays = [np.load(entry / f"{name}.npy", mmap_mode="r") for name in ["data", "indices", "indptr"]]
+    matrix = csr_matrix(tuple(arrays), shape=tuple(meta["shape"]), copy=False)
+    return matrix, np.load(entry / "labels.npy", mmap_mode="r"), meta
+
+
+def load_features(corpus_dir, config_name, fold_name, split, store_root=None):
+    """
+    (X, y) de um fold/split: as linhas do split extraídas da matriz do pool.
+    Retorna None se a entrada ainda não foi construída para o conteúdo atual.
+    """
+    entry = entry_dir(corpus_dir, config_name, store_root)
+    if not (entry / META_FILE_NAME).exists():
+        return None
+    matrix, labels, _ = load_pool(entry)
+    rows = np.load(entry / f"{fold_name}_{split}.npy")
+    return matrix[rows], np.asarray(labels[rows])
@@ -0,0 +1,123 @@
+"""
+Índice persistente de fingerprints por corpus.
+
+Cada script grava '<corpus>/fingerprints.npz' com um array ordenado de hashes
+uint64 por fold/split ('01_train', '01_valid', ...). Os hashes são calculados
+sobre uma versão normalizada do texto (minúsculas, sem pontuação), de modo que
+o mesmo exemplo formatado de jeitos diferentes em corpora distintos colida.
+As consultas entre corpora viram interseções de arrays ordenados.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from pipeline_utils.near_dup import normalize_for_shingles
+from pipeline_utils.trace import traced
+
+FINGERPRINTS_FILE_NAME = "fingerprints.npz"
+SPLITS = ["train", "valid", "test"]
+
+
+def text_fingerprints(texts):
+    """
+    Hash uint64 estável (independente de PYTHONHASHSEED) do texto normalizado.
+    """
+    normalized = normalize_for_shingles(texts)
+    return pd.util.hash_pandas_object(normalized, index=False).to_numpy(dtype=np.uint64)
+
+
+def index_key(fold_name, split):
+    return f"{fold_name}_{split}"
+
+
+@traced("write")
+def save_fingerprint_index(corpus_dir, fold_splits):
+    """
+    Salva o índice de um corpus. `fold_splits` mapeia nome do fold para um
+    dict {split: textos}.
+    """
+    arrays = {
+        index_key(fold_name, split): np.unique(text_fingerprints(texts))
+        for fold_name, splits in fold_splits.items()
+        for split, texts in splits.items()
+    }
+    corpus_dir = Path(corpus_dir)
+    corpus_dir.mkdir(parents=True, exist_ok=True)
+    file_path = corpus_dir / FINGERPRINTS_FILE_NAME
+    np.savez(file_path, **arrays)
+    print(f"Índice de fingerprints salvo em: {file_path}")
+    return file_path
+
+
+def load_fingerprint_index(corpus_dir):
+    """
+    Lê o índice de um corpus como dict {'<fold>_<split>': array ordenado}.
+    Retorna None se o arquivo não existir.
+    """
+    file_path = Path(corpus_dir) / FINGERPRINTS_FILE_NAME
+    if not file_path.exists():
+        return None
+    with np.load(file_path) as data:
+        return {key: data[key] for key in data.files}
+
+
+def build_fingerprint_index(corpus_dir):
+    """
+    Reconstrói o índice a partir dos JSONL em '<corpus>/few_shot/', para
+    corpora gerados antes da existência do índice.
+    """
+    fold_splits = {}
+    for fold_dir in sorted(d for d in (Path(corpus_dir) / "few_shot").iterdir() if d.is_dir()):
+        fold_splits[fold_dir.name] = {}
+        for split in SPLITS:
+            path = fold_dir / f"{split}.jsonl"
+            if not path.exists():
+                continue
+            with open(path, 'r', encoding='utf-8') as f:
+                texts = [json.loads(line).get("text", "") for line in f if line.strip()]
+            fold_splits[fold_dir.name][split] = texts
+    return save_fingerprint_index(corpus_dir, fold_splits)
+
+
+def split_fingerprints(index, split, fold_name=None):
+    """
+    Une os fingerprints de um split em todos os folds (ou em um só fold).
+    """
+    keys = [
+        key for key in index
+        if key.endswith(f"_{split}") and (fold_name is None or key == index_key(fold_name, split))
+    ]
+    if not keys:
+        return np.empty(0, dtype=np.uint64)
+    return np.unique(np.concatenate([index[key] for key in keys]))
+
+
+def fold_names(index):
+    return sorted({key.rsplit("_", 1)[0] for key in index})
+
+
+def overlap_matrix(indexes, split_a="train", split_b="test", fold_name=None, pooled=False):
+    """
+    Conta, para cada par de corpora (A, B), quantos exemplos do `split_a` de A
+    aparecem no `split_b` de B. Por padrão a comparação é fold a fold (treino
+    do fold k de A x teste do fold k de B), somada sobre os folds: cada
+    exemplo está no treino de 3 folds e no teste de 1, então unir os folds
+    antes compararia o pool inteiro de A com o de B. `pooled=True` une cada
+    split sobre todos os folds antes de comparar. Retorna (nomes, matriz int64).
+    """
+    names = list(indexes)
+    matrix = np.zeros((len(names), len(names)), dtype=np.int64)
+    if pooled or fold_name is not None:
+        folds = [fold_name]  # None: split_fingerprints une todos os folds
+    else:
+        folds = sorted(set().union(*(fold_names(index) for index in indexes.values())))
+    for fold in folds:
+        left = [split_fingerprints(indexes[name], split_a, fold) for name in names]
+        right = [split_fingerprints(indexes[name], split_b, fold) for name in names]
+        for i, a in enumerate(left):
+            for j, b in enumerate(right):
+                matrix[i, j] += len(np.intersect1d(a, b, assume_unique=True))
+    return names, matrix
@@ -0,0 +1,164 @@
+"""
+Divisão estratificada em folds, compartilhada pelos scripts.
+
+As linhas são ordenadas por label (em ordem aleatória de labels) e, dentro de
+cada label, em ordem aleatória; depois são distribuídas em rodízio entre os K
+folds. Como o rodízio continua de um label para o seguinte, cada label fica
+com no máximo uma linha de diferença entre folds, e os folds também. Tudo é
+um lexsort do NumPy, sem laço por classe, e o resultado depende só dos labels
+e da semente.
+
+Validação cruzada repetida: `save_repeated_cv` grava o pool deduplicado uma
+única vez em '<corpus>/repeated_cv/pool.jsonl' e, para cada combinação de
+semente e número de folds, um 'fold_ids_seed<S>_k<K>.npy' com o fold de cada
+linha do pool (1 byte por linha). `rotation_splits` reconstrói treino, valid
+e teste com o mesmo rodízio dos scripts (teste = fold i, valid = fold i+1).
+
+Curvas de aprendizado: cada fold ganha um 'train_order.npy', uma permutação
+estratificada do train.jsonl em que qualquer prefixo tem os labels na mesma
+proporção do treino inteiro (menos de 2 exemplos de diferença por label).
+Os subconjuntos de 1%, 5%, ... 100% ficam aninhados e saem como fatias do
+mesmo array.
+"""
+
+import math
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from pipeline_utils.trace import traced
+
+REPEATED_CV_DIR_NAME = "repeated_cv"
+POOL_FILE_NAME = "pool.jsonl"
+TRAIN_ORDER_FILE_NAME = "train_order.npy"
+
+
+def stratified_fold_ids(labels, num_folds, seed):
+    """
+    Fold (0..num_folds-1) de cada linha, estratificado por `labels`. Valores
+    nulos formam uma classe própria.
+    """
+    codes, uniques = pd.factorize(pd.Series(labels).reset_index(drop=True), use_na_sentinel=False)
+    rng = np.random.default_rng(seed)
+    label_rank = rng.permutation(len(uniques))
+    order = np.lexsort((rng.random(len(codes)), label_rank[codes]))
+    fold_ids = np.empty(len(codes), dtype=np.int64)
+    fold_ids[order] = np.arange(len(codes)) % num_folds
+    return fold_ids
+
+
+def fold_positions(fold_ids, num_folds):
+    """Posições de cada fold, em ordem crescente (mantém a ordem do DataFrame)."""
+    order = np.argsort(fold_ids, kind="stable")
+    return np.split(order, np.cumsum(np.bincount(fold_ids, minlength=num_folds))[:-1])
+
+
+def stratified_folds(labels, num_folds, seed):
+    """Posições das linhas de cada um dos `num_folds` folds, estratificados por `labels`."""
+    return fold_positions(stratified_fold_ids(labels, num_folds, seed), num_folds)
+
+
+def fold_ids_file_name(seed, num_folds):
+    return f"fold_ids_seed{seed}_k{num_folds}.npy"
+
+
+@traced("write")
+def save_repeated_cv(corpus_dir, pool_df, label_column, seeds, fold_counts, save_pool):
+    """
+    Grava o pool e as divisões de todas as combinações de `seeds` e
+    `fold_counts`. `save_pool(df, caminho)` é o gravador de JSONL do script,
+    para que o pool tenha o mesmo formato dos folds.
+    """
+    cv_dir = Path(corpus_dir) / REPEATED_CV_DIR_NAME
+    cv_dir.mkdir(parents=True, exist_ok=True)
+    for stale in cv_dir.glob("fold_ids_*.npy"):
+        stale.unlink()
+
+    save_pool(pool_df, cv_dir / POOL_FILE_NAME)
+    labels = pool_df[label_column]
+    for seed in seeds:
+        for num_folds in fold_counts:
+            fold_ids = stratified_fold_ids(labels, num_folds, seed)
+            np.save(cv_dir / fold_ids_file_name(seed, num_folds),
+                    fold_ids.astype(np.uint8 if num_folds <= 255 else np.uint16))
+    print(f"{len(seeds) * len(fold_counts)} divisão(ões) de validação cruzada repetida salvas em: {cv_dir}")
+    return cv_dir
+
+
+def load_fold_ids(cv_dir, seed, num_folds):
+    """Fold de cada linha do pool para a semente e o número de folds pedidos (memory-mapped)."""
+    return np.load(Path(cv_dir) / fold_ids_file_name(seed, num_folds), mmap_mode="r")
+
+
+def rotation_splits(fold_ids, fold, num_folds):
+    """
+    Posições de treino, valid e teste do fold `fold` (a partir de 0), com o
+    rodízio dos scripts: o teste é o fold, o valid é o fold seguinte.
+    """
+    valid_fold = (fold + 1) % num_folds
+    return {
+        "train": np.flatnonzero((fold_ids != fold) & (fold_ids != valid_fold)),
+        "valid": np.flatnonzero(fold_ids == valid_fold),
+        "test": np.flatnonzero(fold_ids == fold),
+    }
+
+
+def split_rows(values, fold_positions, fold, num_folds):
+    """
+    Linhas de `values` (alinhadas ao DataFrame embaralhado) que vão para o
+    treino, valid e teste do fold `fold` (a partir de 0), na mesma ordem em
+    que os scripts concatenam os folds nos JSONL.
+    """
+    values = np.asarray(values)
+    valid_fold = (fold + 1) % num_folds
+    train_folds = [j for j in range(num_folds) if j != fold and j != valid_fold]
+    return {
+        "train": np.concatenate([values[fold_positions[j]] for j in train_folds]),
+        "valid": values[fold_positions[valid_fold]],
+        "test": values[fold_positions[fold]],
+    }
+
+
+def stratified_prefix_order(labels, seed):
+    """
+    Permutação das linhas em que todo prefixo é estratificado. Cada label é
+    embaralhado e suas linhas recebem posições igualmente espaçadas em
+    [0, 1) (com deslocamento aleatório por label); a ordem final segue essas
+    posições, intercalando os labels na proporção de cada um.
+    """
+    codes, uniques = pd.factorize(pd.Series(labels).reset_index(drop=True), use_na_sentinel=False)
+    rng = np.random.default_rng(seed)
+    counts = np.bincount(codes, minlength=len(uniques))
+    grouped = np.lexsort((rng.random(len(codes)), codes))
+    rank = np.empty(len(codes), dtype=np.int64)
+    rank[grouped] = np.arange(len(codes)) - (np.cumsum(counts) - counts)[codes[grouped]]
+    position = (rank + rng.random(len(uniques))[codes]) / counts[codes]
+    return np.lexsort((rng.random(len(codes)), position))
+
+
+@traced("write")
+def save_train_order(fold_dir, labels, seed):
+    """Grava o train_order.npy do fold; `labels` na ordem do train.jsonl."""
+    order = stratified_prefix_order(labels, seed)
+    file_path = Path(fold_dir) / TRAIN_ORDER_FILE_NAME
+    np.save(file_path, order.astype(np.int32 if len(order) < 2**31 else np.int64))
+    return file_path
+
+
+def load_train_order(fold_dir):
+    """Permutação do treino do fold (memory-mapped). Retorna None se não existir."""
+    file_path = Path(fold_dir) / TRAIN_ORDER_FILE_NAME
+    if not file_path.exists():
+        return None
+    return np.load(file_path, mmap_mode="r")
+
+
+def train_subset(train_order, fraction):
+    """
+    Posições do subconjunto de treino com a fração pedida (arredondada para
+    cima): uma fatia do array, sem cópia. Frações menores são prefixos das
+    maiores.
+    """
+    size = min(len(train_order), math.ceil(fraction * len(train_order)))
+    return train_order[:size]
@@ -0,0 +1,90 @@
+"""
+Vocabulário de labels por corpus.
+
+Cada script grava um `labels.json` estável ao lado da pasta `few_shot/`,
+derivado do seu LABEL_MAP/VALID_LABELS. Opcionalmente os folds também levam a
+coluna 'label_id', com o índice da label nesse vocabulário.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from pipeline_utils.trace import traced
+
+LABELS_FILE_NAME = "labels.json"
+LABEL_ID_COLUMN = "label_id"
+
+
+def build_label_vocab(declared_labels, observed_labels=None):
+    """
+    Monta o vocabulário na ordem em que as labels foram declaradas (valores do
+    LABEL_MAP ou VALID_LABELS), sem repetições. Labels observadas nos dados e
+    não declaradas entram no final, em ordem alfabética.
+    """
+    vocab = [str(label) for label in dict.fromkeys(declared_labels or [])]
+    if observed_labels is not None:
+        known = set(vocab)
+        vocab.extend(sorted({str(label) for label in observed_labels} - known))
+    return vocab
+
+
+def save_label_vocab(corpus_dir, vocab):
+    """
+    Salva o vocabulário em '<corpus_dir>/labels.json'.
+    """
+    corpus_dir = Path(corpus_dir)
+    corpus_dir.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "labels": list(vocab),
+        "label2id": {label: i for i, label in enumerate(vocab)},
+    }
+    file_path = corpus_dir / LABELS_FILE_NAME
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+    return file_path
+
+
+def load_label_vocab(corpus_dir):
+    """
+    Lê o '<corpus_dir>/labels.json'. Retorna a lista de labels ou None se o
+    arquivo não existir.
+    """
+    file_path = Path(corpus_dir) / LABELS_FILE_NAME
+    if not file_path.exists():
+        return None
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)["labels"]
+
+
+@traced("write")
+def write_label_vocab(corpus_dir, declared_labels, observed_labels):
+    """
+    Monta e salva o vocabulário de um corpus. Retorna a lista de labels.
+    """
+    vocab = build_label_vocab(declared_labels, observed_labels)
+    file_path = save_label_vocab(corpus_dir, vocab)
+    print(f"Vocabulário com {len(vocab)} labels salvo em: {file_path}")
+    return vocab
+
+
+def encode_labels(labels, vocab):
+    """
+    Converte uma coluna de labels (strings) no array de ids do vocabulário,
+    usando o menor tipo inteiro possível. Labels fora do vocabulário geram
+    ValueError.
+    """
+    codes = pd.Categorical(pd.Series(labels).astype(str), categories=list(vocab)).codes
+    if (codes < 0).any():
+        unknown = sorted(set(pd.Series(labels)[codes < 0].astype(str)))
+        raise ValueError(f"Labels fora do vocabulário: {unknown}")
+    return np.asarray(codes)
+
+
+def decode_labels(label_ids, vocab):
+    """
+    Converte um array de ids de volta para as labels descritivas.
+    """
+    return np.asarray(vocab, dtype=object)[np.asarray(label_ids)]
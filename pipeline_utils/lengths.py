@@ -0,0 +1,131 @@
+"""
+Comprimentos pré-calculados e batches agrupados por tamanho.
+
+Cada fold ganha um 'lengths.npz' com, para cada split, o comprimento de cada
+exemplo em caracteres ('<split>_chars') e em tokens separados por espaço
+('<split>_tokens'), na ordem do JSONL. Os comprimentos vão de poucos tokens
+(tweets do Kaggle) a milhares (acórdãos do RulingBR e do CourtDecision), e
+batches aleatórios gastam a maior parte do processamento com padding.
+
+`LengthBucketSampler` monta batches de exemplos com tamanhos parecidos sob
+um orçamento de tokens com padding (tamanho do batch x maior exemplo). A cada
+época os exemplos são embaralhados, ordenados por tamanho dentro de janelas
+grandes e empacotados; a ordem dos batches é embaralhada de novo. Tudo
+depende só da semente e da época, então cada worker monta a mesma lista e
+fica com a sua fatia (`num_shards` / `shard_id`). O sampler devolve listas de
+posições e pode ser passado como `batch_sampler` de um DataLoader.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from pipeline_utils.trace import traced
+
+LENGTHS_FILE_NAME = "lengths.npz"
+
+
+def text_lengths(texts):
+    """(caracteres, tokens separados por espaço) de cada texto, como int32."""
+    texts = pd.Series(texts, dtype=object).fillna("").astype(str)
+    chars = texts.str.len().to_numpy(dtype=np.int32)
+    tokens = texts.str.split().str.len().to_numpy(dtype=np.int32)
+    return chars, tokens
+
+
+@traced("write")
+def save_lengths(fold_dir, splits):
+    """Grava o lengths.npz do fold. `splits` mapeia split para textos."""
+    arrays = {}
+    for split, texts in splits.items():
+        arrays[f"{split}_chars"], arrays[f"{split}_tokens"] = text_lengths(texts)
+    file_path = Path(fold_dir) / LENGTHS_FILE_NAME
+    np.savez(file_path, **arrays)
+    return file_path
+
+
+def load_lengths(fold_dir, split, unit="tokens"):
+    """Comprimentos de um split em 'tokens' ou 'chars'. Retorna None se não existir."""
+    file_path = Path(fold_dir) / LENGTHS_FILE_NAME
+    if not file_path.exists():
+        return None
+    with np.load(file_path) as data:
+        return data[f"{split}_{unit}"]
+
+
+def pack_sorted(lengths, max_tokens):
+    """
+    Divide posições já ordenadas por tamanho crescente em batches cujo custo
+    com padding (quantidade x último tamanho) cabe em `max_tokens`. Um
+    exemplo maior que o orçamento vira um batch sozinho.
+    """
+    lengths = np.maximum(np.asarray(lengths, dtype=np.int64), 1)
+    bounds = [0]
+    start = 0
+    while start < len(lengths):
+        # com tamanhos crescentes, o batch tem no máximo max_tokens // lengths[start] exemplos
+        window = lengths[start:start + max(max_tokens // lengths[start], 1)]
+        cost = np.arange(1, len(window) + 1) * window
+        start += max(int(np.searchsorted(cost, max_tokens, side="right")), 1)
+        bounds.append(start)
+    return bounds
+
+
+class LengthBucketSampler:
+    def __init__(self, lengths, max_tokens, seed=0, window=100, shuffle=True, num_shards=1, shard_id=0):
+        """
+        `lengths`: tamanho de cada exemplo (ex.: load_lengths(...)).
+        `window`: a ordenação por tamanho é feita em janelas de
+        `window` x (exemplos de um batch médio), mantendo aleatoriedade entre
+        épocas. Com `num_shards` > 1, todos os shards recebem o mesmo número
+        de batches (os que sobram são descartados na época).
+        """
+        if not 0 <= shard_id < num_shards:
+            raise ValueError(f"shard_id {shard_id} fora de [0, {num_shards})")
+        self.lengths = np.maximum(np.asarray(lengths, dtype=np.int64), 1)
+        self.max_tokens = int(max_tokens)
+        self.seed = seed
+        self.window = window
+        self.shuffle = shuffle
+        self.num_shards = num_shards
+        self.shard_id = shard_id
+        self.epoch = 0
+
+    def set_epoch(self, epoch):
+        self.epoch = epoch
+
+    def _all_batches(self):
+        rng = np.random.default_rng([self.seed, self.epoch])
+        n = len(self.lengths)
+        order = rng.permutation(n) if self.shuffle else np.arange(n)
+
+        per_batch = max(self.max_tokens // max(int(np.median(self.lengths)) if n else 1, 1), 1)
+        chunk = max(per_batch * self.window, 1)
+        batches = []
+        for begin in range(0, n, chunk):
+            positions = order[begin:begin + chunk]
+            positions = positions[np.argsort(self.lengths[positions], kind="stable")]
+            bounds = pack_sorted(self.lengths[positions], self.max_tokens)
+            batches.extend(positions[a:b] for a, b in zip(bounds[:-1], bounds[1:]))
+
+        if self.shuffle:
+            batches = [batches[i] for i in rng.permutation(len(batches))]
+        usable = len(batches) - len(batches) % self.num_shards
+        return batches[:usable]
+
+    def __iter__(self):
+        for batch in self._all_batches()[self.shard_id::self.num_shards]:
+            yield batch.tolist()
+
+    def __len__(self):
+        return len(self._all_batches()) // self.num_shards
+
+    def padding_ratio(self):
+        """Fração dos tokens com padding que é padding, na época atual (todos os shards)."""
+        batches = self._all_batches()
+        if not batches:
+            return 0.0
+        real = sum(int(self.lengths[b].sum()) for b in batches)
+        padded = sum(len(b) * int(self.lengths[b].max()) for b in batches)
+        return 1.0 - real / padded
@@ -0,0 +1,212 @@
+"""
+Mistura de vários corpora em um único fluxo de exemplos, para treino multi-tarefa.
+
+Os corpora do registro (`DATASETS` do validate_pipeline.py) vão de poucas
+centenas a centenas de milhares de exemplos. A probabilidade de cada corpus
+vem de pesos explícitos ou de uma temperatura T sobre os tamanhos dos splits:
+p_i ∝ n_i^(1/T). T = 1 é proporcional ao tamanho; T maior aproxima da
+distribuição uniforme e dá mais espaço aos corpora pequenos.
+
+`MixtureIterator` lê cada JSONL em uma thread de fundo (com uma fila
+limitada de exemplos pré-carregados) e intercala os corpora com escolhas
+sorteadas em blocos de `BLOCK_SIZE`; o bloco b usa a semente (seed, b), então
+a sequência depende só da semente e da posição. Um corpus que chega ao fim
+recomeça do início (nova época), e o fluxo é infinito.
+
+`state_dict()` devolve a posição (passo global e, por corpus, época e byte
+da próxima linha) em um dicionário serializável em JSON; passado como
+`state=`, o iterador continua exatamente de onde parou.
+"""
+
+import json
+import queue
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from pipeline_utils.partition import load_manifest
+
+BLOCK_SIZE = 4096
+PREFETCH = 1024
+DEFAULT_TEMPERATURE = 2.0
+DEFAULT_SEED = 42
+
+
+def split_size(corpus_dir, fold, split):
+    """Exemplos do split: a contagem do manifest.json ou, na falta dele, as linhas não vazias do JSONL."""
+    manifest = load_manifest(corpus_dir)
+    if manifest is not None and split in manifest[1].get(fold, {}):
+        return manifest[1][fold][split].count
+    path = Path(corpus_dir) / "few_shot" / fold / f"{split}.jsonl"
+    if not path.exists():
+        return 0
+    with open(path, "rb") as f:
+        return sum(1 for line in f if line.strip())
+
+
+def mixture_probabilities(sizes, temperature=DEFAULT_TEMPERATURE, weights=None):
+    """
+    Probabilidade de cada corpus, na ordem de `sizes` ({nome: exemplos}).
+    Com `weights` ({nome: peso}), os pesos são normalizados e a temperatura
+    é ignorada; corpora sem peso ficam com 0 e nomes fora de `sizes` geram
+    ValueError.
+    """
+    if weights is not None:
+        unknown = sorted(set(weights) - set(sizes))
+        if unknown:
+            raise ValueError(f"Corpora desconhecidos nos pesos: {', '.join(unknown)}.")
+        raw = np.array([float(weights.get(name, 0.0)) for name in sizes])
+    else:
+        if temperature <= 0:
+            raise ValueError(f"Temperatura deve ser positiva, recebido {temperature}.")
+        raw = np.array(list(sizes.values()), dtype=np.float64) ** (1.0 / temperature)
+    if (raw < 0).any() or raw.sum() <= 0:
+        raise ValueError("Pesos da mistura devem ser não negativos e ter soma positiva.")
+    return raw / raw.sum()
+
+
+class _SourceReader(threading.Thread):
+    """Lê um JSONL em ciclo a partir de (época, offset) e enfileira (registro, época, próximo offset)."""
+
+    def __init__(self, path, epoch, offset, prefetch):
+        super().__init__(daemon=True)
+        self.path = path
+        self.epoch = epoch
+        self.offset = offset
+        self.queue = queue.Queue(maxsize=prefetch)
+        self.stop_event = threading.Event()
+
+    def _put(self, item):
+        while not self.stop_event.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def run(self):
+        epoch, offset = self.epoch, self.offset
+        try:
+            while not self.stop_event.is_set():
+                with open(self.path, "rb") as f:
+                    f.seek(offset)
+                    for line in f:
+                        offset += len(line)
+                        if line.strip() and not self._put((json.loads(line), epoch, offset)):
+                            return
+                epoch, offset = epoch + 1, 0
+        except Exception as error:  # repassado ao consumidor no próximo exemplo deste corpus
+            self._put(error)
+
+
+class MixtureIterator:
+    """
+    Fluxo infinito de registros dos corpora em `sources` (dicionários com
+    'name', 'task', 'path' do JSONL e 'size'). Cada registro ganha os campos
+    'corpus' e 'task'. Corpora vazios ou sem arquivo são ignorados.
+    """
+
+    def __init__(self, sources, temperature=DEFAULT_TEMPERATURE, weights=None, seed=DEFAULT_SEED,
+                 prefetch=PREFETCH, state=None):
+        self.sources = [s for s in sources if s["size"] > 0 and Path(s["path"]).exists()]
+        if not self.sources:
+            raise ValueError("Nenhum corpus com exemplos para a mistura.")
+        sizes = {s["name"]: s["size"] for s in self.sources}
+        self.probabilities = mixture_probabilities(sizes, temperature, weights)
+        self.seed = seed
+        self.prefetch = prefetch
+        self.step = 0
+        self.positions = {s["name"]: {"epoch": 0, "offset": 0, "examples": 0} for s in self.sources}
+        self._readers = None
+        self._block = (None, None)
+        if state is not None:
+            self.load_state_dict(state)
+
+    @classmethod
+    def from_registry(cls, fold="01", split="train", datasets=None, base_dir=None, **kwargs):
+        """Mistura do mesmo fold/split de todos os corpora do registro (ou de `datasets`)."""
+        from validate_pipeline import BASE_DIR, DATASETS
+
+        base_dir = Path(base_dir or BASE_DIR)
+        sources = []
+        for ds in datasets or DATASETS:
+            corpus_dir = base_dir / ds["task"] / ds["name"]
+            sources.append({
+                "name": ds["name"], "task": ds["task"],
+                "path": corpus_dir / "few_shot" / fold / f"{split}.jsonl",
+                "size": split_size(corpus_dir, fold, split),
+            })
+        return cls(sources, **kwargs)
+
+    def state_dict(self):
+        return {
+            "seed": self.seed,
+            "step": self.step,
+            "probabilities": {s["name"]: float(p) for s, p in zip(self.sources, self.probabilities)},
+            "sources": {name: dict(position) for name, position in self.positions.items()},
+        }
+
+    def load_state_dict(self, state):
+        """Restaura a posição de um `state_dict()`; a mistura precisa ser a mesma."""
+        if self._readers is not None:
+            raise RuntimeError("A posição só pode ser restaurada antes da primeira leitura.")
+        expected = {s["name"]: float(p) for s, p in zip(self.sources, self.probabilities)}
+        saved = state["probabilities"]
+        if state["seed"] != self.seed or set(saved) != set(expected) or \
+                not np.allclose([saved[name] for name in expected], list(expected.values())):
+            raise ValueError("O checkpoint é de outra mistura (semente, corpora ou probabilidades diferentes).")
+        self.step = int(state["step"])
+        self.positions = {name: dict(position) for name, position in state["sources"].items()}
+
+    def _start(self):
+        self._readers = {}
+        for s, p in zip(self.sources, self.probabilities):
+            if p == 0:
+                continue  # nunca sorteado: não vale ocupar uma thread e a fila
+            position = self.positions[s["name"]]
+            reader = _SourceReader(s["path"], position["epoch"], position["offset"], self.prefetch)
+            reader.start()
+            self._readers[s["name"]] = reader
+
+    def _choice(self, step):
+        block, index = divmod(step, BLOCK_SIZE)
+        if self._block[0] != block:
+            rng = np.random.default_rng([self.seed, block])
+            self._block = (block, rng.choice(len(self.sources), size=BLOCK_SIZE, p=self.probabilities))
+        return self.sources[self._block[1][index]]
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._readers is None:
+            self._start()
+        source = self._choice(self.step)
+        item = self._readers[source["name"]].queue.get()
+        if isinstance(item, Exception):
+            self.close()
+            raise item
+        record, epoch, offset = item
+        position = self.positions[source["name"]]
+        position["epoch"], position["offset"] = epoch, offset
+        position["examples"] += 1
+        self.step += 1
+        return dict(record, corpus=source["name"], task=source["task"])
+
+    def close(self):
+        """Para as threads de leitura. A posição continua disponível em `state_dict()`."""
+        if self._readers is None:
+            return
+        for reader in self._readers.values():
+            reader.stop_event.set()
+        for reader in self._readers.values():
+            reader.join()
+        self._readers = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
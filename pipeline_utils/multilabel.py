@@ -0,0 +1,131 @@
+"""
+Labels múltiplas por exemplo, guardadas como bitsets.
+
+Campos como o 'categoria' do Eniac trazem várias labels separadas por
+vírgula. `parse_label_lists` quebra a coluna com operações vetorizadas do
+pandas e devolve uma matriz booleana (exemplos x labels) e o vocabulário.
+No disco a matriz fica empacotada com `np.packbits` (1 bit por label, ceil(L/8)
+bytes por exemplo):
+
+- '<corpus>/multilabel.json' guarda o vocabulário, na ordem dos bits;
+- cada fold ganha um 'multilabel.npz' com, para cada split, a matriz
+  empacotada na ordem do JSONL.
+
+`iterative_stratification` divide os exemplos em folds mantendo a proporção
+de cada label (Sechidis et al., 2011): a label mais rara ainda não
+distribuída é tratada primeiro, e cada exemplo dela vai para o fold que mais
+precisa dessa label (empates: o fold que mais precisa de exemplos, depois
+sorteio).
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from pipeline_utils.folds import fold_positions
+from pipeline_utils.trace import traced
+
+MULTILABEL_VOCAB_FILE_NAME = "multilabel.json"
+MULTILABEL_FILE_NAME = "multilabel.npz"
+
+
+def parse_label_lists(values, sep=","):
+    """
+    (matriz booleana exemplos x labels, vocabulário ordenado) de uma coluna de
+    labels separadas por `sep`. Espaços nas pontas e itens vazios são ignorados.
+    """
+    values = pd.Series(values).reset_index(drop=True)
+    items = values.fillna("").astype(str).str.split(sep).explode().str.strip()
+    items = items[items != ""]
+    vocab = sorted(items.unique())
+    codes = pd.Categorical(items, categories=vocab).codes
+    matrix = np.zeros((len(values), len(vocab)), dtype=bool)
+    matrix[items.index.to_numpy(), codes] = True
+    return matrix, vocab
+
+
+def pack_labels(matrix):
+    return np.packbits(np.asarray(matrix, dtype=bool), axis=1, bitorder="little")
+
+
+def unpack_labels(packed, num_labels):
+    return np.unpackbits(packed, axis=1, count=num_labels, bitorder="little").astype(bool)
+
+
+def iterative_stratification(matrix, num_folds, seed):
+    """Fold (0..num_folds-1) de cada exemplo da matriz de labels."""
+    matrix = np.asarray(matrix, dtype=bool)
+    n, num_labels = matrix.shape
+    rng = np.random.default_rng(seed)
+    desired_total = np.full(num_folds, n / num_folds)
+    desired = np.outer(np.full(num_folds, 1 / num_folds), matrix.sum(axis=0))
+    fold_ids = np.full(n, -1, dtype=np.int64)
+    remaining = matrix.copy()
+
+    while remaining.any():
+        counts = remaining.sum(axis=0)
+        label = int(np.argmin(np.where(counts > 0, counts, np.iinfo(np.int64).max)))
+        for row in rng.permutation(np.flatnonzero(remaining[:, label])):
+            need = desired[:, label]
+            candidates = np.flatnonzero(need == need.max())
+            if len(candidates) > 1:
+                totals = desired_total[candidates]
+                candidates = candidates[totals == totals.max()]
+            fold = int(rng.choice(candidates))
+            fold_ids[row] = fold
+            desired[fold] -= matrix[row]
+            desired_total[fold] -= 1
+            remaining[row] = False
+
+    # exemplos sem label: para os folds que ainda precisam de exemplos
+    for row in rng.permutation(np.flatnonzero(fold_ids < 0)):
+        candidates = np.flatnonzero(desired_total == desired_total.max())
+        fold = int(rng.choice(candidates))
+        fold_ids[row] = fold
+        desired_total[fold] -= 1
+    return fold_ids
+
+
+def multilabel_folds(matrix, num_folds, seed):
+    """Posições dos exemplos de cada fold, com estratificação iterativa."""
+    return fold_positions(iterative_stratification(matrix, num_folds, seed), num_folds)
+
+
+@traced("write")
+def write_multilabel_vocab(corpus_dir, vocab):
+    corpus_dir = Path(corpus_dir)
+    corpus_dir.mkdir(parents=True, exist_ok=True)
+    file_path = corpus_dir / MULTILABEL_VOCAB_FILE_NAME
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump({"labels": list(vocab), "num_labels": len(vocab)}, f, indent=2, ensure_ascii=False)
+    print(f"Vocabulário multi-label ({len(vocab)} labels) salvo em: {file_path}")
+    return file_path
+
+
+def load_multilabel_vocab(corpus_dir):
+    """Labels na ordem dos bits. Retorna None se não existir."""
+    file_path = Path(corpus_dir) / MULTILABEL_VOCAB_FILE_NAME
+    if not file_path.exists():
+        return None
+    with open(file_path, "r", encoding="utf-8") as f:
+        return json.load(f)["labels"]
+
+
+@traced("write")
+def save_multilabel(fold_dir, splits, num_labels):
+    """Grava o multilabel.npz do fold. `splits` mapeia split para matrizes booleanas."""
+    arrays = {split: pack_labels(matrix) for split, matrix in splits.items()}
+    file_path = Path(fold_dir) / MULTILABEL_FILE_NAME
+    np.savez(file_path, num_labels=num_labels, **arrays)
+    return file_path
+
+
+def load_multilabel(fold_dir, split):
+    """Matriz booleana (exemplos do split x labels). Retorna None se não existir."""
+    file_path = Path(fold_dir) / MULTILABEL_FILE_NAME
+    if not file_path.exists():
+        return None
+    with np.load(file_path) as data:
+        return unpack_labels(data[split], int(data["num_labels"]))
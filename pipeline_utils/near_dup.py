@@ -0,0 +1,216 @@
+"""
+Detecção de quase-duplicatas com MinHash + LSH.
+
+Os textos são normalizados (minúsculas, sem pontuação, espaços colapsados),
+quebrados em shingles de caracteres e resumidos em assinaturas MinHash. O LSH
+agrupa as assinaturas em faixas (bands): só textos que colidem em alguma faixa
+viram candidatos, e cada candidato é confirmado pela similaridade estimada.
+Todo o processamento é feito em lotes com NumPy, sem comparar todos os pares.
+
+Usado como etapa de deduplicação nos scripts de processamento e como
+relatório de vazamento no validate_pipeline.py.
+"""
+
+import numpy as np
+import pandas as pd
+
+from pipeline_utils.trace import traced
+
+DEFAULT_NUM_PERM = 128
+DEFAULT_SHINGLE_SIZE = 5
+DEFAULT_THRESHOLD = 0.8
+DEFAULT_SEED = 1
+DEFAULT_BATCH_SIZE = 50_000
+
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+_SHINGLE_MULT = np.uint64(0x100000001B3)
+_BAND_MULT = np.uint64(0x9E3779B97F4A7C15)
+
+
+def normalize_for_shingles(texts):
+    """
+    Normalização leve usada só para comparar textos: minúsculas, pontuação
+    trocada por espaço e espaços colapsados.
+    """
+    s = pd.Series(texts, dtype=object).fillna('').astype(str)
+    s = s.str.lower().str.replace(r'[^\w\s]', ' ', regex=True)
+    return s.str.replace(r'\s+', ' ', regex=True).str.strip()
+
+
+def _shingle_hashes(texts, shingle_size):
+    """
+    Calcula os hashes (uint32) de todos os shingles de bytes de um lote.
+    Retorna (hashes, starts): os shingles do documento i estão em
+    hashes[starts[i]:starts[i + 1]].
+    """
+    encoded = [t.encode('utf-8') for t in texts]
+    lengths = np.fromiter((len(b) for b in encoded), dtype=np.int64, count=len(encoded))
+
+    # cada documento é seguido de shingle_size bytes nulos, assim nenhum
+    # shingle atravessa a fronteira entre documentos
+    pad = b'\x00' * shingle_size
+    buf = np.frombuffer(pad.join(encoded) + pad, dtype=np.uint8).astype(np.uint64)
+    doc_offsets = np.concatenate(([0], np.cumsum(lengths + shingle_size)[:-1]))
+
+    # documentos menores que o shingle ainda geram um shingle
+    counts = np.maximum(lengths - shingle_size + 1, 1)
+    starts = np.concatenate(([0], np.cumsum(counts)))
+    positions = np.repeat(doc_offsets - starts[:-1], counts) + np.arange(starts[-1])
+
+    h = np.zeros(len(positions), dtype=np.uint64)
+    for j in range(shingle_size):
+        h = h * _SHINGLE_MULT + buf[positions + j]
+    return ((h >> np.uint64(32)) ^ (h & _MAX_HASH)).astype(np.uint32), starts
+
+
+def _permutations(num_perm, seed):
+    """
+    Permutações afins x -> a * x + b (mod 2^32), com 'a' ímpar. Trabalhar em
+    uint32 mantém a matriz intermediária na metade do tamanho.
+    """
+    rng = np.random.default_rng(seed)
+    a = rng.integers(0, 2**32, size=num_perm, dtype=np.uint32) | np.uint32(1)
+    b = rng.integers(0, 2**32, size=num_perm, dtype=np.uint32)
+    return a, b
+
+
+def minhash_signatures(texts, num_perm=DEFAULT_NUM_PERM, shingle_size=DEFAULT_SHINGLE_SIZE,
+                       seed=DEFAULT_SEED, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Calcula as assinaturas MinHash de uma sequência de textos.
+    Retorna uma matriz (n_textos, num_perm) de uint32.
+    """
+    normalized = normalize_for_shingles(texts).tolist()
+    a, b = _permutations(num_perm, seed)
+    signatures = np.empty((len(normalized), num_perm), dtype=np.uint32)
+
+    for lo in range(0, len(normalized), batch_size):
+        batch = normalized[lo:lo + batch_size]
+        hashes, starts = _shingle_hashes(batch, shingle_size)
+        permuted = np.empty_like(hashes)
+        for p in range(num_perm):
+            np.multiply(hashes, a[p], out=permuted)
+            permuted += b[p]
+            signatures[lo:lo + len(batch), p] = np.minimum.reduceat(permuted, starts[:-1])
+    return signatures
+
+
+def lsh_params(threshold, num_perm=DEFAULT_NUM_PERM):
+    """
+    Escolhe (bands, rows) com bands * rows <= num_perm minimizando a soma das
+    áreas de falso positivo e falso negativo em torno do limiar.
+    """
+    s = np.linspace(0.0, 1.0, 201)
+    best, best_err = (1, num_perm), np.inf
+    for bands in range(1, num_perm + 1):
+        for rows in range(1, num_perm // bands + 1):
+            prob = 1.0 - (1.0 - s ** rows) ** bands
+            fp = np.where(s < threshold, prob, 0.0).mean()
+            fn = np.where(s >= threshold, 1.0 - prob, 0.0).mean()
+            if fp + fn < best_err:
+                best, best_err = (bands, rows), fp + fn
+    return best
+
+
+def _band_keys(signatures, bands, rows):
+    """Gera uma chave uint64 por (documento, faixa)."""
+    keys = np.empty((len(signatures), bands), dtype=np.uint64)
+    for band in range(bands):
+        block = signatures[:, band * rows:(band + 1) * rows].astype(np.uint64)
+        key = np.full(len(signatures), band, dtype=np.uint64)
+        for col in range(rows):
+            key = key * _BAND_MULT + block[:, col]
+        keys[:, band] = key
+    return keys
+
+
+def estimated_jaccard(signatures_a, signatures_b):
+    """Similaridade de Jaccard estimada entre assinaturas pareadas linha a linha."""
+    return (signatures_a == signatures_b).mean(axis=1)
+
+
+def _bucket_leader_pairs(keys, order_key=None):
+    """
+    Para cada faixa, ordena as chaves e liga cada elemento ao primeiro
+    elemento do seu bucket. Retorna (leaders, members) concatenados.
+    """
+    leaders, members = [], []
+    n = len(keys)
+    for band in range(keys.shape[1]):
+        if order_key is None:
+            order = np.argsort(keys[:, band], kind='stable')
+        else:
+            order = np.lexsort((order_key, keys[:, band]))
+        sorted_keys = keys[order, band]
+        is_start = np.ones(n, dtype=bool)
+        is_start[1:] = sorted_keys[1:] != sorted_keys[:-1]
+        run_start = np.maximum.accumulate(np.where(is_start, np.arange(n), 0))
+        mask = ~is_start
+        leaders.append(order[run_start[mask]])
+        members.append(order[mask])
+    if not leaders:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return np.concatenate(leaders), np.concatenate(members)
+
+
+def _connected_components(n, left, right):
+    """Componentes conexos por propagação do menor rótulo (vetorizado)."""
+    labels = np.arange(n)
+    if len(left) == 0:
+        return labels
+    while True:
+        low = np.minimum(labels[left], labels[right])
+        new_labels = labels.copy()
+        np.minimum.at(new_labels, left, low)
+        np.minimum.at(new_labels, right, low)
+        new_labels = new_labels[new_labels]
+        if np.array_equal(new_labels, labels):
+            return labels
+        labels = new_labels
+
+
+def near_duplicate_clusters(signatures, threshold=DEFAULT_THRESHOLD):
+    """
+    Agrupa assinaturas quase-duplicadas. Retorna, para cada linha, o índice
+    da menor linha do seu grupo (linhas sem quase-duplicata apontam para si).
+    """
+    bands, rows = lsh_params(threshold, signatures.shape[1])
+    keys = _band_keys(signatures, bands, rows)
+    leaders, members = _bucket_leader_pairs(keys)
+    similar = estimated_jaccard(signatures[leaders], signatures[members]) >= threshold
+    return _connected_components(len(signatures), leaders[similar], members[similar])
+
+
+@traced("near_dup")
+def drop_near_duplicates(dataframe, text_column, threshold=DEFAULT_THRESHOLD, **minhash_kwargs):
+    """
+    Remove quase-duplicatas de um DataFrame, mantendo a primeira ocorrência
+    de cada grupo.
+    """
+    signatures = minhash_signatures(dataframe[text_column], **minhash_kwargs)
+    clusters = near_duplicate_clusters(signatures, threshold)
+    keep = clusters == np.arange(len(clusters))
+    print(f"Quase-duplicatas (Jaccard >= {threshold}): {int((~keep).sum())} amostras removidas.")
+    return dataframe[keep].reset_index(drop=True)
+
+
+def cross_near_duplicates(signatures_a, signatures_b, threshold=DEFAULT_THRESHOLD):
+    """
+    Encontra textos de B que têm uma quase-duplicata em A.
+    Retorna dois arrays pareados (índices em B, índice correspondente em A).
+    """
+    n_a = len(signatures_a)
+    signatures = np.concatenate([signatures_a, signatures_b])
+    bands, rows = lsh_params(threshold, signatures.shape[1])
+    keys = _band_keys(signatures, bands, rows)
+
+    # dentro de cada bucket os elementos de A vêm primeiro, então o líder de
+    # um bucket misto é sempre um texto de A
+    from_b = np.arange(len(signatures)) >= n_a
+    leaders, members = _bucket_leader_pairs(keys, order_key=from_b)
+    cross = (leaders < n_a) & (members >= n_a)
+    leaders, members = leaders[cross], members[cross]
+    similar = estimated_jaccard(signatures[leaders], signatures[members]) >= threshold
+
+    b_idx, first = np.unique(members[similar] - n_a, return_index=True)
+    return b_idx, leaders[similar][first]
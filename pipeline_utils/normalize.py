@@ -0,0 +1,104 @@
+"""
+Normalização de texto compartilhada pelos scripts de processamento.
+
+Duas saídas diferentes:
+  * texto de saída — NFC, espaços colapsados e sem espaços nas pontas;
+  * chave de deduplicação — o texto de saída em casefold e sem espaço antes
+    de pontuação, de modo que "Ótimo produto!" e "Ótimo  produto !" colidam.
+
+A deduplicação compara um hash uint64 da chave; o texto gravado nos folds é o
+de saída, sem casefold.
+"""
+
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from pipeline_utils.trace import traced
+
+DEFAULT_BATCH_SIZE = 200_000
+
+_SEP = '\x00'
+_CLOSING_PUNCT = '!?.,;:)]}'
+_OPENING_PUNCT = '([{'
+
+
+def _in_batches(texts, func, batch_size):
+    s = pd.Series(texts, dtype=object).fillna('').astype(str)
+    parts = [func(s.iloc[lo:lo + batch_size]) for lo in range(0, len(s), batch_size)]
+    return pd.concat(parts) if parts else s
+
+
+def _map_joined(s, func):
+    """
+    Aplica `func` a um lote inteiro de uma vez: os textos são unidos por um
+    separador nulo, transformados como uma única string e separados de volta.
+    Se algum texto já contiver o separador, cai para o processamento por item.
+    """
+    joined = _SEP.join(s.tolist())
+    pieces = func(joined).split(_SEP)
+    if len(pieces) != len(s):
+        pieces = [func(t) for t in s.tolist()]
+    return pd.Series(pieces, index=s.index, dtype=object)
+
+
+def _normalize_string(text):
+    # str.split() sem argumentos separa por qualquer espaço Unicode, mas não
+    # pelo separador nulo; depois do join só restam espaços simples
+    text = ' '.join(unicodedata.normalize('NFC', text).split())
+    return text.replace(' ' + _SEP, _SEP).replace(_SEP + ' ', _SEP)
+
+
+def _key_string(text):
+    text = _normalize_string(text).casefold()
+    for char in _CLOSING_PUNCT:
+        text = text.replace(' ' + char, char)
+    for char in _OPENING_PUNCT:
+        text = text.replace(char + ' ', char)
+    return text
+
+
+def _normalize_batch(s):
+    return _map_joined(s, _normalize_string)
+
+
+def _key_batch(s):
+    return _map_joined(s, _key_string)
+
+
+def normalize_text_column(texts, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Aplica NFC, colapsa espaços e remove espaços nas pontas, coluna a coluna
+    em lotes. Preserva o índice da entrada.
+    """
+    return _in_batches(texts, _normalize_batch, batch_size)
+
+
+def normalized_key(texts, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Chave de comparação: texto normalizado, em casefold e sem espaço antes de
+    pontuação (nem depois de parênteses/colchetes abertos).
+    """
+    return _in_batches(texts, _key_batch, batch_size)
+
+
+def normalized_key_hashes(texts, batch_size=DEFAULT_BATCH_SIZE):
+    """Hash uint64 estável da chave normalizada."""
+    keys = normalized_key(texts, batch_size)
+    return pd.util.hash_pandas_object(keys, index=False).to_numpy(dtype=np.uint64)
+
+
+@traced("dedup")
+def normalize_and_deduplicate(dataframe, text_column, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Normaliza a coluna de texto, descarta textos que ficaram vazios e remove
+    duplicatas pela chave normalizada, mantendo a primeira ocorrência.
+    """
+    df = dataframe.copy()
+    df[text_column] = normalize_text_column(df[text_column], batch_size)
+    df = df[df[text_column] != '']
+
+    key_hashes = normalized_key_hashes(df[text_column], batch_size)
+    duplicated = pd.Series(key_hashes).duplicated().to_numpy()
+    return df[~duplicated].reset_index(drop=True)
@@ -0,0 +1,124 @@
+"""
+Hashes de multiconjunto para conferir a partição dos folds.
+
+O digest de um conjunto de textos é (quantidade, soma dos hashes, soma dos
+hashes misturados), com as somas módulo 2^64. Como a soma é comutativa, o
+digest não depende da ordem das linhas, e o digest de uma união disjunta é a
+soma dos digests das partes. Assim, "treino + valid + teste == pool" ou "os
+testes dos folds cobrem o pool uma vez" viram comparações de três números,
+em O(n) de tempo e O(1) de memória por split.
+
+Cada script grava '<corpus>/manifest.json' com o digest do pool e de cada
+fold/split, calculado sobre o texto exatamente como vai para o JSONL. O
+validador confere os dados contra o manifesto sem precisar de outra cópia.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from pipeline_utils.trace import traced
+
+MANIFEST_FILE_NAME = "manifest.json"
+
+_MASK64 = (1 << 64) - 1
+
+
+def text_hashes(texts):
+    """Hash uint64 estável (independente de PYTHONHASHSEED) do texto exato."""
+    series = pd.Series(texts, dtype=object).fillna("").astype(str)
+    return pd.util.hash_pandas_object(series, index=False).to_numpy(dtype=np.uint64)
+
+
+def _mix(hashes):
+    # finalizador do splitmix64: a segunda soma não é linear na primeira, então
+    # trocas de elementos que preservam uma soma dificilmente preservam a outra
+    z = hashes.copy()
+    z ^= z >> np.uint64(30)
+    z *= np.uint64(0xBF58476D1CE4E5B9)
+    z ^= z >> np.uint64(27)
+    z *= np.uint64(0x94D049BB133111EB)
+    z ^= z >> np.uint64(31)
+    return z
+
+
+class MultisetDigest:
+    def __init__(self, count=0, total=0, mixed=0):
+        self.count = int(count)
+        self.total = int(total) & _MASK64
+        self.mixed = int(mixed) & _MASK64
+
+    @classmethod
+    def from_hashes(cls, hashes):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        # somas de uint64 no numpy já dão a volta módulo 2^64
+        return cls(len(hashes), int(hashes.sum(dtype=np.uint64)), int(_mix(hashes).sum(dtype=np.uint64)))
+
+    @classmethod
+    def from_texts(cls, texts):
+        return cls.from_hashes(text_hashes(texts))
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["count"], int(data["sum"], 16), int(data["mixed"], 16))
+
+    def to_dict(self):
+        return {"count": self.count, "sum": f"{self.total:016x}", "mixed": f"{self.mixed:016x}"}
+
+    def __add__(self, other):
+        return MultisetDigest(self.count + other.count, self.total + other.total, self.mixed + other.mixed)
+
+    def __eq__(self, other):
+        return (self.count, self.total, self.mixed) == (other.count, other.total, other.mixed)
+
+    def __repr__(self):
+        return f"MultisetDigest(count={self.count}, sum={self.total:016x}, mixed={self.mixed:016x})"
+
+
+def combine(digests):
+    result = MultisetDigest()
+    for digest in digests:
+        result = result + digest
+    return result
+
+
+@traced("write")
+def save_manifest(corpus_dir, pool_texts, fold_splits):
+    """
+    Salva o manifesto de um corpus. `pool_texts` são os textos únicos antes da
+    divisão e `fold_splits` mapeia nome do fold para um dict {split: textos},
+    no mesmo formato do save_fingerprint_index.
+    """
+    manifest = {
+        "pool": MultisetDigest.from_texts(pool_texts).to_dict(),
+        "folds": {
+            fold_name: {split: MultisetDigest.from_texts(texts).to_dict() for split, texts in splits.items()}
+            for fold_name, splits in fold_splits.items()
+        },
+    }
+    corpus_dir = Path(corpus_dir)
+    corpus_dir.mkdir(parents=True, exist_ok=True)
+    file_path = corpus_dir / MANIFEST_FILE_NAME
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    print(f"Manifesto dos folds salvo em: {file_path}")
+    return file_path
+
+
+def load_manifest(corpus_dir):
+    """
+    Lê o manifesto como (digest do pool, {fold: {split: digest}}). Retorna
+    None se o arquivo não existir.
+    """
+    file_path = Path(corpus_dir) / MANIFEST_FILE_NAME
+    if not file_path.exists():
+        return None
+    with open(file_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    folds = {
+        fold_name: {split: MultisetDigest.from_dict(d) for split, d in splits.items()}
+        for fold_name, splits in data["folds"].items()
+    }
+    return MultisetDigest.from_dict(data["pool"]), folds
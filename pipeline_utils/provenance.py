@@ -0,0 +1,89 @@
+"""
+Proveniência dos exemplos em corpora montados a partir de vários arquivos.
+
+Alguns scripts juntam arquivos de origem antes de embaralhar (TuPy:
+binary_train/binary_test; Recognasumm: train/validation/test; UTL: apps e
+filmes em train/dev/test). Cada arquivo de origem recebe um id pequeno,
+carregado numa coluna 'source_id' pela limpeza e pela deduplicação (que
+mantém a primeira ocorrência). Antes de gravar os folds a coluna sai do
+DataFrame, então os JSONL não mudam:
+
+- '<corpus>/sources.json' é a tabela de ids: arquivo, atributos da origem
+  (split original, domínio, ...) e quantos exemplos do pool vieram dele;
+- cada fold ganha um 'provenance.npz' com, para cada split, o id de origem de
+  cada linha do JSONL (uint8).
+
+Assim o split oficial ou um subconjunto por domínio sai de um filtro sobre
+um array de inteiros (`source_mask`), sem rodar os scripts de novo. Os ids
+de cada fold saem de `folds.split_rows`, com o mesmo rodízio dos JSONL.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+from pipeline_utils.trace import traced
+
+SOURCE_ID_COLUMN = "source_id"
+SOURCES_FILE_NAME = "sources.json"
+PROVENANCE_FILE_NAME = "provenance.npz"
+
+
+@traced("write")
+def write_source_table(corpus_dir, sources, source_ids):
+    """
+    Grava o sources.json. `sources` é a lista de dicionários de atributos de
+    cada origem, na ordem dos ids; `source_ids` são os ids do pool final.
+    """
+    counts = np.bincount(np.asarray(source_ids, dtype=np.int64), minlength=len(sources))
+    table = [{"id": i, **source, "examples": int(counts[i])} for i, source in enumerate(sources)]
+    corpus_dir = Path(corpus_dir)
+    corpus_dir.mkdir(parents=True, exist_ok=True)
+    file_path = corpus_dir / SOURCES_FILE_NAME
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump({"sources": table}, f, indent=2, ensure_ascii=False)
+    print(f"Tabela de proveniência ({len(table)} origens) salva em: {file_path}")
+    return table
+
+
+def load_source_table(corpus_dir):
+    """Lista de origens do sources.json. Retorna None se não existir."""
+    file_path = Path(corpus_dir) / SOURCES_FILE_NAME
+    if not file_path.exists():
+        return None
+    with open(file_path, "r", encoding="utf-8") as f:
+        return json.load(f)["sources"]
+
+
+@traced("write")
+def save_provenance(fold_dir, splits):
+    """Grava o provenance.npz do fold. `splits` mapeia split para ids de origem."""
+    arrays = {split: np.asarray(ids, dtype=np.uint8) for split, ids in splits.items()}
+    file_path = Path(fold_dir) / PROVENANCE_FILE_NAME
+    np.savez(file_path, **arrays)
+    return file_path
+
+
+def load_provenance(fold_dir, split):
+    """Id de origem de cada linha do split. Retorna None se não existir."""
+    file_path = Path(fold_dir) / PROVENANCE_FILE_NAME
+    if not file_path.exists():
+        return None
+    with np.load(file_path) as data:
+        return data[split]
+
+
+def source_mask(fold_dir, fold_split, **attributes):
+    """
+    Máscara booleana das linhas do split `fold_split` do fold cuja origem tem
+    os atributos pedidos, ex.: source_mask(fold, "test", split="test", domain="apps")
+    (linhas do teste do fold que vieram do teste oficial de apps).
+    """
+    fold_dir = Path(fold_dir)
+    table = load_source_table(fold_dir.parents[1])
+    ids = load_provenance(fold_dir, fold_split)
+    if table is None or ids is None:
+        raise FileNotFoundError(f"{SOURCES_FILE_NAME} ou {PROVENANCE_FILE_NAME} não encontrado para {fold_dir}")
+    wanted = [s["id"] for s in table if all(s.get(key) == value for key, value in attributes.items())]
+    return np.isin(ids, wanted)
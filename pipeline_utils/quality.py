@@ -0,0 +1,120 @@
+"""
+Filtro de qualidade em lote para tweets e reviews.
+
+Cada script declara um dicionário QUALITY_RULES com as regras que quer usar:
+
+    QUALITY_RULES = {
+        "strip_retweet": True,   # remove o prefixo "RT @usuario:"
+        "mask_urls": True,       # troca URLs por URL_TOKEN
+        "mask_mentions": True,   # troca @menções por MENTION_TOKEN
+        "min_chars": 3,          # descarta textos com menos caracteres
+        "min_tokens": 2,         # descarta textos com menos palavras
+        "drop_non_alpha": True,  # descarta textos sem nenhuma letra (só emoji, números...)
+    }
+
+As substituições rodam com regex pré-compiladas sobre o lote inteiro de uma
+vez (textos unidos por um separador nulo); as regras de descarte contam
+quantas linhas cada uma removeu. Os placeholders não contam como conteúdo
+nas regras de tamanho e de letras.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from pipeline_utils.trace import traced
+
+URL_TOKEN = "[URL]"
+MENTION_TOKEN = "[USUARIO]"
+DEFAULT_BATCH_SIZE = 200_000
+
+_SEP = '\x00'
+_RETWEET = re.compile(r'\x00(?:\s*RT\s+@\w+:?)+\s*')
+_URL = re.compile(r'(?:https?://|www\.)[^\s\x00]+')
+_MENTION = re.compile(r'(?<!\w)@\w+')
+_PLACEHOLDERS = re.compile('|'.join(re.escape(t) for t in (URL_TOKEN, MENTION_TOKEN)))
+_HAS_ALPHA = re.compile(r'[^\W\d_]')
+
+DROP_RULES = ["empty", "min_chars", "min_tokens", "drop_non_alpha"]
+
+
+def _clean_batch(texts, rules, counters):
+    joined = _SEP.join(texts)
+    if joined.count(_SEP) != len(texts) - 1:
+        joined = _SEP.join(t.replace(_SEP, '') for t in texts)
+    if rules.get("strip_retweet"):
+        # o prefixo só vale no início de cada texto, isto é, logo após um separador
+        joined, n = _RETWEET.subn(_SEP, _SEP + joined)
+        joined = joined[1:]
+        counters["strip_retweet"] += n
+    if rules.get("mask_urls"):
+        joined, n = _URL.subn(URL_TOKEN, joined)
+        counters["mask_urls"] += n
+    if rules.get("mask_mentions"):
+        joined, n = _MENTION.subn(MENTION_TOKEN, joined)
+        counters["mask_mentions"] += n
+
+    return joined.split(_SEP), _PLACEHOLDERS.sub('', joined).split(_SEP)
+
+
+def _failed_rule(content, rules):
+    """Índice (em DROP_RULES) da primeira regra violada por texto, ou -1."""
+    stripped = [t.strip() for t in content]
+    failed = np.full(len(stripped), -1, dtype=np.int8)
+
+    checks = [np.fromiter((not t for t in stripped), dtype=bool, count=len(stripped))]
+    min_chars = rules.get("min_chars", 0)
+    checks.append(
+        np.fromiter((len(t) < min_chars for t in stripped), dtype=bool, count=len(stripped))
+        if min_chars else np.zeros(len(stripped), dtype=bool)
+    )
+    min_tokens = rules.get("min_tokens", 0)
+    checks.append(
+        np.fromiter(
+            (len(t.split(None, min_tokens - 1)) < min_tokens for t in stripped),
+            dtype=bool, count=len(stripped),
+        )
+        if min_tokens else np.zeros(len(stripped), dtype=bool)
+    )
+    checks.append(
+        np.fromiter((_HAS_ALPHA.search(t) is None for t in stripped), dtype=bool, count=len(stripped))
+        if rules.get("drop_non_alpha") else np.zeros(len(stripped), dtype=bool)
+    )
+
+    # a primeira regra violada é a que leva o crédito pelo descarte
+    for rule_idx in reversed(range(len(checks))):
+        failed[checks[rule_idx]] = rule_idx
+    return failed
+
+
+@traced("clean")
+def apply_quality_filter(dataframe, text_column, rules, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Aplica as regras de limpeza e descarte à coluna de texto. Retorna
+    (DataFrame filtrado, contadores por regra).
+    """
+    counters = {rule: 0 for rule in ["strip_retweet", "mask_urls", "mask_mentions"] + DROP_RULES}
+    texts = dataframe[text_column].fillna('').astype(str).tolist()
+
+    cleaned, failed = [], []
+    for lo in range(0, len(texts), batch_size):
+        batch_cleaned, batch_content = _clean_batch(texts[lo:lo + batch_size], rules, counters)
+        cleaned.extend(batch_cleaned)
+        failed.append(_failed_rule(batch_content, rules))
+    failed = np.concatenate(failed) if failed else np.empty(0, dtype=np.int8)
+
+    for rule_idx, rule in enumerate(DROP_RULES):
+        counters[rule] = int((failed == rule_idx).sum())
+
+    df = dataframe.copy()
+    df[text_column] = pd.Series(cleaned, index=df.index, dtype=object)
+    df = df[failed < 0]
+
+    print("Filtro de qualidade:")
+    for rule, count in counters.items():
+        if count:
+            verb = "descartadas" if rule in DROP_RULES else "substituições"
+            print(f"  {rule}: {count} {verb}")
+    print(f"  {len(dataframe) - len(df)} linhas descartadas. Restam {len(df)} amostras.")
+    return df, counters
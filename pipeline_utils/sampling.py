@@ -0,0 +1,42 @@
+"""
+Estruturas para a validação por amostragem.
+
+  * ReservoirSampler — amostra uniforme de tamanho fixo de um fluxo de
+    itens lido em blocos (algoritmo R), sem guardar o fluxo inteiro;
+  * detection_bound — maior fração de registros problemáticos que uma
+    amostra limpa ainda deixa passar, com a confiança pedida.
+"""
+
+import numpy as np
+
+
+class ReservoirSampler:
+    def __init__(self, size, rng):
+        self.size = size
+        self.rng = rng
+        self.seen = 0
+        self.items = []
+
+    def extend(self, items):
+        items = list(items)
+        free = max(self.size - len(self.items), 0)
+        self.items.extend(items[:free])
+        rest = items[free:]
+        if rest:
+            # o item de índice global t entra com probabilidade size / (t + 1)
+            first = self.seen + free
+            slots = self.rng.integers(0, np.arange(first, first + len(rest)) + 1)
+            for offset in np.flatnonzero(slots < self.size).tolist():
+                self.items[slots[offset]] = rest[offset]
+        self.seen += len(items)
+
+
+def detection_bound(sample_size, confidence=0.95):
+    """
+    Se uma amostra uniforme de `sample_size` registros não tem nenhum
+    problema, a fração de registros com problema no split é menor que o valor
+    retornado, com a confiança pedida (≈ 3/n para 95%).
+    """
+    if sample_size <= 0:
+        return 1.0
+    return 1.0 - (1.0 - confidence) ** (1.0 / sample_size)
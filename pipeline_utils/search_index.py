@@ -0,0 +1,145 @@
+"""
+Índice de busca textual (SQLite FTS5) sobre o pool de todos os corpora.
+
+Cada texto único de um corpus entra uma única vez na tabela 'examples'
+(corpus, texto, label); a tabela 'placements' guarda em qual fold e split
+ele aparece, e a tabela virtual 'examples_fts' indexa os textos com o
+tokenizador unicode61 sem acentos ('usucapiao' também encontra
+'usucapião'). As consultas usam a sintaxe do FTS5: termos, frases entre
+aspas, prefixos ('racis*'), AND/OR/NOT e NEAR.
+
+A tabela 'corpora' guarda o hash do conteúdo de cada corpus (o mesmo do
+feature store, que cobre textos e labels); um corpus só é reindexado quando
+os folds mudam, inclusive quando só as labels foram corrigidas.
+"""
+
+import sqlite3
+from pathlib import Path
+
+from pipeline_utils.features import content_key, read_folds
+
+SEARCH_INDEX_PATH = Path(__file__).resolve().parents[1] / "search_index.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS corpora (name TEXT PRIMARY KEY, content_key TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS examples (
+    id INTEGER PRIMARY KEY, corpus TEXT NOT NULL, text TEXT NOT NULL, label TEXT
+);
+CREATE INDEX IF NOT EXISTS examples_corpus_label ON examples (corpus, label);
+CREATE TABLE IF NOT EXISTS placements (
+    example_id INTEGER NOT NULL, fold TEXT NOT NULL, split TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS placements_example ON placements (example_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS examples_fts USING fts5(
+    text, content='examples', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+"""
+
+
+def connect(index_path=None):
+    conn = sqlite3.connect(index_path or SEARCH_INDEX_PATH)
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _drop_corpus(conn, name):
+    # tabela FTS5 com conteúdo externo: a remoção precisa do texto original
+    conn.execute(
+        "INSERT INTO examples_fts (examples_fts, rowid, text) "
+        "SELECT 'delete', id, text FROM examples WHERE corpus = ?", (name,)
+    )
+    conn.execute("DELETE FROM placements WHERE example_id IN (SELECT id FROM examples WHERE corpus = ?)", (name,))
+    conn.execute("DELETE FROM examples WHERE corpus = ?", (name,))
+    conn.execute("DELETE FROM corpora WHERE name = ?", (name,))
+
+
+def index_corpus(conn, corpus_dir, force=False):
+    """
+    Indexa o pool do corpus. Retorna o número de textos indexados, ou None se
+    o índice já estava atualizado.
+    """
+    corpus_dir = Path(corpus_dir)
+    name, key = corpus_dir.name, content_key(corpus_dir)
+    row = conn.execute("SELECT content_key FROM corpora WHERE name = ?", (name,)).fetchone()
+    if row is not None and row[0] == key and not force:
+        return None
+
+    texts, labels, folds = read_folds(corpus_dir)
+    with conn:
+        _drop_corpus(conn, name)
+        first_id = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM examples").fetchone()[0]
+        conn.executemany(
+            "INSERT INTO examples (id, corpus, text, label) VALUES (?, ?, ?, ?)",
+            ((first_id + i, name, text, None if label is None else str(label))
+             for i, (text, label) in enumerate(zip(texts, labels))),
+        )
+        conn.executemany(
+            "INSERT INTO placements (example_id, fold, split) VALUES (?, ?, ?)",
+            ((first_id + int(row), fold_name, split)
+             for fold_name, splits in folds.items() for split, rows in splits.items() for row in rows),
+        )
+        conn.execute(
+            "INSERT INTO examples_fts (rowid, text) SELECT id, text FROM examples WHERE corpus = ?", (name,)
+        )
+        conn.execute("INSERT INTO corpora (name, content_key) VALUES (?, ?)", (name, key))
+    return len(texts)
+
+
+def optimize(conn):
+    """Junta os segmentos do FTS5 depois de uma indexação grande."""
+    with conn:
+        conn.execute("INSERT INTO examples_fts (examples_fts) VALUES ('optimize')")
+
+
+def _filters(corpora, labels, fold, split):
+    clauses, params = [], []
+    if corpora:
+        clauses.append(f"e.corpus IN ({', '.join('?' * len(corpora))})")
+        params.extend(corpora)
+    if labels:
+        # labels sem diferenciar maiúsculas ('positivo' casa com 'Positivo'; só ASCII no SQLite)
+        clauses.append(f"e.label COLLATE NOCASE IN ({', '.join('?' * len(labels))})")
+        params.extend(labels)
+    if fold or split:
+        placement = ["p.example_id = e.id"]
+        if fold:
+            placement.append("p.fold = ?")
+            params.append(fold)
+        if split:
+            placement.append("p.split = ?")
+            params.append(split)
+        clauses.append(f"EXISTS (SELECT 1 FROM placements p WHERE {' AND '.join(placement)})")
+    return "".join(f" AND {clause}" for clause in clauses), params
+
+
+def search(conn, query, corpora=None, labels=None, fold=None, split=None, limit=20):
+    """
+    Exemplos que casam com `query`, do mais relevante (BM25) para o menos:
+    lista de dicionários com id, corpus, label, trecho com os termos entre
+    colchetes e o texto completo.
+    """
+    where, params = _filters(corpora, labels, fold, split)
+    rows = conn.execute(
+        "SELECT e.id, e.corpus, e.label, snippet(examples_fts, 0, '[', ']', '…', 16), e.text "
+        "FROM examples_fts JOIN examples e ON e.id = examples_fts.rowid "
+        f"WHERE examples_fts MATCH ?{where} ORDER BY examples_fts.rank LIMIT ?",
+        [query, *params, limit],
+    )
+    return [dict(zip(["id", "corpus", "label", "snippet", "text"], row)) for row in rows]
+
+
+def count_matches(conn, query, corpora=None, labels=None, fold=None, split=None):
+    """Quantidade de exemplos que casam com `query`, por corpus e label."""
+    where, params = _filters(corpora, labels, fold, split)
+    return conn.execute(
+        "SELECT e.corpus, e.label, COUNT(*) FROM examples_fts JOIN examples e ON e.id = examples_fts.rowid "
+        f"WHERE examples_fts MATCH ?{where} GROUP BY e.corpus, e.label ORDER BY e.corpus, COUNT(*) DESC",
+        [query, *params],
+    ).fetchall()
+
+
+def placements(conn, example_id):
+    """(fold, split) em que o exemplo aparece."""
+    return conn.execute(
+        "SELECT fold, split FROM placements WHERE example_id = ? ORDER BY fold", (example_id,)
+    ).fetchall()
@@ -0,0 +1,133 @@
+"""
+Sketches aproximados e mescláveis para estatísticas em uma passada.
+
+- `CountMinSketch`: frequência de itens (n-gramas) com erro de no máximo
+  e/largura x total, sempre para cima, em `profundidade` linhas de contadores.
+- `HyperLogLog`: quantidade de itens distintos (tamanho do vocabulário) com
+  2^p registradores de 1 byte; erro relativo típico de 1,04/sqrt(2^p).
+- `TDigest`: quantis de uma distribuição (comprimentos) com centróides
+  mais finos nas caudas.
+
+Todos recebem lotes como arrays do NumPy e podem ser mesclados (soma,
+máximo e união de centróides), o que permite calcular cada arquivo em
+separado e juntar depois. Os hashes vêm de `stable_hash`, que não depende
+do PYTHONHASHSEED, então sketches gravados em execuções diferentes
+continuam compatíveis.
+"""
+
+import numpy as np
+import pandas as pd
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+
+
+def stable_hash(values):
+    """Hash de 64 bits estável entre processos para uma sequência de strings."""
+    return pd.util.hash_array(np.asarray(values, dtype=object))
+
+
+def combine_hashes(a, b):
+    """Hash de pares (ex.: label e n-grama) a partir dos hashes de cada parte."""
+    with np.errstate(over="ignore"):
+        return a ^ (b * _GOLDEN + (a << np.uint64(6)) + (a >> np.uint64(2)))
+
+
+class CountMinSketch:
+    def __init__(self, width=2**18, depth=4, table=None):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.uint32) if table is None else table
+
+    def _columns(self, hashes):
+        # hashing duplo: a linha i usa h1 + i * h2
+        h1 = hashes & np.uint64(0xFFFFFFFF)
+        h2 = (hashes >> np.uint64(32)) | np.uint64(1)
+        rows = np.arange(self.depth, dtype=np.uint64)[:, None]
+        with np.errstate(over="ignore"):
+            return ((h1[None, :] + rows * h2[None, :]) % np.uint64(self.width)).astype(np.int64)
+
+    def add(self, hashes, counts=None):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        for row, columns in enumerate(self._columns(hashes)):
+            self.table[row] += np.bincount(columns, weights=counts, minlength=self.width).astype(np.uint32)
+
+    def estimate(self, hashes):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if len(hashes) == 0:
+            return np.zeros(0, dtype=np.int64)
+        columns = self._columns(hashes)
+        return self.table[np.arange(self.depth)[:, None], columns].min(axis=0).astype(np.int64)
+
+    def merge(self, other):
+        self.table += other.table
+        return self
+
+
+class HyperLogLog:
+    def __init__(self, p=14, registers=None):
+        self.p = p
+        self.registers = np.zeros(2**p, dtype=np.uint8) if registers is None else registers
+
+    def add(self, hashes):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if len(hashes) == 0:
+            return
+        index = (hashes >> np.uint64(64 - self.p)).astype(np.int64)
+        # posição do primeiro bit 1 nos 64 - p bits restantes (com sentinela no fim)
+        rest = (hashes << np.uint64(self.p)) | np.uint64(1 << (self.p - 1))
+        high = (rest >> np.uint64(32)).astype(np.float64)
+        low = (rest & np.uint64(0xFFFFFFFF)).astype(np.float64)
+        leading = np.where(high > 0, 31 - np.floor(np.log2(np.maximum(high, 1))),
+                           63 - np.floor(np.log2(np.maximum(low, 1))))
+        np.maximum.at(self.registers, index, (leading + 1).astype(np.uint8))
+
+    def count(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * np.log(m / zeros)  # contagem linear para cardinalidades pequenas
+        return int(round(estimate))
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+
+class TDigest:
+    def __init__(self, compression=200, means=None, weights=None):
+        self.compression = compression
+        self.means = np.zeros(0) if means is None else np.asarray(means, dtype=np.float64)
+        self.weights = np.zeros(0) if weights is None else np.asarray(weights, dtype=np.float64)
+
+    def _compress(self, means, weights):
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        if total == 0:
+            self.means, self.weights = means, weights
+            return
+        # função de escala k1: centróides pequenos perto de q = 0 e q = 1
+        q = (np.cumsum(weights) - weights / 2) / total
+        k = np.floor(self.compression / (2 * np.pi) * np.arcsin(2 * q - 1))
+        starts = np.flatnonzero(np.r_[True, k[1:] != k[:-1]])
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def add(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        if len(values):
+            self._compress(np.r_[self.means, values], np.r_[self.weights, np.ones(len(values))])
+
+    def merge(self, other):
+        self._compress(np.r_[self.means, other.means], np.r_[self.weights, other.weights])
+        return self
+
+    def quantile(self, q):
+        if len(self.means) == 0:
+            return None
+        if len(self.means) == 1:
+            return float(self.means[0])
+        centers = (np.cumsum(self.weights) - self.weights / 2) / self.weights.sum()
+        return float(np.interp(q, centers, self.means))
@@ -0,0 +1,222 @@
+"""
+Instrumentação por etapa dos scripts de processamento.
+
+Cada script chama `start_trace()` no início do `main()` e marca suas funções
+de leitura e gravação com `@traced("load")` / `@traced("write")`. As etapas
+de pipeline_utils (filtro de qualidade, deduplicação, labels.json e
+fingerprints) já vêm marcadas.
+
+Para cada etapa o trace registra:
+  * tempo de parede e de CPU;
+  * quanto a etapa elevou o pico de RSS do processo;
+  * linhas de entrada e de saída;
+  * bytes lidos e gravados.
+Chamadas repetidas da mesma etapa (ex.: um `save_json_pool` por split) são
+somadas em um único registro.
+
+O trace é gravado em JSON quando o processo termina, em $PIPELINE_TRACE_DIR
+ou, se a variável não existir, em 'traces/' na raiz do repositório. Sem
+`start_trace()`, `@traced` só repassa a chamada.
+"""
+
+import atexit
+import functools
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+TRACE_DIR_ENV = "PIPELINE_TRACE_DIR"
+DEFAULT_TRACE_DIR = Path(__file__).resolve().parents[1] / "traces"
+
+# o mtime do sistema de arquivos usa um relógio mais grosso que time.time_ns()
+_MTIME_SLACK_NS = 1_000_000_000
+
+_active_trace = None
+
+
+def peak_rss_mb():
+    """Pico de RSS do processo atual em MB (None onde não há como medir)."""
+    # no Linux o ru_maxrss sobrevive ao fork/exec e herdaria o pico do processo
+    # pai; o VmHWM de /proc é zerado a cada exec
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss vem em KB no Linux e em bytes no macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class StageCall:
+    """Contadores de uma chamada de etapa; quem mede pode preenchê-los."""
+
+    def __init__(self):
+        self.rows_in = None
+        self.rows_out = None
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+
+class RunTrace:
+    def __init__(self, script, dataset=None):
+        self.script = script
+        self.dataset = dataset
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+        self.stages = {}
+        self.current = None
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+
+    @contextmanager
+    def stage(self, name):
+        call = StageCall()
+        self.current = call
+        rss_before = peak_rss_mb()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield call
+        finally:
+            self.current = None
+            rss_after = peak_rss_mb()
+            stats = self.stages.setdefault(name, {
+                "name": name, "calls": 0, "wall_s": 0.0, "cpu_s": 0.0, "rss_peak_delta_mb": 0.0,
+                "rows_in": None, "rows_out": None, "bytes_read": 0, "bytes_written": 0,
+            })
+            stats["calls"] += 1
+            stats["wall_s"] += time.perf_counter() - wall_start
+            stats["cpu_s"] += time.process_time() - cpu_start
+            if rss_before is not None and rss_after is not None:
+                stats["rss_peak_delta_mb"] += rss_after - rss_before
+            for key in ["rows_in", "rows_out"]:
+                value = getattr(call, key)
+                if value is not None:
+                    stats[key] = (stats[key] or 0) + value
+            stats["bytes_read"] += call.bytes_read
+            stats["bytes_written"] += call.bytes_written
+
+    def to_dict(self):
+        return {
+            "script": self.script,
+            "dataset": self.dataset,
+            "started_at": self.started_at,
+            "wall_s": time.perf_counter() - self._wall_start,
+            "cpu_s": time.process_time() - self._cpu_start,
+            "peak_rss_mb": peak_rss_mb(),
+            "stages": list(self.stages.values()),
+        }
+
+    def save(self, directory=None):
+        directory = Path(directory or os.environ.get(TRACE_DIR_ENV) or DEFAULT_TRACE_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        stamp = self.started_at.replace(":", "").replace("-", "")
+        file_path = directory / f"{self.script}-{stamp}.json"
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+        print(f"Trace de execução salvo em: {file_path}")
+        return file_path
+
+
+def start_trace(script, dataset=None):
+    """
+    Inicia o trace do processo atual. `script` é o nome do arquivo do script
+    (ex.: Path(__file__).stem). O trace é salvo automaticamente na saída.
+    """
+    global _active_trace
+    first = _active_trace is None
+    _active_trace = RunTrace(script, dataset)
+    if first:
+        atexit.register(save_trace)
+    return _active_trace
+
+
+def save_trace(directory=None):
+    if _active_trace is None:
+        return None
+    return _active_trace.save(directory)
+
+
+@contextmanager
+def trace_stage(name):
+    """
+    Mede um bloco como a etapa `name`. Fora de um trace, ou dentro de outra
+    etapa já aberta, o bloco roda sem registro.
+    """
+    if _active_trace is None or _active_trace.current is not None:
+        yield StageCall()
+        return
+    with _active_trace.stage(name) as call:
+        yield call
+
+
+def note_rows_in(count):
+    """Informa as linhas de entrada da etapa aberta (ex.: linhas lidas do arquivo bruto)."""
+    if _active_trace is not None and _active_trace.current is not None:
+        _active_trace.current.rows_in = int(count)
+
+
+def _file_state(args):
+    """(caminho, mtime) dos arquivos citados nos argumentos, inclusive 'dir / nome'."""
+    candidates = []
+    for arg in args:
+        items = arg if isinstance(arg, (list, tuple)) else [arg]
+        candidates.extend(Path(item) for item in items if isinstance(item, (str, os.PathLike)))
+    dirs = [p for p in candidates if p.is_dir()]
+    candidates += [d / p for d in dirs for p in candidates if not p.is_absolute()]
+
+    state = {}
+    for path in candidates:
+        try:
+            state[path] = path.stat().st_mtime_ns if path.is_file() else None
+        except (OSError, ValueError):
+            continue
+    return state
+
+
+def _frame_rows(value):
+    value = value[0] if isinstance(value, tuple) and value else value
+    return len(value) if hasattr(value, "columns") else None
+
+
+def traced(name):
+    """
+    Decorador de etapa. Preenche sozinho linhas de entrada (primeiro
+    DataFrame dos argumentos), linhas de saída (DataFrame retornado) e bytes
+    lidos/gravados (arquivos citados nos argumentos ou retornados).
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _active_trace is None or _active_trace.current is not None:
+                return func(*args, **kwargs)
+            all_args = list(args) + list(kwargs.values())
+            with trace_stage(name) as call:
+                before = _file_state(all_args)
+                start_ns = time.time_ns()
+                call.rows_in = next((_frame_rows(a) for a in all_args if hasattr(a, "columns")), None)
+                result = func(*args, **kwargs)
+                call.rows_out = _frame_rows(result)
+
+                after = _file_state(all_args + ([result] if isinstance(result, os.PathLike) else []))
+                for path, mtime in after.items():
+                    if mtime is None:
+                        continue
+                    if path in before and before[path] == mtime:
+                        call.bytes_read += path.stat().st_size
+                    elif before.get(path) is not None or mtime >= start_ns - _MTIME_SLACK_NS:
+                        call.bytes_written += path.stat().st_size
+            return result
+        # a etapa fica exposta para quem instrumenta de fora (benchmarks/run_benchmarks.py)
+        wrapper.trace_stage = name
+        return wrapper
+    return decorator
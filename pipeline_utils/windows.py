@@ -0,0 +1,122 @@
+"""
+Janelas deslizantes sobre documentos longos, guardadas como offsets.
+
+Ementas do RulingBR e do CourtDecision costumam passar do contexto dos
+modelos. Em vez de gravar o texto de cada janela, o fold ganha um
+'windows.npz' com um array (doc, início, fim) por split: 'doc' é a linha do
+documento no JSONL do split e início/fim são offsets de caracteres no texto.
+As janelas têm até `max_tokens` tokens separados por espaço e se sobrepõem
+em `overlap` tokens; documentos curtos viram uma única janela. Como as
+janelas saem dos splits já divididos, todas as janelas de um documento ficam
+no mesmo fold e split.
+
+`WindowedSplit` lê as janelas sob demanda: indexa o início de cada linha do
+JSONL e só decodifica o documento quando uma janela dele é pedida.
+"""
+
+import json
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from pipeline_utils.trace import traced
+
+WINDOWS_FILE_NAME = "windows.npz"
+
+_TOKEN = re.compile(r"\S+")
+
+
+def check_window_params(max_tokens, overlap):
+    """ValueError a menos que 0 <= overlap < max_tokens (senão a cauda do texto fica sem janela)."""
+    if not 0 <= overlap < max_tokens:
+        raise ValueError(
+            f"Janelas exigem 0 <= overlap < max_tokens, recebido max_tokens={max_tokens}, overlap={overlap}."
+        )
+
+
+def document_windows(text, max_tokens, overlap):
+    """Offsets (início, fim) das janelas de um texto."""
+    check_window_params(max_tokens, overlap)
+    spans = np.array([m.span() for m in _TOKEN.finditer(text)], dtype=np.int64).reshape(-1, 2)
+    if len(spans) <= max_tokens:
+        return np.array([[0, len(text)]], dtype=np.int64)
+    stride = max_tokens - overlap
+    # a última janela começa antes dos `overlap` tokens finais e vai até o fim
+    first = np.arange(0, len(spans) - overlap, stride)
+    last = np.minimum(first + max_tokens, len(spans)) - 1
+    return np.stack([spans[first, 0], spans[last, 1]], axis=1)
+
+
+def window_offsets(texts, max_tokens, overlap):
+    """Array int64 (n_janelas, 3) com (doc, início, fim) para uma sequência de textos."""
+    check_window_params(max_tokens, overlap)
+    texts = pd.Series(texts, dtype=object).fillna("").astype(str).tolist()
+    parts = []
+    for doc, text in enumerate(texts):
+        windows = document_windows(text, max_tokens, overlap)
+        parts.append(np.column_stack([np.full(len(windows), doc, dtype=np.int64), windows]))
+    return np.concatenate(parts) if parts else np.empty((0, 3), dtype=np.int64)
+
+
+@traced("write")
+def save_windows(fold_dir, splits, max_tokens, overlap):
+    """Grava o windows.npz do fold. `splits` mapeia split para textos, na ordem do JSONL."""
+    arrays = {split: window_offsets(texts, max_tokens, overlap) for split, texts in splits.items()}
+    file_path = Path(fold_dir) / WINDOWS_FILE_NAME
+    np.savez(file_path, max_tokens=max_tokens, overlap=overlap, **arrays)
+    return file_path
+
+
+def load_windows(fold_dir, split):
+    """Offsets (doc, início, fim) das janelas de um split. Retorna None se não existir."""
+    file_path = Path(fold_dir) / WINDOWS_FILE_NAME
+    if not file_path.exists():
+        return None
+    with np.load(file_path) as data:
+        return data[split]
+
+
+class WindowedSplit:
+    """
+    Janelas de um split como sequência: cada item é o registro do documento
+    com 'text' trocado pelo trecho da janela e 'doc_id' com a linha do documento.
+    """
+
+    def __init__(self, fold_dir, split):
+        self.path = Path(fold_dir) / f"{split}.jsonl"
+        self.windows = load_windows(fold_dir, split)
+        if self.windows is None:
+            raise FileNotFoundError(f"{WINDOWS_FILE_NAME} não encontrado em {fold_dir}")
+        self._line_starts = None
+        self._cached_doc = (None, None)
+
+    def _index_lines(self):
+        starts = [0]
+        with open(self.path, "rb") as f:
+            for line in f:
+                starts.append(starts[-1] + len(line))
+        self._line_starts = starts[:-1]
+
+    def document(self, doc):
+        """Registro completo do documento `doc` (linha do JSONL)."""
+        if self._cached_doc[0] == doc:
+            return self._cached_doc[1]
+        if self._line_starts is None:
+            self._index_lines()
+        with open(self.path, "rb") as f:
+            f.seek(self._line_starts[doc])
+            record = json.loads(f.readline().decode("utf-8"))
+        self._cached_doc = (doc, record)
+        return record
+
+    def __len__(self):
+        return len(self.windows)
+
+    def __getitem__(self, i):
+        doc, start, end = (int(v) for v in self.windows[i])
+        record = dict(self.document(doc))
+        record["text"] = record["text"][start:end]
+        record["doc_id"] = doc
+        return record
@@ -1,8 +1,20 @@
 import pandas as pd
 import json
+import sys
 import shutil
 from pathlib import Path
-import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+from pipeline_utils.labels import LABEL_ID_COLUMN, encode_labels, write_label_vocab
+from pipeline_utils.near_dup import drop_near_duplicates
+from pipeline_utils.fingerprints import save_fingerprint_index
+from pipeline_utils.normalize import normalize_and_deduplicate
+from pipeline_utils.quality import apply_quality_filter
+from pipeline_utils.trace import note_rows_in, start_trace, traced
+from pipeline_utils.partition import save_manifest
+from pipeline_utils.folds import save_repeated_cv, save_train_order, split_rows, stratified_folds
+from pipeline_utils.lengths import save_lengths
+from pipeline_utils.multilabel import multilabel_folds, parse_label_lists, save_multilabel, write_multilabel_vocab
 
 INPUT_FILE_PATH = "dataset-eniac-2023.csv"
 INPUT_TEXT_COLUMN = 'sentenca'
@@ -15,11 +27,25 @@ OUTPUT_BASE_DIR = str(Path(__file__).resolve().parents[3] / "category")
 DATASET_NAME = "EniacCorpus"
 NUM_FOLDS = 5
 RANDOM_SEED = 42
-
-
+# Se True, os folds também recebem a coluna 'label_id' (índice no labels.json)
+ENCODE_LABEL_IDS = False
+# Limiar de Jaccard para remover quase-duplicatas (MinHash + LSH); None desativa
+NEAR_DUP_THRESHOLD = None
+# Regras do filtro de qualidade em lote (ver pipeline_utils/quality.py)
+QUALITY_RULES = {}
+# Validação cruzada repetida: uma divisão por semente x nº de folds sobre um único pool; [] desativa
+REPEATED_CV_SEEDS = []
+REPEATED_CV_FOLD_COUNTS = [NUM_FOLDS]
+# Se True, todas as categorias de 'categoria' viram um bitset multi-label (multilabel.json e
+# multilabel.npz por fold) e os folds usam estratificação iterativa; 'label' continua sendo a
+# primeira categoria
+MULTI_LABEL = False
+
+
+@traced("load")
 def load_data_from_csv(file_path):
     """
-    Carrega, extrai a primeira label e limpa os dados.
+    Carrega, extrai a primeira label (mantendo a lista completa de categorias) e limpa os dados.
     """
     print(f"Carregando dados do arquivo CSV: '{file_path}'...")
     try:
@@ -38,6 +64,7 @@ def load_data_from_csv(file_path):
         return None
 
     initial_rows = len(df)
+    note_rows_in(initial_rows)
     
     df.dropna(subset=[INPUT_TEXT_COLUMN, INPUT_LABEL_COLUMN], inplace=True)
     
@@ -45,9 +72,9 @@ def load_data_from_csv(file_path):
     
     df.rename(columns={INPUT_TEXT_COLUMN: FINAL_TEXT_COLUMN}, inplace=True)
     
-    df[FINAL_LABEL_COLUMN] = df[INPUT_LABEL_COLUMN].astype(str).apply(lambda x: x.split(',')[0].strip())
+    df[FINAL_LABEL_COLUMN] = df[INPUT_LABEL_COLUMN].astype(str).str.split(',').str[0].str.strip()
 
-    clean_df = df[[FINAL_TEXT_COLUMN, FINAL_LABEL_COLUMN]].copy()
+    clean_df = df[[FINAL_TEXT_COLUMN, FINAL_LABEL_COLUMN, INPUT_LABEL_COLUMN]].copy()
     
     clean_df.dropna(subset=[FINAL_TEXT_COLUMN, FINAL_LABEL_COLUMN], inplace=True)
     clean_df = clean_df[
@@ -58,6 +85,7 @@ def load_data_from_csv(file_path):
     
     return clean_df
 
+@traced("write")
 def save_json_pool(dataframe, file_path):
     """
     Salva o DataFrame como um pool de dados em formato JSONL (JSON Lines).
@@ -75,28 +103,50 @@ def main():
     """
     Função principal que orquestra a criação dos folds de validação cruzada.
     """
+    start_trace(Path(__file__).stem, DATASET_NAME)
     
     full_df = load_data_from_csv(INPUT_FILE_PATH)
     if full_df is None or len(full_df) == 0:
         print("ERRO: Nenhum dado processado. Encerrando.")
         return
 
+    full_df, _ = apply_quality_filter(full_df, FINAL_TEXT_COLUMN, QUALITY_RULES)
+
     # deduplicação
     print(f"\nTotal de amostras antes da deduplicação: {len(full_df)}")
-    df_deduplicated = full_df.drop_duplicates(subset=[FINAL_TEXT_COLUMN]).reset_index(drop=True)
+    df_deduplicated = normalize_and_deduplicate(full_df, FINAL_TEXT_COLUMN)
     removidas = len(full_df) - len(df_deduplicated)
     print(f"Total de amostras únicas (após deduplicação): {len(df_deduplicated)} (removidas {removidas} duplicatas)")
 
+    if NEAR_DUP_THRESHOLD is not None:
+        df_deduplicated = drop_near_duplicates(df_deduplicated, FINAL_TEXT_COLUMN, NEAR_DUP_THRESHOLD)
+
+    label_vocab = write_label_vocab(
+        Path(OUTPUT_BASE_DIR) / DATASET_NAME, None, df_deduplicated[FINAL_LABEL_COLUMN]
+    )
+    if ENCODE_LABEL_IDS:
+        df_deduplicated[LABEL_ID_COLUMN] = encode_labels(df_deduplicated[FINAL_LABEL_COLUMN], label_vocab)
+
     # embaralhar
     print(f"\nEmbaralhando o dataset único com a semente {RANDOM_SEED}...")
     df_shuffled = df_deduplicated.sample(frac=1, random_state=RANDOM_SEED).reset_index(drop=True)
+    categories = df_shuffled.pop(INPUT_LABEL_COLUMN)
 
     # dividir em Folds
-    print(f"Dividindo os dados únicos em {NUM_FOLDS} folds...")
-    folds = [df_shuffled.iloc[idx] for idx in np.array_split(range(len(df_shuffled)), NUM_FOLDS)]
+    if MULTI_LABEL:
+        label_matrix, multilabel_vocab = parse_label_lists(categories)
+        write_multilabel_vocab(Path(OUTPUT_BASE_DIR) / DATASET_NAME, multilabel_vocab)
+        print(f"Dividindo os dados únicos em {NUM_FOLDS} folds com estratificação iterativa multi-label...")
+        fold_positions = multilabel_folds(label_matrix, NUM_FOLDS, RANDOM_SEED)
+    else:
+        print(f"Dividindo os dados únicos em {NUM_FOLDS} folds estratificados por classe...")
+        fold_positions = stratified_folds(df_shuffled[FINAL_LABEL_COLUMN], NUM_FOLDS, RANDOM_SEED)
+    folds = [df_shuffled.iloc[idx] for idx in fold_positions]
 
     output_root = Path(OUTPUT_BASE_DIR) / DATASET_NAME / "few_shot"
 
+    fingerprint_splits = {}
+
     for i in range(NUM_FOLDS):
         fold_name = f"{i+1:02d}"
         print(f"\nProcessando Fold {fold_name}/{NUM_FOLDS}")
@@ -120,6 +170,24 @@ def main():
         save_json_pool(df_train, output_path / "train.jsonl")
         save_json_pool(df_valid, output_path / "valid.jsonl")
         save_json_pool(df_test, output_path / "test.jsonl")
+        save_train_order(output_path, df_train[FINAL_LABEL_COLUMN], RANDOM_SEED + i)
+
+        fingerprint_splits[fold_name] = {
+            "train": df_train[FINAL_TEXT_COLUMN],
+            "valid": df_valid[FINAL_TEXT_COLUMN],
+            "test": df_test[FINAL_TEXT_COLUMN],
+        }
+        save_lengths(output_path, fingerprint_splits[fold_name])
+        if MULTI_LABEL:
+            save_multilabel(output_path, split_rows(label_matrix, fold_positions, i, NUM_FOLDS), len(multilabel_vocab))
+
+    save_fingerprint_index(Path(OUTPUT_BASE_DIR) / DATASET_NAME, fingerprint_splits)
+    save_manifest(Path(OUTPUT_BASE_DIR) / DATASET_NAME, df_shuffled[FINAL_TEXT_COLUMN], fingerprint_splits)
+    if REPEATED_CV_SEEDS:
+        save_repeated_cv(
+            Path(OUTPUT_BASE_DIR) / DATASET_NAME, df_shuffled, FINAL_LABEL_COLUMN,
+            REPEATED_CV_SEEDS, REPEATED_CV_FOLD_COUNTS, save_json_pool,
+        )
 
     print(f"\nPROCESSO CONCLUÍDO! {NUM_FOLDS} folds de validação cruzada foram criados em '{output_root}'")
 
@@ -1,10 +1,28 @@
 import pandas as pd
 import json
+import sys
 import shutil
 from pathlib import Path
-import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+from pipeline_utils.labels import LABEL_ID_COLUMN, encode_labels, write_label_vocab
+from pipeline_utils.near_dup import drop_near_duplicates
+from pipeline_utils.fingerprints import save_fingerprint_index
+from pipeline_utils.normalize import normalize_and_deduplicate
+from pipeline_utils.quality import apply_quality_filter
+from pipeline_utils.trace import note_rows_in, start_trace, traced
+from pipeline_utils.partition import save_manifest
+from pipeline_utils.folds import save_repeated_cv, save_train_order, split_rows, stratified_folds
+from pipeline_utils.lengths import save_lengths
+from pipeline_utils.provenance import SOURCE_ID_COLUMN, save_provenance, write_source_table
 
 INPUT_FILES = ["train.jsonl", "validation.jsonl", "test.jsonl"]
+# Origem de cada arquivo de INPUT_FILES (mesma ordem), gravada no sources.json e nos provenance.npz
+SOURCES = [
+    {"file": "train.jsonl", "split": "train"},
+    {"file": "validation.jsonl", "split": "validation"},
+    {"file": "test.jsonl", "split": "test"},
+]
 
 INPUT_TEXT_COLUMN = 'Noticia'    
 INPUT_LABEL_COLUMN = 'Categoria' 
@@ -16,6 +34,15 @@ OUTPUT_BASE_DIR = str(Path(__file__).resolve().parents[3] / "category")
 DATASET_NAME = "RecognasummCorpus"
 NUM_FOLDS = 5
 RANDOM_SEED = 42
+# Se True, os folds também recebem a coluna 'label_id' (índice no labels.json)
+ENCODE_LABEL_IDS = False
+# Limiar de Jaccard para remover quase-duplicatas (MinHash + LSH); None desativa
+NEAR_DUP_THRESHOLD = None
+# Regras do filtro de qualidade em lote (ver pipeline_utils/quality.py)
+QUALITY_RULES = {}
+# Validação cruzada repetida: uma divisão por semente x nº de folds sobre um único pool; [] desativa
+REPEATED_CV_SEEDS = []
+REPEATED_CV_FOLD_COUNTS = [NUM_FOLDS]
 
 
 LABEL_MAP = {
@@ -60,6 +87,7 @@ LABEL_MAP = {
 
 
 
+@traced("load")
 def load_and_merge_splits(files_list):
     """
     Carrega, junta, extrai e limpa os dados de múltiplos arquivos JSONL.
@@ -67,7 +95,7 @@ def load_and_merge_splits(files_list):
     all_data = []
     print("Carregando e juntando arquivos JSONL...")
     
-    for file_path in files_list:
+    for source_id, file_path in enumerate(files_list):
         print(f"Lendo '{file_path}'...")
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
@@ -80,7 +108,8 @@ def load_and_merge_splits(files_list):
                         if text and label:
                             all_data.append({
                                 FINAL_TEXT_COLUMN: text,
-                                FINAL_LABEL_COLUMN: label
+                                FINAL_LABEL_COLUMN: label,
+                                SOURCE_ID_COLUMN: source_id
                             })
                     except json.JSONDecodeError:
                         print(f"Aviso: Ignorando linha mal formatada em {file_path}")
@@ -98,6 +127,7 @@ def load_and_merge_splits(files_list):
     print(f"Total de {len(df)} amostras carregadas de {len(files_list)} arquivos.")
     
     initial_rows = len(df)
+    note_rows_in(initial_rows)
     
     df.dropna(subset=[FINAL_TEXT_COLUMN, FINAL_LABEL_COLUMN], inplace=True)
     
@@ -125,6 +155,7 @@ def load_and_merge_splits(files_list):
     print(f"Total final: {len(df)} amostras limpas e traduzidas.")
     return df
 
+@traced("write")
 def save_json_pool(dataframe, file_path):
     """
     Salva o DataFrame como um pool de dados em formato JSONL (JSON Lines).
@@ -141,24 +172,41 @@ def main():
     """
     Função principal que orquestra a criação dos folds de validação cruzada.
     """
+    start_trace(Path(__file__).stem, DATASET_NAME)
     
     full_df = load_and_merge_splits(INPUT_FILES)
     if full_df is None or len(full_df) == 0:
         print("ERRO: Nenhum dado processado. Encerrando.")
         return
 
+    full_df, _ = apply_quality_filter(full_df, FINAL_TEXT_COLUMN, QUALITY_RULES)
+
     print(f"\nTotal de amostras antes da deduplicação: {len(full_df)}")
-    df_deduplicated = full_df.drop_duplicates(subset=[FINAL_TEXT_COLUMN]).reset_index(drop=True)
+    df_deduplicated = normalize_and_deduplicate(full_df, FINAL_TEXT_COLUMN)
     print(f"Total de amostras únicas (após deduplicação): {len(df_deduplicated)}")
 
+    if NEAR_DUP_THRESHOLD is not None:
+        df_deduplicated = drop_near_duplicates(df_deduplicated, FINAL_TEXT_COLUMN, NEAR_DUP_THRESHOLD)
+
+    label_vocab = write_label_vocab(
+        Path(OUTPUT_BASE_DIR) / DATASET_NAME, LABEL_MAP.values(), df_deduplicated[FINAL_LABEL_COLUMN]
+    )
+    if ENCODE_LABEL_IDS:
+        df_deduplicated[LABEL_ID_COLUMN] = encode_labels(df_deduplicated[FINAL_LABEL_COLUMN], label_vocab)
+
     print(f"\nEmbaralhando o dataset único com a semente {RANDOM_SEED}...")
     df_shuffled = df_deduplicated.sample(frac=1, random_state=RANDOM_SEED).reset_index(drop=True)
+    source_ids = df_shuffled.pop(SOURCE_ID_COLUMN).to_numpy()
+    write_source_table(Path(OUTPUT_BASE_DIR) / DATASET_NAME, SOURCES, source_ids)
 
-    print(f"Dividindo os dados únicos em {NUM_FOLDS} folds...")
-    folds = [df_shuffled.iloc[idx] for idx in np.array_split(range(len(df_shuffled)), NUM_FOLDS)]
+    print(f"Dividindo os dados únicos em {NUM_FOLDS} folds estratificados por classe...")
+    fold_positions = stratified_folds(df_shuffled[FINAL_LABEL_COLUMN], NUM_FOLDS, RANDOM_SEED)
+    folds = [df_shuffled.iloc[idx] for idx in fold_positions]
 
     output_root = Path(OUTPUT_BASE_DIR) / DATASET_NAME / "few_shot"
 
+    fingerprint_splits = {}
+
     for i in range(NUM_FOLDS):
         fold_name = f"{i+1:02d}"
         print(f"\nProcessando Fold {fold_name}/{NUM_FOLDS}")
@@ -183,6 +231,23 @@ def main():
         save_json_pool(df_train, output_path / "train.jsonl")
         save_json_pool(df_valid, output_path / "valid.jsonl")
         save_json_pool(df_test, output_path / "test.jsonl")
+        save_train_order(output_path, df_train[FINAL_LABEL_COLUMN], RANDOM_SEED + i)
+
+        fingerprint_splits[fold_name] = {
+            "train": df_train[FINAL_TEXT_COLUMN],
+            "valid": df_valid[FINAL_TEXT_COLUMN],
+            "test": df_test[FINAL_TEXT_COLUMN],
+        }
+        save_lengths(output_path, fingerprint_splits[fold_name])
+        save_provenance(output_path, split_rows(source_ids, fold_positions, i, NUM_FOLDS))
+
+    save_fingerprint_index(Path(OUTPUT_BASE_DIR) / DATASET_NAME, fingerprint_splits)
+    save_manifest(Path(OUTPUT_BASE_DIR) / DATASET_NAME, df_shuffled[FINAL_TEXT_COLUMN], fingerprint_splits)
+    if REPEATED_CV_SEEDS:
+        save_repeated_cv(
+            Path(OUTPUT_BASE_DIR) / DATASET_NAME, df_shuffled, FINAL_LABEL_COLUMN,
+            REPEATED_CV_SEEDS, REPEATED_CV_FOLD_COUNTS, save_json_pool,
+        )
 
     print(f"\nPROCESSO CONCLUÍDO! {NUM_FOLDS} folds de validação cruzada foram criados em '{output_root}'")
 
@@ -8,13 +8,23 @@ embaralha e gera 5 folds de validação cruzada.
 """
 
 import json
+import sys
 import shutil
 import urllib.request
 import tarfile
 from pathlib import Path
-import numpy as np
 import pandas as pd
-from sklearn.model_selection import StratifiedKFold
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+from pipeline_utils.labels import LABEL_ID_COLUMN, encode_labels, write_label_vocab
+from pipeline_utils.near_dup import drop_near_duplicates
+from pipeline_utils.fingerprints import save_fingerprint_index
+from pipeline_utils.normalize import normalize_and_deduplicate
+from pipeline_utils.quality import apply_quality_filter
+from pipeline_utils.trace import note_rows_in, start_trace, traced
+from pipeline_utils.partition import save_manifest
+from pipeline_utils.folds import save_repeated_cv, save_train_order, stratified_folds
+from pipeline_utils.lengths import save_lengths
 
 # ---------------------------------------------------------------------------
 # Configuração
@@ -30,6 +40,15 @@ OUTPUT_BASE_DIR = str(Path(__file__).resolve().parents[3] / "intent")
 DATASET_NAME    = "IntentPTCorpus"
 NUM_FOLDS       = 5
 RANDOM_SEED     = 42
+# Se True, os folds também recebem a coluna 'label_id' (índice no labels.json)
+ENCODE_LABEL_IDS = False
+# Limiar de Jaccard para remover quase-duplicatas (MinHash + LSH); None desativa
+NEAR_DUP_THRESHOLD = None
+# Regras do filtro de qualidade em lote (ver pipeline_utils/quality.py)
+QUALITY_RULES = {}
+# Validação cruzada repetida: uma divisão por semente x nº de folds sobre um único pool; [] desativa
+REPEATED_CV_SEEDS = []
+REPEATED_CV_FOLD_COUNTS = [NUM_FOLDS]
 
 # Mapeamento dos 60 intents para PT-BR
 LABEL_MAP = {
@@ -99,6 +118,7 @@ LABEL_MAP = {
 # Funções
 # ---------------------------------------------------------------------------
 
+@traced("download")
 def download_and_extract_data() -> Path:
     """
     Verifica se o arquivo pt-PT.jsonl já existe localmente.
@@ -140,6 +160,7 @@ def download_and_extract_data() -> Path:
     return local_jsonl
 
 
+@traced("load")
 def load_data_from_jsonl(file_path: Path) -> pd.DataFrame | None:
     """
     Carrega, extrai, limpa e traduz os dados do arquivo JSONL.
@@ -166,6 +187,7 @@ def load_data_from_jsonl(file_path: Path) -> pd.DataFrame | None:
         return None
 
     initial_rows = len(df)
+    note_rows_in(initial_rows)
     df.dropna(subset=[INPUT_TEXT_COLUMN, INPUT_LABEL_COLUMN], inplace=True)
     
     clean_df = df[[INPUT_TEXT_COLUMN, INPUT_LABEL_COLUMN]].copy()
@@ -192,6 +214,7 @@ def load_data_from_jsonl(file_path: Path) -> pd.DataFrame | None:
     return clean_df
 
 
+@traced("write")
 def save_json_pool(dataframe: pd.DataFrame, file_path: Path) -> None:
     """
     Salva o DataFrame como um pool de dados em formato JSONL (JSON Lines).
@@ -209,6 +232,8 @@ def main() -> None:
     """
     Função principal que orquestra a criação dos folds de validação cruzada.
     """
+    start_trace(Path(__file__).stem, DATASET_NAME)
+
     # Garante que os dados do MASSIVE estão disponíveis localmente
     try:
         jsonl_path = download_and_extract_data()
@@ -220,20 +245,32 @@ def main() -> None:
     if full_df is None:
         return
 
+    full_df, _ = apply_quality_filter(full_df, FINAL_TEXT_COLUMN, QUALITY_RULES)
+
     print(f"\nTotal de amostras antes da deduplicação: {len(full_df)}")
-    df_deduplicated = full_df.drop_duplicates(subset=[FINAL_TEXT_COLUMN]).reset_index(drop=True)
+    df_deduplicated = normalize_and_deduplicate(full_df, FINAL_TEXT_COLUMN)
     print(f"Total de amostras únicas (após deduplicação): {len(df_deduplicated)}")
 
+    if NEAR_DUP_THRESHOLD is not None:
+        df_deduplicated = drop_near_duplicates(df_deduplicated, FINAL_TEXT_COLUMN, NEAR_DUP_THRESHOLD)
+
+    label_vocab = write_label_vocab(
+        Path(OUTPUT_BASE_DIR) / DATASET_NAME, LABEL_MAP.values(), df_deduplicated[FINAL_LABEL_COLUMN]
+    )
+    if ENCODE_LABEL_IDS:
+        df_deduplicated[LABEL_ID_COLUMN] = encode_labels(df_deduplicated[FINAL_LABEL_COLUMN], label_vocab)
+
     print(f"\nEmbaralhando o dataset único com a semente {RANDOM_SEED}...")
     df_shuffled = df_deduplicated.sample(frac=1, random_state=RANDOM_SEED).reset_index(drop=True)
 
     print(f"Dividindo os dados em {NUM_FOLDS} folds ESTRATIFICADOS por classe...")
-    skf = StratifiedKFold(n_splits=NUM_FOLDS, shuffle=True, random_state=RANDOM_SEED)
-    fold_indices = list(skf.split(df_shuffled, df_shuffled[FINAL_LABEL_COLUMN]))
-    folds = [df_shuffled.iloc[test_idx].reset_index(drop=True) for _, test_idx in fold_indices]
+    fold_positions = stratified_folds(df_shuffled[FINAL_LABEL_COLUMN], NUM_FOLDS, RANDOM_SEED)
+    folds = [df_shuffled.iloc[idx].reset_index(drop=True) for idx in fold_positions]
 
     output_root = Path(OUTPUT_BASE_DIR) / DATASET_NAME / "few_shot"
 
+    fingerprint_splits = {}
+
     for i in range(NUM_FOLDS):
         fold_name = f"{i+1:02d}"
         print(f"\nProcessando Fold {fold_name}/{NUM_FOLDS}")
@@ -258,6 +295,22 @@ def main() -> None:
         save_json_pool(df_train, output_path / "train.jsonl")
         save_json_pool(df_valid, output_path / "valid.jsonl")
         save_json_pool(df_test, output_path / "test.jsonl")
+        save_train_order(output_path, df_train[FINAL_LABEL_COLUMN], RANDOM_SEED + i)
+
+        fingerprint_splits[fold_name] = {
+            "train": df_train[FINAL_TEXT_COLUMN],
+            "valid": df_valid[FINAL_TEXT_COLUMN],
+            "test": df_test[FINAL_TEXT_COLUMN],
+        }
+        save_lengths(output_path, fingerprint_splits[fold_name])
+
+    save_fingerprint_index(Path(OUTPUT_BASE_DIR) / DATASET_NAME, fingerprint_splits)
+    save_manifest(Path(OUTPUT_BASE_DIR) / DATASET_NAME, df_shuffled[FINAL_TEXT_COLUMN], fingerprint_splits)
+    if REPEATED_CV_SEEDS:
+        save_repeated_cv(
+            Path(OUTPUT_BASE_DIR) / DATASET_NAME, df_shuffled, FINAL_LABEL_COLUMN,
+            REPEATED_CV_SEEDS, REPEATED_CV_FOLD_COUNTS, save_json_pool,
+        )
 
     print(f"\nPROCESSO CONCLUÍDO! {NUM_FOLDS} folds de validação cruzada foram criados em '{output_root}'")
 
@@ -1,8 +1,19 @@
 import pandas as pd
 import json
+import sys
 import shutil
 from pathlib import Path
-import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+from pipeline_utils.labels import LABEL_ID_COLUMN, encode_labels, write_label_vocab
+from pipeline_utils.near_dup import drop_near_duplicates
+from pipeline_utils.fingerprints import save_fingerprint_index
+from pipeline_utils.normalize import normalize_and_deduplicate
+from pipeline_utils.quality import apply_quality_filter
+from pipeline_utils.trace import note_rows_in, start_trace, traced
+from pipeline_utils.partition import save_manifest
+from pipeline_utils.folds import save_repeated_cv, save_train_order, stratified_folds
+from pipeline_utils.lengths import save_lengths
 
 LABEL_TO_USE = 'polarity'
 LABEL_MAP = {
@@ -16,6 +27,19 @@ FINAL_TEXT_COLUMN = 'text'
 OUTPUT_BASE_DIR = str(Path(__file__).resolve().parents[3] / "reviews")
 NUM_FOLDS = 5
 RANDOM_SEED = 42
+# Se True, os folds também recebem a coluna 'label_id' (índice no labels.json)
+ENCODE_LABEL_IDS = False
+# Limiar de Jaccard para remover quase-duplicatas (MinHash + LSH); None desativa
+NEAR_DUP_THRESHOLD = None
+# Regras do filtro de qualidade em lote (ver pipeline_utils/quality.py)
+QUALITY_RULES = {
+    "mask_urls": True,
+    "min_tokens": 2,
+    "drop_non_alpha": True,
+}
+# Validação cruzada repetida: uma divisão por semente x nº de folds sobre um único pool; [] desativa
+REPEATED_CV_SEEDS = []
+REPEATED_CV_FOLD_COUNTS = [NUM_FOLDS]
 
 DATASETS_TO_PROCESS = [
     {
@@ -29,6 +53,7 @@ DATASETS_TO_PROCESS = [
 ]
 
 
+@traced("load")
 def load_data_from_csv(file_path, label_column):
     print(f"Carregando dados do arquivo CSV: '{file_path}'...")
     try:
@@ -59,6 +84,7 @@ def load_data_from_csv(file_path, label_column):
     df[label_column] = pd.to_numeric(df[label_column], errors='coerce')
 
     initial_rows = len(df)
+    note_rows_in(initial_rows)
 
     df.dropna(subset=[FINAL_TEXT_COLUMN, label_column], inplace=True)
     df[label_column] = df[label_column].astype(int)
@@ -72,6 +98,7 @@ def load_data_from_csv(file_path, label_column):
     return clean_df
 
 
+@traced("write")
 def save_json_pool(dataframe, file_path, label_column):
     data_list = dataframe.rename(columns={label_column: 'label'}).to_dict('records')
 
@@ -91,20 +118,34 @@ def process_single_dataset(input_file, dataset_name, label_column):
         print(f"Falha ao carregar '{input_file}'. Pulando para o próximo.")
         return
 
+    full_df, _ = apply_quality_filter(full_df, FINAL_TEXT_COLUMN, QUALITY_RULES)
+
     print(f"\nTotal de amostras antes da deduplicação: {len(full_df)}")
-    df_deduplicated = full_df.drop_duplicates(subset=[FINAL_TEXT_COLUMN]).reset_index(drop=True)
+    df_deduplicated = normalize_and_deduplicate(full_df, FINAL_TEXT_COLUMN)
     removidas = len(full_df) - len(df_deduplicated)
     print(f"Total de amostras únicas (após deduplicação): {len(df_deduplicated)} (removidas {removidas} duplicatas)")
 
+    if NEAR_DUP_THRESHOLD is not None:
+        df_deduplicated = drop_near_duplicates(df_deduplicated, FINAL_TEXT_COLUMN, NEAR_DUP_THRESHOLD)
+
+    label_vocab = write_label_vocab(
+        Path(OUTPUT_BASE_DIR) / dataset_name, LABEL_MAP.values(), df_deduplicated[label_column]
+    )
+    if ENCODE_LABEL_IDS:
+        df_deduplicated[LABEL_ID_COLUMN] = encode_labels(df_deduplicated[label_column], label_vocab)
+
     print(f"\nEmbaralhando o dataset {dataset_name} (único) com a semente {RANDOM_SEED}...")
     df_shuffled = df_deduplicated.sample(frac=1, random_state=RANDOM_SEED).reset_index(drop=True)
 
-    print(f"Dividindo os dados únicos em {NUM_FOLDS} folds...")
-    folds = [df_shuffled.iloc[idx] for idx in np.array_split(range(len(df_shuffled)), NUM_FOLDS)]
+    print(f"Dividindo os dados únicos em {NUM_FOLDS} folds estratificados por classe...")
+    fold_positions = stratified_folds(df_shuffled[label_column], NUM_FOLDS, RANDOM_SEED)
+    folds = [df_shuffled.iloc[idx] for idx in fold_positions]
 
     output_root = Path(OUTPUT_BASE_DIR) / dataset_name / "few_shot"
     print(f"Preparando pasta de saída: {output_root}")
 
+    fingerprint_splits = {}
+
     for i in range(NUM_FOLDS):
         fold_name = f"{i+1:02d}"
         print(f"Processando Fold {fold_name}/{NUM_FOLDS}")
@@ -127,11 +168,28 @@ def process_single_dataset(input_file, dataset_name, label_column):
         save_json_pool(df_train, output_path / "train.jsonl", label_column)
         save_json_pool(df_valid, output_path / "valid.jsonl", label_column)
         save_json_pool(df_test, output_path / "test.jsonl", label_column)
+        save_train_order(output_path, df_train[label_column], RANDOM_SEED + i)
+
+        fingerprint_splits[fold_name] = {
+            "train": df_train[FINAL_TEXT_COLUMN],
+            "valid": df_valid[FINAL_TEXT_COLUMN],
+            "test": df_test[FINAL_TEXT_COLUMN],
+        }
+        save_lengths(output_path, fingerprint_splits[fold_name])
+
+    save_fingerprint_index(Path(OUTPUT_BASE_DIR) / dataset_name, fingerprint_splits)
+    save_manifest(Path(OUTPUT_BASE_DIR) / dataset_name, df_shuffled[FINAL_TEXT_COLUMN], fingerprint_splits)
+    if REPEATED_CV_SEEDS:
+        save_repeated_cv(
+            Path(OUTPUT_BASE_DIR) / dataset_name, df_shuffled, label_column,
+            REPEATED_CV_SEEDS, REPEATED_CV_FOLD_COUNTS, lambda df, path: save_json_pool(df, path, label_column),
+        )
 
     print(f"\nPROCESSO CONCLUÍDO PARA: {dataset_name}")
 
 
 def main():
+    start_trace(Path(__file__).stem)
     print("Iniciando processamento em lote...")
 
     if not DATASETS_TO_PROCESS:
@@ -93,6 +93,9 @@ cd "$ROOT_DIR" || exit
 echo "=========================================================="
 echo "Executando scripts de processamento..."
 
+# Cada script grava um trace JSON por etapa (pipeline_utils/trace.py) nesta pasta
+export PIPELINE_TRACE_DIR="$ROOT_DIR/traces/run-$(date +%Y%m%d-%H%M%S)"
+
 # Coleta scripts em array (evita subshell do while|pipe)
 mapfile -t SCRIPTS < <(find "$ROOT_DIR/raw_data" -type f \( -name "process*.py" -o -name "processar*.py" \) | sort)
 
@@ -117,6 +120,16 @@ for script in "${SCRIPTS[@]}"; do
     cd "$ROOT_DIR" || exit
 done
 
+echo "=========================================================="
+echo "Resumo por etapa (traces em $PIPELINE_TRACE_DIR):"
+"$PYTHON_CMD" "$ROOT_DIR/trace_summary.py" "$PIPELINE_TRACE_DIR" \
+    || echo "Aviso: Não foi possível gerar o resumo dos traces."
+
+echo "=========================================================="
+echo "Atualizando estatísticas dos corpora (stats.json)..."
+"$PYTHON_CMD" "$ROOT_DIR/corpus_stats.py" \
+    || echo "Aviso: Não foi possível gerar as estatísticas dos corpora."
+
 echo "=========================================================="
 if [ "$FAILED" -eq 0 ]; then
     echo "Todos os scripts foram executados com sucesso!"
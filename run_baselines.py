@@ -0,0 +1,145 @@
+"""
+run_baselines.py
+================
+Números de referência para todos os corpora e folds: treina e avalia
+baselines lineares (`pipeline_utils/baselines.py`) sobre as matrizes do
+feature store em um pool de processos.
+
+Primeiro as entradas do feature store que faltam são construídas (um job por
+corpus e configuração, reaproveitando as existentes). Depois cada combinação
+de corpus, fold, configuração e modelo vira um job independente. O resultado
+é uma tabela CSV com as métricas de valid e teste e o tempo de cada job
+(leitura das features, treino e predição).
+
+Uso:
+  python run_baselines.py                                  # todos os corpora, word_1-2, os dois modelos
+  python run_baselines.py --corpus HateBRCorpus TuPyCorpus --model logreg
+  python run_baselines.py --config word_1-2 char_2-5 --jobs 8 --output baselines.csv
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from pipeline_utils.baselines import EVAL_SPLITS, MODELS, run_job
+from pipeline_utils.features import FEATURE_STORE_DIR, VECTORIZER_CONFIGS, build_features
+from validate_pipeline import BASE_DIR, DATASETS, NUM_FOLDS
+
+DEFAULT_OUTPUT = BASE_DIR / "benchmarks" / "results" / "baselines.csv"
+DEFAULT_CONFIGS = ["word_1-2"]
+
+COLUMNS = [
+    "corpus", "fold", "config", "model", "status", "n_train", "n_classes",
+    *[f"{split}_{metric}" for split in EVAL_SPLITS for metric in ["accuracy", "macro_f1"]],
+    "load_s", "fit_s", "predict_s", "job_s",
+]
+
+
+def train_size(corpus_dir):
+    return sum(f.stat().st_size for f in (corpus_dir / "few_shot").glob("*/train.jsonl"))
+
+
+def _build_entry(corpus_dir, config_name, store_root):
+    start = time.perf_counter()
+    _, fresh = build_features(corpus_dir, config_name, store_root)
+    return corpus_dir.name, config_name, fresh, time.perf_counter() - start
+
+
+def _timed_job(*args):
+    start = time.perf_counter()
+    result = run_job(*args)
+    result["job_s"] = time.perf_counter() - start
+    return result
+
+
+def build_missing_features(pool, corpus_dirs, configs, store_root):
+    futures = [pool.submit(_build_entry, corpus_dir, config_name, store_root)
+               for corpus_dir in corpus_dirs for config_name in configs]
+    for future in as_completed(futures):
+        name, config_name, fresh, elapsed = future.result()
+        if fresh:
+            print(f"Features {name} / {config_name} construídas em {elapsed:.2f}s")
+
+
+def write_results(path, results):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS)
+        writer.writeheader()
+        for result in results:
+            writer.writerow({key: round(value, 4) if isinstance(value, float) else value
+                             for key, value in result.items()})
+    print(f"\nResultados salvos em: {path}")
+
+
+def print_summary(results):
+    """Média do macro-F1 de teste entre os folds, por corpus, configuração e modelo."""
+    groups = {}
+    for result in results:
+        if result["test_macro_f1"] is not None:
+            key = (result["corpus"], result["config"], result["model"])
+            groups.setdefault(key, []).append(result["test_macro_f1"])
+    print(f"\n{'Corpus':<22} {'Config':<10} {'Modelo':<11} {'Folds':>5} {'Macro-F1 (teste)':>17}")
+    for (name, config_name, model_name), scores in sorted(groups.items()):
+        print(f"{name:<22} {config_name:<10} {model_name:<11} {len(scores):>5} {sum(scores) / len(scores):>17.4f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Baselines lineares em todos os corpora e folds.")
+    parser.add_argument("--corpus", nargs="+", default=None, help="Corpora a avaliar (padrão: todos).")
+    parser.add_argument("--config", nargs="+", choices=list(VECTORIZER_CONFIGS), default=DEFAULT_CONFIGS)
+    parser.add_argument("--model", nargs="+", choices=MODELS, default=MODELS)
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Processos no pool.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--store", type=Path, default=FEATURE_STORE_DIR)
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    args = parser.parse_args(argv)
+
+    corpus_dirs = []
+    for ds in DATASETS:
+        if args.corpus is not None and ds["name"] not in args.corpus:
+            continue
+        corpus_dir = BASE_DIR / ds["task"] / ds["name"]
+        if not (corpus_dir / "few_shot").exists():
+            print(f"AVISO: {ds['name']} sem folds em {corpus_dir}. Ignorado.")
+            continue
+        corpus_dirs.append(corpus_dir)
+    if not corpus_dirs:
+        print("ERRO: Nenhum corpus com folds disponível.")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        build_missing_features(pool, corpus_dirs, args.config, args.store)
+
+        # um job por corpus/fold/configuração/modelo; os maiores corpora entram primeiro
+        jobs = [
+            (corpus_dir, config_name, f"{fold:02d}", model_name, args.seed, args.store)
+            for corpus_dir in sorted(corpus_dirs, key=train_size, reverse=True)
+            for fold in range(1, NUM_FOLDS + 1)
+            for config_name in args.config
+            for model_name in args.model
+        ]
+        print(f"\n{len(jobs)} job(s) em {args.jobs} processo(s)...")
+        futures = [pool.submit(_timed_job, *job) for job in jobs]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            score = "" if result["test_macro_f1"] is None else f"macro-F1 {result['test_macro_f1']:.4f}"
+            print(f"{result['corpus']:<22} fold {result['fold']} {result['config']:<10} {result['model']:<11} "
+                  f"{result['job_s']:>7.2f}s  {result['status']} {score}")
+
+    results.sort(key=lambda r: (r["corpus"], r["config"], r["model"], r["fold"]))
+    print_summary(results)
+    write_results(args.output, results)
+    failed = sum(result["status"] != "OK" for result in results)
+    print(f"{len(results)} job(s) em {time.perf_counter() - start:.1f}s; {failed} com problema.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+sample_mixture.py
+=================
+Mostra as probabilidades da mistura multi-tarefa dos corpora do registro
+(`pipeline_utils/mixture.py`) para uma temperatura ou pesos e, com
+`--steps`, lê a mistura e compara a proporção obtida com a esperada.
+Com `--checkpoint`, a posição é retomada do arquivo (se existir) e gravada
+de novo no fim.
+
+Uso:
+  python sample_mixture.py --temperature 2
+  python sample_mixture.py --weights B2WReviewsCorpus=2 TuPyCorpus=1 --steps 100000
+  python sample_mixture.py --steps 50000 --checkpoint mixture_state.json
+
+No treino:
+  from pipeline_utils.mixture import MixtureIterator
+  stream = MixtureIterator.from_registry("01", "train", temperature=2.0, seed=42)
+  state = stream.state_dict()                       # json.dump no checkpoint
+  stream = MixtureIterator.from_registry("01", "train", temperature=2.0, seed=42, state=state)
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+from pipeline_utils.mixture import DEFAULT_SEED, DEFAULT_TEMPERATURE, MixtureIterator
+from validate_pipeline import DATASETS
+
+
+def parse_weights(items):
+    weights = {}
+    for item in items:
+        name, _, value = item.partition("=")
+        try:
+            weights[name] = float(value)
+        except ValueError:
+            print(f"ERRO: Peso inválido '{item}' (use Corpus=peso).")
+            sys.exit(1)
+    unknown = sorted(set(weights) - {ds["name"] for ds in DATASETS})
+    if unknown:
+        print(f"ERRO: Corpora desconhecidos em --weights: {', '.join(unknown)}. "
+              f"Opções: {', '.join(ds['name'] for ds in DATASETS)}")
+        sys.exit(1)
+    return weights
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Probabilidades e amostragem da mistura multi-tarefa.")
+    parser.add_argument("--fold", default="01")
+    parser.add_argument("--split", default="train")
+    parser.add_argument("--temperature", type=float, default=DEFAULT_TEMPERATURE)
+    parser.add_argument("--weights", nargs="+", default=None, help="Pesos por corpus (Corpus=peso); ignora a temperatura.")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--steps", type=int, default=0, help="Exemplos a ler da mistura.")
+    parser.add_argument("--checkpoint", type=Path, default=None, help="Arquivo JSON com a posição da mistura.")
+    args = parser.parse_args(argv)
+
+    weights = parse_weights(args.weights) if args.weights else None
+    state = None
+    if args.checkpoint and args.checkpoint.exists():
+        state = json.loads(args.checkpoint.read_text(encoding="utf-8"))
+
+    try:
+        stream = MixtureIterator.from_registry(args.fold, args.split, temperature=args.temperature,
+                                               weights=weights, seed=args.seed, state=state)
+    except ValueError as e:
+        print(f"ERRO: {e}")
+        sys.exit(1)
+    if state is not None:
+        print(f"Retomando do passo {state['step']} ({args.checkpoint}).")
+    start_step = stream.step
+    start = time.perf_counter()
+    with stream:
+        for _ in range(args.steps):
+            next(stream)
+    elapsed = time.perf_counter() - start
+    taken = stream.state_dict()["sources"]
+
+    read = stream.step - start_step
+    print(f"\n{'Corpus':<22} {'Tarefa':<9} {'Exemplos':>9} {'Prob.':>7} {'Lidos':>9} {'Época':>6}")
+    for source, p in zip(stream.sources, stream.probabilities):
+        position = taken[source["name"]]
+        print(f"{source['name']:<22} {source['task']:<9} {source['size']:>9} {p:>7.2%} "
+              f"{position['examples']:>9} {position['epoch']:>6}")
+    if read:
+        print(f"\n{read} exemplo(s) em {elapsed:.2f}s ({read / elapsed:,.0f}/s); passo atual {stream.step}.")
+
+    if args.checkpoint:
+        args.checkpoint.write_text(json.dumps(stream.state_dict(), indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"Posição salva em: {args.checkpoint}")
+
+
+if __name__ == "__main__":
+    main()
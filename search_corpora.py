@@ -0,0 +1,105 @@
+"""
+search_corpora.py
+=================
+Busca textual sobre o pool de todos os corpora, com filtros por corpus,
+label, fold e split (`pipeline_utils/search_index.py`). O índice SQLite FTS5
+é construído com `--build`; corpora cujos folds não mudaram são mantidos.
+
+Uso:
+  python search_corpora.py --build
+  python search_corpora.py usucapião --corpus RulingBRCorpus
+  python search_corpora.py '"discurso de ódio"' --split test --limit 50
+  python search_corpora.py 'racis*' --corpus HateBRCorpus TuPyCorpus --count
+  python search_corpora.py 'produto NOT entrega' --label Positivo --fold 01 --full
+
+Consultas seguem a sintaxe do FTS5: termos, frases entre aspas, prefixos com
+'*', AND/OR/NOT e NEAR(...). Acentos e maiúsculas são ignorados.
+"""
+
+import argparse
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+from pipeline_utils.search_index import (
+    SEARCH_INDEX_PATH, connect, count_matches, index_corpus, optimize, placements, search,
+)
+from validate_pipeline import BASE_DIR, DATASETS, SPLITS
+
+
+def build(conn, names, force):
+    built = 0
+    for ds in DATASETS:
+        if names is not None and ds["name"] not in names:
+            continue
+        corpus_dir = BASE_DIR / ds["task"] / ds["name"]
+        if not (corpus_dir / "few_shot").exists():
+            print(f"AVISO: {ds['name']} sem folds em {corpus_dir}. Ignorado.")
+            continue
+        start = time.perf_counter()
+        indexed = index_corpus(conn, corpus_dir, force)
+        if indexed is None:
+            print(f"{ds['name']:<22} já indexado")
+        else:
+            print(f"{ds['name']:<22} {indexed:>9} textos em {time.perf_counter() - start:.2f}s")
+            built += 1
+    if built:
+        optimize(conn)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Busca textual em todos os corpora.")
+    parser.add_argument("query", nargs="?", default=None, help="Consulta FTS5.")
+    parser.add_argument("--build", action="store_true", help="Constrói ou atualiza o índice.")
+    parser.add_argument("--force", action="store_true", help="Com --build, reindexa todos os corpora.")
+    parser.add_argument("--index", type=Path, default=SEARCH_INDEX_PATH)
+    parser.add_argument("--corpus", nargs="+", default=None)
+    parser.add_argument("--label", nargs="+", default=None, help="Sem diferenciar maiúsculas (ex.: Positivo).")
+    parser.add_argument("--fold", default=None, help="Ex.: 01.")
+    parser.add_argument("--split", choices=SPLITS, default=None)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--count", action="store_true", help="Só conta os resultados por corpus e label.")
+    parser.add_argument("--full", action="store_true", help="Mostra o texto completo e os folds de cada resultado.")
+    args = parser.parse_args(argv)
+
+    if not args.build and args.query is None:
+        parser.error("informe uma consulta ou --build")
+    if not args.build and not args.index.exists():
+        print(f"ERRO: Índice não encontrado em {args.index}. Rode com --build.")
+        sys.exit(1)
+
+    conn = connect(args.index)
+    if args.build:
+        build(conn, args.corpus if args.query is None else None, args.force)
+    if args.query is None:
+        return
+
+    filters = {"corpora": args.corpus, "labels": args.label, "fold": args.fold, "split": args.split}
+    start = time.perf_counter()
+    try:
+        if args.count:
+            results = count_matches(conn, args.query, **filters)
+        else:
+            results = search(conn, args.query, limit=args.limit, **filters)
+    except sqlite3.OperationalError as e:
+        print(f"ERRO: Consulta inválida ({e}).")
+        sys.exit(1)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    if args.count:
+        for name, label, count in results:
+            print(f"{name:<22} {str(label):<30} {count:>8}")
+        print(f"\n{sum(r[2] for r in results)} exemplo(s) em {elapsed_ms:.1f} ms")
+        return
+
+    for result in results:
+        print(f"[{result['corpus']}] ({result['label']}) {result['snippet']}")
+        if args.full:
+            where = ", ".join(f"{fold}/{split}" for fold, split in placements(conn, result["id"]))
+            print(f"    folds: {where}\n    {result['text']}\n")
+    print(f"\n{len(results)} resultado(s) em {elapsed_ms:.1f} ms (limite {args.limit})")
+
+
+if __name__ == "__main__":
+    main()
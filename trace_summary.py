@@ -0,0 +1,121 @@
+"""
+trace_summary.py
+================
+Agrega os traces JSON gravados pelos scripts de processamento
+(`pipeline_utils/trace.py`) em uma tabela por script e etapa: tempo de
+parede e de CPU, memória, funil de linhas e bytes lidos e gravados. Na
+coluna de RSS, as etapas mostram quanto elevaram o pico do processo e a
+linha TOTAL mostra o pico em si.
+
+Uso:
+  python trace_summary.py                               # execução mais recente em traces/
+  python trace_summary.py traces/run-20250101-120000
+  python trace_summary.py --output resumo.csv
+"""
+
+import argparse
+import csv
+import json
+import sys
+from pathlib import Path
+
+from pipeline_utils.trace import DEFAULT_TRACE_DIR
+
+COLUMNS = ["script", "etapa", "chamadas", "parede_s", "cpu_s", "rss_pico_mb",
+           "linhas_entrada", "linhas_saida", "mb_lidos", "mb_gravados"]
+
+
+def resolve_trace_files(path):
+    """Traces de `path` ou, se ele não tiver nenhum, da subpasta mais recente."""
+    path = Path(path)
+    files = sorted(path.glob("*.json"))
+    if files:
+        return files
+    runs = sorted((d for d in path.iterdir() if d.is_dir() and any(d.glob("*.json"))),
+                  key=lambda d: d.stat().st_mtime) if path.exists() else []
+    return sorted(runs[-1].glob("*.json")) if runs else []
+
+
+def _mb(value):
+    return value / (1024 * 1024)
+
+
+def trace_rows(trace):
+    """Linhas da tabela de um trace: uma por etapa, o restante do main() e o total."""
+    rows = []
+    for stage in trace["stages"]:
+        rows.append([
+            trace["script"], stage["name"], stage["calls"], stage["wall_s"], stage["cpu_s"],
+            stage["rss_peak_delta_mb"], stage["rows_in"], stage["rows_out"],
+            _mb(stage["bytes_read"]), _mb(stage["bytes_written"]),
+        ])
+    staged_wall = sum(stage["wall_s"] for stage in trace["stages"])
+    staged_cpu = sum(stage["cpu_s"] for stage in trace["stages"])
+    rows.append([trace["script"], "(restante)", None, max(trace["wall_s"] - staged_wall, 0.0),
+                 max(trace["cpu_s"] - staged_cpu, 0.0), None, None, None, None, None])
+    rows.append([
+        trace["script"], "TOTAL", None, trace["wall_s"], trace["cpu_s"], trace["peak_rss_mb"], None, None,
+        sum(_mb(s["bytes_read"]) for s in trace["stages"]),
+        sum(_mb(s["bytes_written"]) for s in trace["stages"]),
+    ])
+    return rows
+
+
+def _fmt(value, width, precision=2):
+    if value is None:
+        return f"{'-':>{width}}"
+    if isinstance(value, float):
+        return f"{value:>{width}.{precision}f}"
+    return f"{value:>{width}}"
+
+
+def print_table(rows):
+    print(f"{'script':<28} {'etapa':<12} {'cham.':>5} {'parede(s)':>10} {'CPU(s)':>9} "
+          f"{'RSS(MB)':>9} {'linhas in':>10} {'linhas out':>10} {'MB lidos':>9} {'MB grav.':>9}")
+    last_script = None
+    for row in rows:
+        script, stage = row[0], row[1]
+        if last_script is not None and script != last_script:
+            print("-" * 118)
+        print(f"{script if script != last_script else '':<28} {stage:<12} {_fmt(row[2], 5)} "
+              f"{_fmt(row[3], 10)} {_fmt(row[4], 9)} {_fmt(row[5], 9, 1)} {_fmt(row[6], 10)} "
+              f"{_fmt(row[7], 10)} {_fmt(row[8], 9)} {_fmt(row[9], 9)}")
+        last_script = script
+
+
+def write_csv(path, rows):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        writer.writerows(rows)
+    print(f"\nResumo salvo em: {path}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resumo dos traces de execução do pipeline.")
+    parser.add_argument("path", nargs="?", type=Path, default=DEFAULT_TRACE_DIR,
+                        help="Pasta com os traces (padrão: execução mais recente em traces/).")
+    parser.add_argument("--output", type=Path, default=None, help="Salva a tabela em CSV.")
+    args = parser.parse_args(argv)
+
+    files = resolve_trace_files(args.path)
+    if not files:
+        print(f"ERRO: Nenhum trace encontrado em '{args.path}'.")
+        sys.exit(1)
+
+    rows = []
+    for file_path in files:
+        with open(file_path, encoding="utf-8") as f:
+            rows.extend(trace_rows(json.load(f)))
+
+    print(f"\nResumo de {len(files)} trace(s) em: {files[0].parent}\n")
+    print_table(rows)
+    total_wall = sum(row[3] for row in rows if row[1] == "TOTAL")
+    print(f"\nTempo total somado dos scripts: {total_wall:.2f}s")
+
+    if args.output:
+        write_csv(args.output, rows)
+
+
+if __name__ == "__main__":
+    main()
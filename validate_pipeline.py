@@ -11,12 +11,42 @@ Checks:
   4. Duplicatas — dentro de cada split
   5. Compatibilidade com treinamento — JSON válido, campos não vazios, encoding
   6. Tamanhos — proporção treino ≈ 60%, val ≈ 20%, teste ≈ 20%
+  7. Vocabulário — labels (e 'label_id', se presente) batem com o labels.json
+  8. Quase-duplicatas — MinHash + LSH entre splits (opcional, --near-dup-threshold)
+  9. Partição — treino + valid + teste de cada fold formam o mesmo pool, os
+     testes cobrem o pool uma única vez e o valid do fold i é o teste do fold
+     i+1; tudo conferido também contra o manifest.json do corpus
+ 10. Curva de aprendizado — o train_order.npy do fold é uma permutação do treino
+ 11. Comprimentos — o lengths.npz do fold tem um valor por exemplo de cada split
+ 12. Janelas — os offsets do windows.npz (se houver) apontam para documentos do split
+ 13. Proveniência — o provenance.npz (se houver) tem um id de origem do sources.json
+     por exemplo de cada split
+ 14. Multi-label — o multilabel.npz (se houver) tem uma linha de bits por exemplo,
+     com o número de labels do multilabel.json
+ 15. Variantes balanceadas — o balanced.npz (se houver) tem um offset por linha e
+     índices crescentes dentro de cada split
+
+Modo rápido (`--sample`): cada split é lido uma única vez, sem decodificar o
+JSON de todas as linhas. Schema, encoding e labels são checados em uma
+amostra uniforme (reservoir sampling). Duplicatas e sobreposição entre folds
+e o vazamento entre splits usam os hashes de todos os textos. Qualquer
+suspeita escala o corpus para a validação completa.
+
+Cada problema encontrado é um registro com corpus, fold, split, check,
+severidade e contagem. Além do relatório colorido no terminal, `--format json`
+e `--format junit` emitem o resultado em formato de máquina, com o tempo gasto
+em cada check.
 """
 
+import argparse
+import itertools
 import json
 import sys
+import time
+import xml.etree.ElementTree as ET
+from contextlib import redirect_stdout
 from pathlib import Path
-from collections import defaultdict
+from collections import Counter, defaultdict
 
 BASE_DIR = Path(__file__).resolve().parent
 
@@ -45,6 +75,11 @@ DATASETS = [
 NUM_FOLDS   = 5
 SPLITS      = ["train", "valid", "test"]
 REQUIRED_COLS = {"text", "label"}
+OPTIONAL_COLS = {"label_id"}
+LABELS_FILE  = "labels.json"
+
+DEFAULT_SAMPLE_SIZE = 1000     # registros por split no modo --sample
+SCAN_CHUNK_LINES    = 100_000
 
 class Color:
     RED    = "\033[91m"
@@ -54,6 +89,10 @@ class Color:
     BOLD   = "\033[1m"
     RESET  = "\033[0m"
 
+SEVERITY_ERROR = "ERRO"
+SEVERITY_WARN  = "AVISO"
+SEVERITY_INFO  = "INFO"
+
 def ok(msg):    print(f"  {Color.GREEN}[OK]{Color.RESET} {msg}")
 def warn(msg):  print(f"  {Color.YELLOW}[AVISO]{Color.RESET} {msg}")
 def err(msg):   print(f"  {Color.RED}[ERRO]{Color.RESET} {msg}")
@@ -75,6 +114,33 @@ def load_jsonl(path: Path):
                 errors.append(f"  linha {i}: {e}")
     return records, errors
 
+def new_issue(severity, check, message, split=None, count=None):
+    """Um problema encontrado por um check; corpus e fold são preenchidos depois."""
+    return {
+        "fold": None, "split": split, "check": check, "severity": severity, "count": count,
+        "message": message,
+    }
+
+def format_issue(issue):
+    where = f"{issue['check']}/{issue['split']}" if issue.get("split") else issue["check"]
+    return f"{issue['severity']} [{where}]: {issue['message']}"
+
+def report_issue(issue):
+    text = format_issue(issue)
+    if issue["severity"] == SEVERITY_ERROR:
+        err(text)
+    elif issue["severity"] == SEVERITY_WARN:
+        warn(text)
+    else:
+        info(text)
+
+def run_check(timings, name, func, *args):
+    """Executa um check acumulando seu tempo em `timings[name]`."""
+    start = time.perf_counter()
+    result = func(*args)
+    timings[name] += time.perf_counter() - start
+    return result
+
 # ---------------------------------------------------------------------------
 # Checks individuais
 # ---------------------------------------------------------------------------
@@ -82,33 +148,37 @@ def load_jsonl(path: Path):
 def check_schema(records, split_name, issues):
     """Verifica colunas obrigatórias, nulos, tipos."""
     if not records:
-        issues.append(f"ERRO: split '{split_name}' está vazio.")
+        issues.append(new_issue(SEVERITY_ERROR, "schema", "split vazio.", split_name))
         return
 
     # colunas presentes
     sample_keys = set(records[0].keys())
     missing = REQUIRED_COLS - sample_keys
     if missing:
-        issues.append(f"ERRO [{split_name}]: Colunas ausentes: {missing}")
-    extra = sample_keys - REQUIRED_COLS
+        issues.append(new_issue(SEVERITY_ERROR, "schema", f"Colunas ausentes: {missing}", split_name))
+    extra = sample_keys - REQUIRED_COLS - OPTIONAL_COLS
     if extra:
-        issues.append(f"AVISO [{split_name}]: Colunas extras (não esperadas): {extra}")
+        issues.append(new_issue(SEVERITY_WARN, "schema", f"Colunas extras (não esperadas): {extra}", split_name))
 
     # nulos / vazios
     null_text  = sum(1 for r in records if not r.get("text") or str(r.get("text","")).strip() == "")
     null_label = sum(1 for r in records if not r.get("label") or str(r.get("label","")).strip() == "")
     if null_text:
-        issues.append(f"ERRO [{split_name}]: {null_text} registros com 'text' nulo/vazio.")
+        issues.append(new_issue(SEVERITY_ERROR, "schema", f"{null_text} registros com 'text' nulo/vazio.",
+                                split_name, null_text))
     if null_label:
-        issues.append(f"ERRO [{split_name}]: {null_label} registros com 'label' nulo/vazio.")
+        issues.append(new_issue(SEVERITY_ERROR, "schema", f"{null_label} registros com 'label' nulo/vazio.",
+                                split_name, null_label))
 
     # tipos — ambos devem ser string
     wrong_text_type  = sum(1 for r in records if not isinstance(r.get("text"), str))
     wrong_label_type = sum(1 for r in records if not isinstance(r.get("label"), str))
     if wrong_text_type:
-        issues.append(f"ERRO [{split_name}]: {wrong_text_type} registros com 'text' não-string.")
+        issues.append(new_issue(SEVERITY_ERROR, "schema", f"{wrong_text_type} registros com 'text' não-string.",
+                                split_name, wrong_text_type))
     if wrong_label_type:
-        issues.append(f"ERRO [{split_name}]: {wrong_label_type} registros com 'label' não-string.")
+        issues.append(new_issue(SEVERITY_ERROR, "schema", f"{wrong_label_type} registros com 'label' não-string.",
+                                split_name, wrong_label_type))
 
 
 def check_label_consistency(splits_data, issues):
@@ -127,15 +197,43 @@ def check_label_consistency(splits_data, issues):
         diff = labels - reference
         missing_in_split = reference - labels
         if diff:
-            issues.append(
-                f"AVISO [label_consistency]: Labels em '{split}' ausentes no treino: {diff}. "
-                f"Pode indicar mistura de dados ou split inconsistente."
-            )
+            issues.append(new_issue(
+                SEVERITY_WARN, "label_consistency",
+                f"Labels em '{split}' ausentes no treino: {diff}. "
+                f"Pode indicar mistura de dados ou split inconsistente.",
+                split, len(diff),
+            ))
         if missing_in_split:
-            issues.append(
-                f"AVISO [label_consistency]: Labels do treino ausentes em '{split}': {missing_in_split}. "
-                f"Splits podem ter distribuições diferentes de classes."
-            )
+            issues.append(new_issue(
+                SEVERITY_WARN, "label_consistency",
+                f"Labels do treino ausentes em '{split}': {missing_in_split}. "
+                f"Splits podem ter distribuições diferentes de classes.",
+                split, len(missing_in_split),
+            ))
+
+
+def check_label_vocab(splits_data, vocab, issues):
+    """Verifica labels fora do labels.json e 'label_id' incoerente com o vocabulário."""
+    label2id = {label: i for i, label in enumerate(vocab)}
+    for split, records in splits_data.items():
+        if not records:
+            continue
+        ids = [label2id.get(r.get("label"), -1) for r in records]
+        unknown = {r.get("label") for r, i in zip(records, ids) if i < 0}
+        if unknown:
+            issues.append(new_issue(
+                SEVERITY_ERROR, "vocab", f"Labels em '{split}' ausentes do {LABELS_FILE}: {unknown}",
+                split, len(unknown),
+            ))
+        if "label_id" in records[0]:
+            wrong_ids = sum(1 for r, i in zip(records, ids) if r.get("label_id") != i)
+            if wrong_ids:
+                issues.append(new_issue(
+                    SEVERITY_ERROR, "vocab",
+                    f"{wrong_ids} registro(s) em '{split}' com 'label_id' "
+                    f"diferente do índice da label no {LABELS_FILE}.",
+                    split, wrong_ids,
+                ))
 
 
 def check_leakage(splits_data, issues):
@@ -156,10 +254,56 @@ def check_leakage(splits_data, issues):
             overlap = sets_by_split[a] & sets_by_split[b]
             if overlap:
                 examples = list(overlap)[:3]
-                issues.append(
-                    f"ERRO [leakage]: {len(overlap)} texto(s) idêntico(s) em '{a}' e '{b}'. "
-                    f"Exemplos: {[e[:60] for e in examples]}"
-                )
+                issues.append(new_issue(
+                    SEVERITY_ERROR, "leakage",
+                    f"{len(overlap)} texto(s) idêntico(s) em '{a}' e '{b}'. "
+                    f"Exemplos: {[e[:60] for e in examples]}",
+                    f"{a}+{b}", len(overlap),
+                ))
+
+
+def near_dup_signatures(texts, cache):
+    """Assinaturas MinHash dos textos, reaproveitando as já calculadas no corpus."""
+    import numpy as np
+    from pipeline_utils.near_dup import minhash_signatures
+
+    missing = [t for t in dict.fromkeys(texts) if t not in cache]
+    if missing:
+        cache.update(zip(missing, minhash_signatures(missing)))
+    return np.stack([cache[t] for t in texts])
+
+
+def check_near_dup_leakage(splits_data, threshold, cache, issues):
+    """Detecta textos quase idênticos (não idênticos) entre splits diferentes."""
+    from pipeline_utils.near_dup import cross_near_duplicates
+
+    texts_by_split = {
+        split: list(dict.fromkeys(r.get("text","") for r in records))
+        for split, records in splits_data.items()
+        if records
+    }
+
+    pairs = [
+        ("train", "valid"),
+        ("train", "test"),
+        ("valid", "test"),
+    ]
+    for a, b in pairs:
+        if a not in texts_by_split or b not in texts_by_split:
+            continue
+        texts_a, texts_b = texts_by_split[a], texts_by_split[b]
+        b_idx, a_idx = cross_near_duplicates(
+            near_dup_signatures(texts_a, cache), near_dup_signatures(texts_b, cache), threshold
+        )
+        matches = [(texts_a[i], texts_b[j]) for j, i in zip(b_idx, a_idx) if texts_a[i] != texts_b[j]]
+        if matches:
+            examples = [(ta[:40], tb[:40]) for ta, tb in matches[:3]]
+            issues.append(new_issue(
+                SEVERITY_WARN, "near-dup",
+                f"{len(matches)} texto(s) de '{b}' quase idêntico(s) "
+                f"(Jaccard >= {threshold}) a textos de '{a}'. Exemplos: {examples}",
+                f"{a}+{b}", len(matches),
+            ))
 
 
 def check_duplicates_within_split(records, split_name, issues):
@@ -172,9 +316,10 @@ def check_duplicates_within_split(records, split_name, issues):
             dups += 1
         seen.add(t)
     if dups:
-        issues.append(
-            f"ERRO [duplicatas]: {dups} texto(s) duplicado(s) dentro de '{split_name}'."
-        )
+        issues.append(new_issue(
+            SEVERITY_ERROR, "duplicatas", f"{dups} texto(s) duplicado(s) dentro de '{split_name}'.",
+            split_name, dups,
+        ))
 
 
 def check_split_sizes(splits_data, issues):
@@ -188,14 +333,17 @@ def check_split_sizes(splits_data, issues):
         # expected: train ~60%, valid ~20%, test ~20%
         expected = {"train": 60, "valid": 20, "test": 20}.get(split, 20)
         if abs(pct - expected) > 5:
-            issues.append(
-                f"AVISO [tamanho]: Split '{split}' representa {pct:.1f}% do total "
-                f"(esperado ~{expected}%). Pode indicar desequilíbrio."
-            )
+            issues.append(new_issue(
+                SEVERITY_WARN, "tamanho",
+                f"Split '{split}' representa {pct:.1f}% do total "
+                f"(esperado ~{expected}%). Pode indicar desequilíbrio.",
+                split, n,
+            ))
 
 
 def check_json_encoding(path: Path, issues):
     """Verifica se cada linha é JSON válido e decodificável em UTF-8."""
+    split_name = path.stem
     try:
         with open(path, "r", encoding="utf-8") as f:
             for i, line in enumerate(f, 1):
@@ -205,110 +353,659 @@ def check_json_encoding(path: Path, issues):
                 try:
                     json.loads(line)
                 except json.JSONDecodeError as e:
-                    issues.append(f"ERRO [encoding/JSON]: Linha {i} inválida em {path.name}: {e}")
+                    issues.append(new_issue(
+                        SEVERITY_ERROR, "encoding", f"Linha {i} inválida em {path.name}: {e}", split_name, 1
+                    ))
                     if i > 5:  # limita saída
                         break
     except UnicodeDecodeError as e:
-        issues.append(f"ERRO [encoding]: Arquivo {path.name} com encoding inválido: {e}")
+        issues.append(new_issue(
+            SEVERITY_ERROR, "encoding", f"Arquivo {path.name} com encoding inválido: {e}", split_name
+        ))
+
+def check_train_order(fold_path: Path, train_size, issues):
+    """O train_order.npy, se existir, deve ser uma permutação das linhas do treino."""
+    import numpy as np
+    from pipeline_utils.folds import TRAIN_ORDER_FILE_NAME, load_train_order
+
+    order = load_train_order(fold_path)
+    if order is None:
+        return
+    if len(order) != train_size or not np.array_equal(np.sort(order), np.arange(train_size)):
+        issues.append(new_issue(
+            SEVERITY_ERROR, "train_order",
+            f"{TRAIN_ORDER_FILE_NAME} não é uma permutação das {train_size} linhas do treino "
+            f"({len(order)} posições).",
+            "train", len(order),
+        ))
+
+def check_lengths(fold_path: Path, sizes, issues):
+    """Os arrays do lengths.npz, se existir, devem ter o tamanho de cada split."""
+    import numpy as np
+    from pipeline_utils.lengths import LENGTHS_FILE_NAME
+
+    path = fold_path / LENGTHS_FILE_NAME
+    if not path.exists():
+        return
+    with np.load(path) as data:
+        for split, n in sizes.items():
+            for unit in ["chars", "tokens"]:
+                key = f"{split}_{unit}"
+                found = len(data[key]) if key in data.files else None
+                if found != n:
+                    issues.append(new_issue(
+                        SEVERITY_ERROR, "lengths",
+                        f"{LENGTHS_FILE_NAME}: '{key}' com {found if found is not None else 'nenhum'} "
+                        f"valor(es), split com {n} exemplo(s).",
+                        split, n,
+                    ))
+
+def check_provenance(fold_path: Path, sizes, issues):
+    """O provenance.npz, se existir, tem um id válido do sources.json para cada exemplo do split."""
+    import numpy as np
+    from pipeline_utils.provenance import PROVENANCE_FILE_NAME, load_source_table
+
+    path = fold_path / PROVENANCE_FILE_NAME
+    if not path.exists():
+        return
+    table = load_source_table(fold_path.parents[1]) or []
+    with np.load(path) as data:
+        for split, n in sizes.items():
+            ids = data[split] if split in data.files else None
+            unknown = 0 if ids is None else int((ids >= len(table)).sum())
+            if ids is None or len(ids) != n or unknown:
+                issues.append(new_issue(
+                    SEVERITY_ERROR, "provenance",
+                    f"{PROVENANCE_FILE_NAME}: '{split}' com {len(ids) if ids is not None else 'nenhum'} "
+                    f"id(s) ({unknown} fora do sources.json), split com {n} exemplo(s).",
+                    split, n,
+                ))
+
+def check_multilabel(fold_path: Path, sizes, issues):
+    """O multilabel.npz, se existir, tem uma linha por exemplo e a largura do multilabel.json."""
+    import numpy as np
+    from pipeline_utils.multilabel import MULTILABEL_FILE_NAME, load_multilabel_vocab
+
+    path = fold_path / MULTILABEL_FILE_NAME
+    if not path.exists():
+        return
+    vocab = load_multilabel_vocab(fold_path.parents[1])
+    with np.load(path) as data:
+        num_labels = int(data["num_labels"])
+        if vocab is None or len(vocab) != num_labels:
+            issues.append(new_issue(
+                SEVERITY_ERROR, "multilabel",
+                f"{MULTILABEL_FILE_NAME}: {num_labels} label(s), multilabel.json com "
+                f"{len(vocab) if vocab is not None else 'nenhuma'}.",
+            ))
+        for split, n in sizes.items():
+            rows = data[split] if split in data.files else None
+            if rows is None or rows.shape != (n, (num_labels + 7) // 8):
+                issues.append(new_issue(
+                    SEVERITY_ERROR, "multilabel",
+                    f"{MULTILABEL_FILE_NAME}: '{split}' com formato "
+                    f"{rows.shape if rows is not None else 'ausente'}, split com {n} exemplo(s).",
+                    split, n,
+                ))
+
+def check_balanced(fold_path: Path, sizes, issues):
+    """O balanced.npz, se existir, tem um offset por exemplo e índices crescentes dentro do split."""
+    import numpy as np
+    from pipeline_utils.balance import BALANCED_FILE_NAME
+
+    path = fold_path / BALANCED_FILE_NAME
+    if not path.exists():
+        return
+    with np.load(path) as data:
+        for split, n in sizes.items():
+            offsets = data[f"{split}_offsets"] if f"{split}_offsets" in data.files else None
+            if offsets is None or len(offsets) != n:
+                issues.append(new_issue(
+                    SEVERITY_ERROR, "balanced",
+                    f"{BALANCED_FILE_NAME}: '{split}' com {len(offsets) if offsets is not None else 'nenhum'} "
+                    f"offset(s), split com {n} exemplo(s).",
+                    split, n,
+                ))
+                continue
+            for variant in data["variants"]:
+                key = f"{split}_{variant}"
+                rows = data[key] if key in data.files else None
+                if rows is None or (len(rows) and (rows[0] < 0 or rows[-1] >= n or (np.diff(rows) <= 0).any())):
+                    issues.append(new_issue(
+                        SEVERITY_ERROR, "balanced",
+                        f"{BALANCED_FILE_NAME}: índices de '{variant}' ausentes, fora do split ou fora de ordem.",
+                        split,
+                    ))
+
+def check_windows(fold_path: Path, sizes, issues):
+    """Cada janela do windows.npz, se existir, aponta para um documento do split e tem início < fim."""
+    import numpy as np
+    from pipeline_utils.windows import WINDOWS_FILE_NAME
+
+    path = fold_path / WINDOWS_FILE_NAME
+    if not path.exists():
+        return
+    with np.load(path) as data:
+        for split, n in sizes.items():
+            if split not in data.files:
+                continue
+            windows = data[split]
+            bad = int(((windows[:, 0] < 0) | (windows[:, 0] >= n) | (windows[:, 1] >= windows[:, 2])).sum())
+            covered = len(np.unique(windows[:, 0]))
+            if bad or covered != n:
+                issues.append(new_issue(
+                    SEVERITY_ERROR, "windows",
+                    f"{WINDOWS_FILE_NAME}: {bad} janela(s) inválida(s) e {covered} de {n} documento(s) cobertos.",
+                    split, bad,
+                ))
 
 # ---------------------------------------------------------------------------
 # Validação de um fold
 # ---------------------------------------------------------------------------
 
-def validate_fold(fold_path: Path, fold_name: str):
+def validate_fold(fold_path: Path, fold_name: str, vocab=None, near_dup_threshold=None, signature_cache=None):
+    """
+    Valida um fold. Retorna (registros por split, problemas, tempo por check).
+    """
     fold_issues = []
     splits_data = {}
+    timings = defaultdict(float)
 
     for split in SPLITS:
         fpath = fold_path / f"{split}.jsonl"
-        records, parse_errors = load_jsonl(fpath)
+        records, parse_errors = run_check(timings, "load", load_jsonl, fpath)
 
         if records is None:
-            fold_issues.append(f"ERRO: Arquivo ausente — {fpath}")
+            fold_issues.append(new_issue(SEVERITY_ERROR, "arquivo", f"Arquivo ausente — {fpath}", split))
             splits_data[split] = []
             continue
 
-        if parse_errors:
-            for pe in parse_errors:
-                fold_issues.append(f"ERRO [parse]: {pe}")
+        for pe in parse_errors:
+            fold_issues.append(new_issue(SEVERITY_ERROR, "parse", pe.strip(), split, 1))
 
         splits_data[split] = records
 
         # 1. Schema
-        check_schema(records, split, fold_issues)
+        run_check(timings, "schema", check_schema, records, split, fold_issues)
 
         # 2. Duplicatas internas
-        check_duplicates_within_split(records, split, fold_issues)
+        run_check(timings, "duplicatas", check_duplicates_within_split, records, split, fold_issues)
 
         # 3. Encoding / JSON
-        check_json_encoding(fpath, fold_issues)
+        run_check(timings, "encoding", check_json_encoding, fpath, fold_issues)
 
     # 4. Consistência de labels
-    check_label_consistency(splits_data, fold_issues)
+    run_check(timings, "label_consistency", check_label_consistency, splits_data, fold_issues)
 
     # 5. Data leakage
-    check_leakage(splits_data, fold_issues)
+    run_check(timings, "leakage", check_leakage, splits_data, fold_issues)
 
     # 6. Proporção de tamanhos
-    check_split_sizes(splits_data, fold_issues)
+    run_check(timings, "tamanho", check_split_sizes, splits_data, fold_issues)
+
+    # 7. Vocabulário de labels
+    if vocab is not None:
+        run_check(timings, "vocab", check_label_vocab, splits_data, vocab, fold_issues)
+
+    # 8. Quase-duplicatas entre splits
+    if near_dup_threshold is not None:
+        run_check(timings, "near-dup", check_near_dup_leakage,
+                  splits_data, near_dup_threshold, signature_cache, fold_issues)
+
+    # 10. Permutação da curva de aprendizado
+    run_check(timings, "train_order", check_train_order, fold_path, len(splits_data.get("train", [])), fold_issues)
+
+    # 11. Comprimentos pré-calculados
+    run_check(timings, "lengths", check_lengths, fold_path, {s: len(r) for s, r in splits_data.items()}, fold_issues)
+
+    # 12. Janelas de documentos longos
+    run_check(timings, "windows", check_windows, fold_path, {s: len(r) for s, r in splits_data.items()}, fold_issues)
+
+    # 13. Proveniência dos exemplos
+    run_check(timings, "provenance", check_provenance, fold_path,
+              {s: len(r) for s, r in splits_data.items()}, fold_issues)
+
+    # 14. Bitsets multi-label
+    run_check(timings, "multilabel", check_multilabel, fold_path,
+              {s: len(r) for s, r in splits_data.items()}, fold_issues)
+
+    # 15. Variantes balanceadas
+    run_check(timings, "balanced", check_balanced, fold_path,
+              {s: len(r) for s, r in splits_data.items()}, fold_issues)
+
+    for issue in fold_issues:
+        issue["fold"] = fold_name
+    return splits_data, fold_issues, dict(timings)
+
+# ---------------------------------------------------------------------------
+# Validação por amostragem (--sample)
+# ---------------------------------------------------------------------------
+
+_TEXT_PREFIX = '{"text": "'
+_TEXT_END    = '", "label"'
+
+def text_key(line):
+    """
+    Literal JSON do campo 'text' da linha, sem decodificá-la. Os scripts
+    gravam 'text' primeiro com json.dumps(ensure_ascii=False); dentro da
+    string todo '"' vem escapado, então o primeiro '", "label"' fecha o texto.
+    Linhas em outro formato são decodificadas e reescritas do mesmo jeito.
+    """
+    if line.startswith(_TEXT_PREFIX):
+        end = line.find(_TEXT_END, len(_TEXT_PREFIX))
+        if end >= 0:
+            return line[len(_TEXT_PREFIX):end]
+    try:
+        text = json.loads(line).get("text", "")
+    except (json.JSONDecodeError, AttributeError):
+        return line
+    return json.dumps(text, ensure_ascii=False)[1:-1]
+
+def scan_split(path: Path, sample_size, rng):
+    """
+    Lê o split em blocos. Retorna (hashes uint64 dos textos, linhas
+    amostradas, total de linhas, erro de decodificação ou None).
+
+    Os hashes vêm do hash() do Python: só valem dentro do mesmo processo,
+    que é onde todas as comparações acontecem.
+    """
+    import numpy as np
+    from pipeline_utils.sampling import ReservoirSampler
+
+    sampler = ReservoirSampler(sample_size, rng)
+    hashes, total, decode_error = [], 0, None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            while True:
+                lines = [l.rstrip("\r\n") for l in itertools.islice(f, SCAN_CHUNK_LINES)]
+                if not lines:
+                    break
+                lines = [l for l in lines if l.strip()]
+                keys = (hash(text_key(l)) for l in lines)
+                hashes.append(np.fromiter(keys, dtype=np.int64, count=len(lines)).view(np.uint64))
+                sampler.extend(lines)
+                total += len(lines)
+    except UnicodeDecodeError as e:
+        decode_error = e
+    all_hashes = np.concatenate(hashes) if hashes else np.empty(0, dtype=np.uint64)
+    return all_hashes, sampler.items, total, decode_error
+
+def validate_fold_sampled(fold_path: Path, fold_name: str, vocab, sample_size, rng):
+    """
+    Versão por amostragem do validate_fold. Retorna (tamanhos, problemas,
+    tempo por check, hashes por split).
+    """
+    import numpy as np
+
+    fold_issues = []
+    sizes, hashes, samples = {}, {}, {}
+    timings = defaultdict(float)
+
+    for split in SPLITS:
+        fpath = fold_path / f"{split}.jsonl"
+        if not fpath.exists():
+            fold_issues.append(new_issue(SEVERITY_ERROR, "arquivo", f"Arquivo ausente — {fpath}", split))
+            sizes[split], hashes[split], samples[split] = 0, np.empty(0, dtype=np.uint64), []
+            continue
+
+        split_hashes, lines, total, decode_error = run_check(timings, "load", scan_split, fpath, sample_size, rng)
+        sizes[split], hashes[split] = total, split_hashes
+        if decode_error is not None:
+            fold_issues.append(new_issue(
+                SEVERITY_ERROR, "encoding", f"Arquivo {fpath.name} com encoding inválido: {decode_error}", split
+            ))
+
+        start = time.perf_counter()
+        records, bad_lines = [], 0
+        for line in lines:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                bad_lines += 1
+        timings["encoding"] += time.perf_counter() - start
+        if bad_lines:
+            fold_issues.append(new_issue(
+                SEVERITY_ERROR, "encoding", f"{bad_lines} linha(s) JSON inválida(s) na amostra.", split, bad_lines
+            ))
+        samples[split] = records
+
+        run_check(timings, "schema", check_schema, records, split, fold_issues)
+
+        start = time.perf_counter()
+        dups = len(split_hashes) - len(np.unique(split_hashes))
+        timings["duplicatas"] += time.perf_counter() - start
+        if dups:
+            fold_issues.append(new_issue(
+                SEVERITY_ERROR, "duplicatas", f"{dups} texto(s) duplicado(s) dentro de '{split}'.", split, dups
+            ))
+
+    # vazamento: busca exata dos hashes de um split nos do outro
+    start = time.perf_counter()
+    for a, b in [("train", "valid"), ("train", "test"), ("valid", "test")]:
+        count = int(np.isin(hashes[b], hashes[a]).sum())
+        if count:
+            fold_issues.append(new_issue(
+                SEVERITY_ERROR, "leakage",
+                f"{count} texto(s) repetido(s) entre '{a}' e '{b}'.", f"{a}+{b}", count,
+            ))
+    timings["leakage"] += time.perf_counter() - start
+
+    run_check(timings, "tamanho", check_split_sizes, {s: range(n) for s, n in sizes.items()}, fold_issues)
+    run_check(timings, "train_order", check_train_order, fold_path, sizes["train"], fold_issues)
+    run_check(timings, "lengths", check_lengths, fold_path, sizes, fold_issues)
+    run_check(timings, "windows", check_windows, fold_path, sizes, fold_issues)
+    run_check(timings, "provenance", check_provenance, fold_path, sizes, fold_issues)
+    run_check(timings, "multilabel", check_multilabel, fold_path, sizes, fold_issues)
+    run_check(timings, "balanced", check_balanced, fold_path, sizes, fold_issues)
+    if vocab is not None:
+        run_check(timings, "vocab", check_label_vocab, samples, vocab, fold_issues)
+
+    for issue in fold_issues:
+        issue["fold"] = fold_name
+    return sizes, fold_issues, dict(timings), hashes
+
+def validate_folds_sampled(corpus_result, fold_dirs, vocab, sample_size, sample_seed):
+    """Preenche `corpus_result` com a validação por amostragem de todos os folds."""
+    import numpy as np
+    from pipeline_utils.sampling import detection_bound
+
+    from pipeline_utils.partition import MultisetDigest
+
+    rng = np.random.default_rng(sample_seed)
+    timings = defaultdict(float)
+    test_hashes = {}
+    fold_digests = {}
 
-    return splits_data, fold_issues
+    for fold_dir in fold_dirs:
+        fold_name = fold_dir.name
+        sizes, fold_issues, fold_timings, hashes = validate_fold_sampled(
+            fold_dir, fold_name, vocab, sample_size, rng
+        )
+        corpus_result["folds"][fold_name] = {"sizes": sizes, "timings": fold_timings}
+        corpus_result["issues"].extend(fold_issues)
+        for check, seconds in fold_timings.items():
+            timings[check] += seconds
+        test_hashes[fold_name] = np.unique(hashes["test"])
+        fold_digests[fold_name] = {
+            split: MultisetDigest.from_hashes(h) for split, h in hashes.items()
+            if (fold_dir / f"{split}.jsonl").exists()
+        }
+
+        if not fold_issues:
+            ok(f"Fold {fold_name} — sem problemas na amostra.")
+        for iss in fold_issues:
+            info(f"suspeita: {format_issue(iss)}")
+
+    start = time.perf_counter()
+    fold_names = list(test_hashes)
+    for i in range(len(fold_names)):
+        for j in range(i + 1, len(fold_names)):
+            a, b = fold_names[i], fold_names[j]
+            overlap = len(np.intersect1d(test_hashes[a], test_hashes[b], assume_unique=True))
+            if overlap:
+                issue = new_issue(
+                    SEVERITY_ERROR, "cv-integrity",
+                    f"Conjuntos de TESTE dos folds '{a}' e '{b}' têm {overlap} amostra(s) em comum.",
+                    "test", overlap,
+                )
+                corpus_result["issues"].append(issue)
+                info(f"suspeita: {format_issue(issue)}")
+    timings["cv-integrity"] += time.perf_counter() - start
+
+    # os hashes da amostragem são do processo atual: contra o manifesto, só as quantidades
+    for issue in run_partition_checks(Path(fold_dirs[0]).parent, fold_digests, False, timings):
+        corpus_result["issues"].append(issue)
+        info(f"suspeita: {format_issue(issue)}")
+
+    bound = detection_bound(sample_size)
+    corpus_result["timings"] = dict(timings)
+    corpus_result["sampling"] = {
+        "sample_size": sample_size,
+        "seed": sample_seed,
+        "undetected_fraction_95": bound,
+    }
+    info(f"Amostra de até {sample_size} registros por split: com 95% de confiança, menos de "
+         f"{bound:.2%} dos registros de cada split têm problema de schema/encoding/label. "
+         f"Duplicatas e vazamento conferidos pelos hashes de todos os textos.")
+
+# ---------------------------------------------------------------------------
+# Partição dos folds (hashes de multiconjunto)
+# ---------------------------------------------------------------------------
+
+def majority_union(unions, pool_count=None):
+    """
+    Pool de referência sem o digest do manifesto: a união mais comum entre os
+    folds, para que um fold corrompido não vire a referência dos outros. No
+    empate, vale a união com a quantidade do manifesto (`pool_count`), depois
+    a do primeiro fold.
+    """
+    votes = Counter((u.count, u.total, u.mixed) for u in unions.values())
+    return max(
+        unions.values(),
+        key=lambda u: (votes[(u.count, u.total, u.mixed)], u.count == pool_count),
+    )
+
+def check_partitions(fold_digests, pool=None, pool_count=None):
+    """
+    Confere a partição a partir dos digests {fold: {split: MultisetDigest}}.
+    Sem `pool` (digest do manifesto), a referência é a união mais comum entre
+    os folds (`majority_union`).
+    """
+    from pipeline_utils.partition import combine
+
+    issues = []
+    names = sorted(fold_digests)
+    complete = [n for n in names if all(s in fold_digests[n] for s in SPLITS)]
+    if not complete:
+        return issues
+    unions = {n: combine(fold_digests[n][s] for s in SPLITS) for n in complete}
+    reference = pool if pool is not None else majority_union(unions, pool_count)
+
+    for n in complete:
+        if unions[n] != reference:
+            detail = (f"{unions[n].count} registros, pool com {reference.count}"
+                      if unions[n].count != reference.count else "mesma quantidade, conteúdo diferente")
+            issue = new_issue(
+                SEVERITY_ERROR, "partition",
+                f"treino + valid + teste do fold '{n}' não formam o pool ({detail}).",
+                count=unions[n].count,
+            )
+            issue["fold"] = n
+            issues.append(issue)
+
+    if len(complete) == len(names) == NUM_FOLDS:
+        tests = combine(fold_digests[n]["test"] for n in names)
+        if tests != reference:
+            issues.append(new_issue(
+                SEVERITY_ERROR, "partition",
+                f"Os testes dos {len(names)} folds não cobrem o pool exatamente uma vez "
+                f"({tests.count} registros de teste, pool com {reference.count}).",
+                "test", tests.count,
+            ))
+
+    for i, n in enumerate(names):
+        following = names[(i + 1) % len(names)]
+        if len(names) < 2 or n not in complete or following not in complete:
+            continue
+        if fold_digests[n]["valid"] != fold_digests[following]["test"]:
+            issue = new_issue(
+                SEVERITY_WARN, "partition",
+                f"O valid do fold '{n}' não é o teste do fold '{following}', como os scripts geram.",
+                "valid", fold_digests[n]["valid"].count,
+            )
+            issue["fold"] = n
+            issues.append(issue)
+    return issues
+
+def check_manifest(fold_digests, manifest_folds, counts_only=False):
+    """
+    Compara os digests lidos dos arquivos com os do manifest.json. Com
+    `counts_only`, só as quantidades (para hashes que não são os do manifesto).
+    """
+    issues = []
+    for fold_name, splits in manifest_folds.items():
+        if fold_name not in fold_digests:
+            issue = new_issue(SEVERITY_ERROR, "manifest", f"Fold '{fold_name}' do manifest.json não encontrado.")
+            issue["fold"] = fold_name
+            issues.append(issue)
+            continue
+        for split, expected in splits.items():
+            found = fold_digests[fold_name].get(split)
+            if found is None:
+                continue
+            if found.count != expected.count:
+                detail = f"{found.count} registros, manifesto com {expected.count}"
+            elif not counts_only and found != expected:
+                detail = "mesma quantidade, conteúdo diferente"
+            else:
+                continue
+            issue = new_issue(
+                SEVERITY_ERROR, "manifest", f"'{split}' difere do manifest.json ({detail}).", split, found.count
+            )
+            issue["fold"] = fold_name
+            issues.append(issue)
+    return issues
+
+def run_partition_checks(corpus_path, fold_digests, exact_hashes, timings):
+    """Partição e manifesto de um corpus. `exact_hashes` indica hashes iguais aos do manifesto."""
+    from pipeline_utils.partition import load_manifest
+
+    start = time.perf_counter()
+    manifest = load_manifest(corpus_path.parent)
+    issues = []
+    if manifest is None:
+        info("manifest.json não encontrado — conferência contra o manifesto ignorada.")
+        issues.extend(check_partitions(fold_digests))
+    else:
+        pool, manifest_folds = manifest
+        if exact_hashes:
+            issues.extend(check_partitions(fold_digests, pool))
+        else:
+            issues.extend(check_partitions(fold_digests, pool_count=pool.count))
+        issues.extend(check_manifest(fold_digests, manifest_folds, counts_only=not exact_hashes))
+    timings["partition"] += time.perf_counter() - start
+    return issues
 
 # ---------------------------------------------------------------------------
 # Validação de um corpus completo (todos os folds)
 # ---------------------------------------------------------------------------
 
-def validate_corpus(task: str, name: str):
+def corpus_status(issues):
+    if any(i["severity"] == SEVERITY_ERROR for i in issues):
+        return "FALHA"
+    if any(i["severity"] == SEVERITY_WARN for i in issues):
+        return "AVISO"
+    return "OK"
+
+def validate_corpus(task: str, name: str, near_dup_threshold=None, sample_size=None, sample_seed=0):
+    """
+    Valida um corpus. Com `sample_size`, roda primeiro a validação por
+    amostragem e só escala para a completa se encontrar alguma suspeita.
+    """
     corpus_path = BASE_DIR / task / name / "few_shot"
     print(f"\n{Color.BOLD}{'='*60}{Color.RESET}")
     print(f"{Color.BOLD}[{task.upper()}] {name}{Color.RESET}")
     print(f"  Path: {corpus_path}")
 
+    if sample_size:
+        result = validate_corpus_checks(task, name, corpus_path, sample_size=sample_size, sample_seed=sample_seed)
+        if not result["issues"] or result["status"] in ("AUSENTE", "VAZIO"):
+            return result
+        warn(f"Amostragem encontrou {len(result['issues'])} suspeita(s) — escalando para a validação completa.")
+        full = validate_corpus_checks(task, name, corpus_path, near_dup_threshold)
+        full["mode"] = "full (escalado)"
+        full["sample_timings"] = result["timings"]
+        return full
+
+    return validate_corpus_checks(task, name, corpus_path, near_dup_threshold)
+
+def validate_corpus_checks(task, name, corpus_path, near_dup_threshold=None, sample_size=None, sample_seed=0):
+    """Uma passada de validação do corpus, completa ou por amostragem."""
+    start = time.perf_counter()
+    corpus_result = {
+        "dataset": name, "task": task, "mode": "sample" if sample_size else "full",
+        "folds": {}, "issues": [], "timings": {},
+    }
+
     if not corpus_path.exists():
-        err(f"Diretório do corpus não encontrado: {corpus_path}")
-        return {"dataset": name, "task": task, "status": "AUSENTE", "folds": {}}
+        issue = new_issue(SEVERITY_ERROR, "corpus", f"Diretório do corpus não encontrado: {corpus_path}")
+        err(issue["message"])
+        corpus_result.update(status="AUSENTE", issues=[issue])
+        return corpus_result
 
     fold_dirs = sorted([d for d in corpus_path.iterdir() if d.is_dir()])
     if not fold_dirs:
-        err(f"Nenhum fold encontrado em: {corpus_path}")
-        return {"dataset": name, "task": task, "status": "VAZIO", "folds": {}}
+        issue = new_issue(SEVERITY_ERROR, "corpus", f"Nenhum fold encontrado em: {corpus_path}")
+        err(issue["message"])
+        corpus_result.update(status="VAZIO", issues=[issue])
+        return corpus_result
 
+    global_issues = []
     if len(fold_dirs) != NUM_FOLDS:
-        warn(f"Esperado {NUM_FOLDS} folds, encontrado {len(fold_dirs)}: {[d.name for d in fold_dirs]}")
+        issue = new_issue(
+            SEVERITY_WARN, "folds",
+            f"Esperado {NUM_FOLDS} folds, encontrado {len(fold_dirs)}: {[d.name for d in fold_dirs]}",
+            count=len(fold_dirs),
+        )
+        warn(issue["message"])
+        global_issues.append(issue)
+
+    from pipeline_utils.labels import load_label_vocab
+
+    vocab = load_label_vocab(corpus_path.parent)
+    if vocab is None:
+        info(f"{LABELS_FILE} não encontrado — verificação de vocabulário ignorada.")
 
-    corpus_result = {"dataset": name, "task": task, "folds": {}, "global_issues": []}
-    all_issues = []
+    if sample_size:
+        for issue in global_issues:
+            issue["fold"] = None
+        corpus_result["issues"].extend(global_issues)
+        validate_folds_sampled(corpus_result, fold_dirs, vocab, sample_size, sample_seed)
+        corpus_result["elapsed_s"] = time.perf_counter() - start
+        corpus_result["status"] = corpus_status(corpus_result["issues"])
+        return corpus_result
+
+    from pipeline_utils.partition import MultisetDigest
 
     fold_test_sets = {}
+    fold_digests = {}
+    timings = defaultdict(float)
+    # todos os folds compartilham o mesmo pool: as assinaturas são calculadas uma vez
+    signature_cache = {}
 
     for fold_dir in fold_dirs:
         fold_name = fold_dir.name
         print(f"\n  Fold {fold_name}:")
-        splits_data, fold_issues = validate_fold(fold_dir, fold_name)
+        splits_data, fold_issues, fold_timings = validate_fold(
+            fold_dir, fold_name, vocab, near_dup_threshold, signature_cache
+        )
         corpus_result["folds"][fold_name] = {
-            "issues": fold_issues,
             "sizes": {s: len(r) for s, r in splits_data.items()},
+            "timings": fold_timings,
         }
-        all_issues.extend(fold_issues)
+        corpus_result["issues"].extend(fold_issues)
+        for check, seconds in fold_timings.items():
+            timings[check] += seconds
 
         # Reporta
         if not fold_issues:
             ok(f"Fold {fold_name} — sem problemas.")
         else:
             for iss in fold_issues:
-                if iss.startswith("ERRO"):
-                    err(iss)
-                elif iss.startswith("AVISO"):
-                    warn(iss)
-                else:
-                    info(iss)
-
-        # coleta teste para análise global
-        test_path = fold_dir / "test.jsonl"
-        recs, _ = load_jsonl(test_path)
-        if recs:
-            fold_test_sets[fold_name] = set(r.get("text","") for r in recs)
+                report_issue(iss)
+
+        # o teste já foi lido pelo validate_fold; só guarda os textos para a análise global
+        if splits_data.get("test"):
+            fold_test_sets[fold_name] = set(r.get("text","") for r in splits_data["test"])
+        start_digest = time.perf_counter()
+        fold_digests[fold_name] = {
+            split: MultisetDigest.from_texts([r.get("text", "") for r in records])
+            for split, records in splits_data.items()
+            if (fold_dir / f"{split}.jsonl").exists()
+        }
+        timings["partition"] += time.perf_counter() - start_digest
 
+    start_cv = time.perf_counter()
     fold_names = list(fold_test_sets.keys())
     test_overlap_found = False
     for i in range(len(fold_names)):
@@ -316,24 +1013,32 @@ def validate_corpus(task: str, name: str):
             a, b = fold_names[i], fold_names[j]
             overlap = fold_test_sets[a] & fold_test_sets[b]
             if overlap:
-                msg = (f"ERRO [CV-integrity]: Conjuntos de TESTE dos folds '{a}' e '{b}' "
-                       f"têm {len(overlap)} amostra(s) em comum — isso viola a validação cruzada!")
-                corpus_result["global_issues"].append(msg)
-                err(msg)
+                issue = new_issue(
+                    SEVERITY_ERROR, "cv-integrity",
+                    f"Conjuntos de TESTE dos folds '{a}' e '{b}' têm {len(overlap)} amostra(s) "
+                    f"em comum — isso viola a validação cruzada!",
+                    "test", len(overlap),
+                )
+                global_issues.append(issue)
+                report_issue(issue)
                 test_overlap_found = True
+    timings["cv-integrity"] += time.perf_counter() - start_cv
 
     if not test_overlap_found and len(fold_test_sets) > 1:
         ok("Conjuntos de teste de todos os folds são disjuntos (CV correto).")
 
-    # Status global
-    all_errors  = [i for i in all_issues if "ERRO" in i]
-    all_warnings = [i for i in all_issues if "AVISO" in i]
-    if all_errors or corpus_result["global_issues"]:
-        corpus_result["status"] = "FALHA"
-    elif all_warnings:
-        corpus_result["status"] = "AVISO"
-    else:
-        corpus_result["status"] = "OK"
+    partition_issues = run_partition_checks(corpus_path, fold_digests, True, timings)
+    for issue in partition_issues:
+        report_issue(issue)
+    if not partition_issues:
+        ok("Folds particionam o mesmo pool e os testes o cobrem uma única vez.")
+
+    for issue in global_issues:
+        issue["fold"] = None
+    corpus_result["issues"].extend(global_issues + partition_issues)
+    corpus_result["timings"] = dict(timings)
+    corpus_result["elapsed_s"] = time.perf_counter() - start
+    corpus_result["status"] = corpus_status(corpus_result["issues"])
 
     return corpus_result
 
@@ -341,14 +1046,124 @@ def validate_corpus(task: str, name: str):
 # Main
 # ---------------------------------------------------------------------------
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Valida os folds gerados pelo pipeline de datasets.")
+    parser.add_argument(
+        "--near-dup-threshold", type=float, default=None, metavar="JACCARD",
+        help="Ativa o relatório de quase-duplicatas entre splits (MinHash + LSH) com este limiar, ex.: 0.8",
+    )
+    parser.add_argument(
+        "--format", choices=["text", "json", "junit"], default="text",
+        help="Formato do relatório. Em json/junit o relatório vai para a saída padrão (ou --output) "
+             "e o texto colorido para a saída de erro.",
+    )
+    parser.add_argument("--output", type=Path, default=None, help="Arquivo para o relatório json/junit.")
+    parser.add_argument(
+        "--sample", nargs="?", type=int, const=DEFAULT_SAMPLE_SIZE, default=None, metavar="N",
+        help=f"Validação rápida por amostragem com N registros por split (padrão: {DEFAULT_SAMPLE_SIZE}). "
+             "Corpora com qualquer suspeita são revalidados no modo completo.",
+    )
+    parser.add_argument("--sample-seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+# ---------------------------------------------------------------------------
+# Relatórios em formato de máquina
+# ---------------------------------------------------------------------------
+
+def overall_status(results):
+    statuses = {r["status"] for r in results}
+    if statuses & {"FALHA", "AUSENTE", "VAZIO"}:
+        return "FALHA"
+    if "AVISO" in statuses:
+        return "AVISO"
+    return "OK"
+
+def build_json_report(results, elapsed):
+    check_timings = defaultdict(float)
+    for r in results:
+        for check, seconds in r["timings"].items():
+            check_timings[check] += seconds
+    issues = [
+        {"corpus": r["dataset"], "task": r["task"], **issue}
+        for r in results for issue in r["issues"]
+    ]
+    counts = defaultdict(int)
+    for r in results:
+        counts[r["status"]] += 1
+    return {
+        "status": overall_status(results),
+        "summary": dict(counts),
+        "elapsed_s": elapsed,
+        "check_timings_s": dict(sorted(check_timings.items(), key=lambda item: -item[1])),
+        "corpora": [
+            {
+                "corpus": r["dataset"], "task": r["task"], "status": r["status"],
+                "mode": r.get("mode", "full"), "sampling": r.get("sampling"),
+                "elapsed_s": r.get("elapsed_s", 0.0), "check_timings_s": r["timings"],
+                "folds": r["folds"], "issue_count": len(r["issues"]),
+            }
+            for r in results
+        ],
+        "issues": issues,
+    }
+
+def build_junit_report(results, elapsed):
+    """
+    Um <testsuite> por corpus e um <testcase> por (fold, check). Problemas
+    com severidade ERRO viram <failure>; avisos vão para <system-out>.
+    """
+    root = ET.Element("testsuites", name="validate_pipeline", time=f"{elapsed:.3f}")
+    for r in results:
+        suite = ET.SubElement(root, "testsuite", name=f"{r['task']}.{r['dataset']}",
+                              time=f"{r.get('elapsed_s', 0.0):.3f}")
+        cases = {}
+        for fold_name, fold in r["folds"].items():
+            for check, seconds in fold["timings"].items():
+                cases[(fold_name, check)] = seconds
+        for issue in r["issues"]:
+            cases.setdefault((issue.get("fold"), issue["check"]), 0.0)
+        if "cv-integrity" in r["timings"]:
+            cases[(None, "cv-integrity")] = r["timings"]["cv-integrity"]
+
+        failures = 0
+        for (fold_name, check), seconds in sorted(cases.items(), key=lambda item: (item[0][0] or "", item[0][1])):
+            case = ET.SubElement(suite, "testcase", classname=f"{r['task']}.{r['dataset']}",
+                                 name=f"{fold_name}/{check}" if fold_name else check, time=f"{seconds:.3f}")
+            case_issues = [i for i in r["issues"] if i.get("fold") == fold_name and i["check"] == check]
+            errors = [i for i in case_issues if i["severity"] == SEVERITY_ERROR]
+            for issue in errors:
+                failure = ET.SubElement(case, "failure", type=check, message=issue["message"][:200])
+                failure.text = format_issue(issue)
+            if errors:
+                failures += 1
+            others = [i for i in case_issues if i["severity"] != SEVERITY_ERROR]
+            if others:
+                ET.SubElement(case, "system-out").text = "\n".join(format_issue(i) for i in others)
+        suite.set("tests", str(len(cases)))
+        suite.set("failures", str(failures))
+    ET.indent(root)
+    return ET.tostring(root, encoding="unicode", xml_declaration=True) + "\n"
+
+def write_report(report_text, output):
+    if output is None:
+        sys.stdout.write(report_text)
+        return
+    with open(output, "w", encoding="utf-8") as f:
+        f.write(report_text)
+    print(f"Relatório salvo em: {output}", file=sys.stderr)
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def run_validation(args):
     print(f"\n{Color.BOLD}{'#'*60}")
     print("  VALIDAÇÃO DE INTEGRIDADE DO PIPELINE DE DATASETS")
     print(f"{'#'*60}{Color.RESET}")
 
     results = []
     for ds in DATASETS:
-        result = validate_corpus(ds["task"], ds["name"])
+        result = validate_corpus(ds["task"], ds["name"], args.near_dup_threshold, args.sample, args.sample_seed)
         results.append(result)
 
     # -----------------------------------------------------------------------
@@ -389,12 +1204,35 @@ def main():
 
     if total_fail > 0 or total_miss > 0:
         print(f"\n{Color.RED}{Color.BOLD}>>> PIPELINE COM ERROS CRÍTICOS <<<{Color.RESET}")
-        sys.exit(1)
     elif total_warn > 0:
         print(f"\n{Color.YELLOW}{Color.BOLD}>>> PIPELINE COM AVISOS (revisar){Color.RESET}")
     else:
         print(f"\n{Color.GREEN}{Color.BOLD}>>> TODOS OS DATASETS ÍNTEGROS <<<{Color.RESET}")
 
+    return results
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    start = time.perf_counter()
+    if args.format == "text":
+        results = run_validation(args)
+    else:
+        # a saída padrão fica reservada para o relatório
+        with redirect_stdout(sys.stderr):
+            results = run_validation(args)
+    elapsed = time.perf_counter() - start
+
+    if args.format == "json":
+        report = json.dumps(build_json_report(results, elapsed), indent=2, ensure_ascii=False) + "\n"
+        write_report(report, args.output)
+    elif args.format == "junit":
+        write_report(build_junit_report(results, elapsed), args.output)
+
+    if overall_status(results) == "FALHA":
+        sys.exit(1)
+
 
 if __name__ == "__main__":
     main()